@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Benchmark the batch username search against one search per username.
+
+Serves fake profile sites from local ports (one port per host) with a
+spread of response times, then probes the same usernames three ways:
+
+- batch: one UsernameProber.probe_batch call, as batch_username_search does
+- separate, shared pool: one probe() call per username on the same prober,
+  as repeated unified username searches on one server do
+- separate, new pool: one probe() call per username, each on a fresh
+  prober and connection pool, closest to one CLI process per username
+
+Usage: python benchmark_username_batch.py [--usernames 50] [--sites 100] [--rounds 3]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from aiohttp import web
+
+from osint_core import prober
+from osint_core.hostguard import HostGuard
+from osint_core.latency import LatencyTracker
+from osint_core.prober import UsernameProber
+from osint_core.sites import Site
+
+async def start_sites(count: int, seed: int):
+    """One local server per site; returns the runner and the sites."""
+    delays = random.Random(seed)
+    app = web.Application()
+    
+    async def profile(request):
+        await asyncio.sleep(request.app["delays"][request.url.port])
+        return web.Response(status=200 if request.match_info["name"].startswith("taken") else 404)
+    
+    app.router.add_get("/{name}", profile)
+    app["delays"] = {}
+    runner = web.AppRunner(app)
+    await runner.setup()
+    sites = []
+    for number in range(count):
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        # Most sites answer quickly, a few are slow, like real platforms
+        app["delays"][port] = min(2.0, delays.lognormvariate(-2.5, 0.8))
+        url = f"http://127.0.0.1:{port}/{{username}}"
+        sites.append(Site(f"site{number}", url, url))
+    return runner, sites
+
+async def batch(usernames, sites):
+    probe = UsernameProber()
+    try:
+        await probe.probe_batch(usernames, sites)
+    finally:
+        await probe.close()
+
+async def separate_shared(usernames, sites):
+    probe = UsernameProber()
+    try:
+        for username in usernames:
+            await probe.probe(username, sites)
+    finally:
+        await probe.close()
+
+async def separate_new(usernames, sites):
+    for username in usernames:
+        probe = UsernameProber()
+        try:
+            await probe.probe(username, sites)
+        finally:
+            await probe.close()
+
+MODES = [
+    ("batch", batch),
+    ("separate, shared pool", separate_shared),
+    ("separate, new pool", separate_new),
+]
+
+async def main(args) -> None:
+    # Measure the probing itself, not the shared host limits or learned timeouts
+    prober.HOST_GUARD = HostGuard(rate=0, budgets={})
+    prober.LATENCY = LatencyTracker(None)
+    runner, sites = await start_sites(args.sites, args.seed)
+    usernames = [f"{'taken' if number % 5 == 0 else 'free'}{number}" for number in range(args.usernames)]
+    try:
+        timings = {name: [] for name, _ in MODES}
+        for _ in range(args.rounds):
+            for name, run in MODES:
+                started = time.perf_counter()
+                await run(usernames, sites)
+                timings[name].append(time.perf_counter() - started)
+    finally:
+        await runner.cleanup()
+    baseline = statistics.median(timings["batch"])
+    print(f"{args.usernames} usernames x {args.sites} sites, median of {args.rounds} rounds")
+    for name, values in timings.items():
+        median = statistics.median(values)
+        print(f"  {name:<22} {median:7.2f}s  {median / baseline:5.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--usernames", type=int, default=50)
+    parser.add_argument("--sites", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(main(parser.parse_args()))
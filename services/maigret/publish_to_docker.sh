@@ -76,7 +76,8 @@ check_docker_login() {
 build_image() {
     print_header "Building Docker Image"
     print_info "Building ${LOCAL_TAG}..."
-    docker build -t "${LOCAL_TAG}" .
+    # Build context is the repository root so the shared osint_core package is included
+    docker build -t "${LOCAL_TAG}" -f Dockerfile ../..
     print_success "Image built successfully"
 }
 
@@ -5,167 +5,19 @@ A dedicated MCP server for Maigret username search tool.
 """
 
 import asyncio
-import json
-import tempfile
-import os
 import sys
 from pathlib import Path
-from typing import Any, Dict, Optional
 
-async def run_command_in_venv(command: list[str], cwd: Optional[str] = None, input_data: Optional[str] = None, extra_env: Optional[Dict[str, str]] = None) -> tuple[str, str, int]:
-    """Run a command in the virtual environment."""
-    try:
-        env = os.environ.copy()
-        if extra_env:
-            env.update(extra_env)
-        
-        process = await asyncio.create_subprocess_exec(
-            *command,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            cwd=cwd,
-            env=env,
-            stdin=asyncio.subprocess.PIPE if input_data else None
-        )
-        
-        stdout, stderr = await process.communicate(input=input_data.encode() if input_data else None)
-        
-        return stdout.decode('utf-8', errors='ignore'), stderr.decode('utf-8', errors='ignore'), process.returncode
-        
-    except Exception as e:
-        return "", str(e), 1
-
-async def handle_maigret(params: Dict[str, Any]) -> Dict[str, Any]:
-    """Handle Maigret username search."""
-    username = params["username"]
-    timeout = params.get("timeout", 10000)
-    
-    with tempfile.TemporaryDirectory() as temp_dir:
-        cmd = ["maigret", username, "--timeout", str(timeout), "-J", "ndjson", "--folderoutput", temp_dir]
-        
-        stdout, stderr, returncode = await run_command_in_venv(cmd)
-        
-        if returncode == 0:
-            json_files = list(Path(temp_dir).glob("*.json"))
-            if json_files:
-                try:
-                    json_content = json_files[0].read_text(encoding='utf-8')
-                    return {"success": True, "content": json_content}
-                except Exception as e:
-                    return {"success": True, "content": stdout}
-            else:
-                return {"success": True, "content": stdout}
-        else:
-            return {"success": False, "error": f"Maigret failed: {stderr}"}
+try:
+    from osint_core import MAIGRET_TOOL, serve
+except ImportError:
+    # Running from a source checkout: the shared core lives in the repo's src/
+    sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "src"))
+    from osint_core import MAIGRET_TOOL, serve
 
 async def main():
     """Main MCP server loop - handles JSON-RPC over stdio."""
-    try:
-        while True:
-            try:
-                line = await asyncio.get_event_loop().run_in_executor(None, sys.stdin.readline)
-                if not line:
-                    break
-                
-                request = json.loads(line.strip())
-                method = request.get("method")
-                params = request.get("params", {})
-                request_id = request.get("id")
-                
-                if method == "initialize":
-                    response = {
-                        "jsonrpc": "2.0",
-                        "id": request_id,
-                        "result": {
-                            "protocolVersion": "2024-11-05",
-                            "capabilities": {
-                                "tools": {}
-                            },
-                            "serverInfo": {
-                                "name": "maigret-mcp-server",
-                                "version": "1.0.0"
-                            }
-                        }
-                    }
-                elif method == "tools/list":
-                    tools = [
-                        {
-                            "name": "maigret_username_search",
-                            "description": "Search for username across 3000+ sites with detailed analysis and false positive detection",
-                            "inputSchema": {
-                                "type": "object",
-                                "properties": {
-                                    "username": {"type": "string", "description": "Username to search for"},
-                                    "timeout": {"type": "integer", "description": "Timeout in seconds (default: 10000)"}
-                                },
-                                "required": ["username"]
-                            }
-                        }
-                    ]
-                    response = {
-                        "jsonrpc": "2.0",
-                        "id": request_id,
-                        "result": {"tools": tools}
-                    }
-                elif method == "tools/call":
-                    tool_name = params.get("name")
-                    tool_params = params.get("arguments", {})
-                    
-                    if tool_name == "maigret_username_search":
-                        result = await handle_maigret(tool_params)
-                    else:
-                        result = {"success": False, "error": f"Unknown tool: {tool_name}"}
-                    
-                    response = {
-                        "jsonrpc": "2.0",
-                        "id": request_id,
-                        "result": {
-                            "content": [
-                                {
-                                    "type": "text",
-                                    "text": json.dumps(result, indent=2)
-                                }
-                            ]
-                        }
-                    }
-                else:
-                    response = {
-                        "jsonrpc": "2.0",
-                        "id": request_id,
-                        "error": {
-                            "code": -32601,
-                            "message": f"Method not found: {method}"
-                        }
-                    }
-                
-                print(json.dumps(response), flush=True)
-                
-            except json.JSONDecodeError as e:
-                error_response = {
-                    "jsonrpc": "2.0",
-                    "id": None,
-                    "error": {
-                        "code": -32700,
-                        "message": f"Parse error: {str(e)}"
-                    }
-                }
-                print(json.dumps(error_response), flush=True)
-            except Exception as e:
-                error_response = {
-                    "jsonrpc": "2.0",
-                    "id": request.get("id") if 'request' in locals() else None,
-                    "error": {
-                        "code": -32603,
-                        "message": f"Internal error: {str(e)}"
-                    }
-                }
-                print(json.dumps(error_response), flush=True)
-                
-    except KeyboardInterrupt:
-        pass
-    except Exception as e:
-        print(f"Server error: {e}", file=sys.stderr)
+    await serve([MAIGRET_TOOL], "maigret-mcp-server")
 
 if __name__ == "__main__":
     asyncio.run(main())
-
@@ -5,162 +5,19 @@ A dedicated MCP server for SpiderFoot comprehensive OSINT scan.
 """
 
 import asyncio
-import json
-import os
 import sys
-from typing import Any, Dict, Optional
+from pathlib import Path
 
-async def run_command_in_venv(command: list[str], cwd: Optional[str] = None, input_data: Optional[str] = None, extra_env: Optional[Dict[str, str]] = None) -> tuple[str, str, int]:
-    """Run a command in the virtual environment."""
-    try:
-        env = os.environ.copy()
-        if extra_env:
-            env.update(extra_env)
-        
-        process = await asyncio.create_subprocess_exec(
-            *command,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            cwd=cwd,
-            env=env,
-            stdin=asyncio.subprocess.PIPE if input_data else None
-        )
-        
-        stdout, stderr = await process.communicate(input=input_data.encode() if input_data else None)
-        
-        return stdout.decode('utf-8', errors='ignore'), stderr.decode('utf-8', errors='ignore'), process.returncode
-        
-    except Exception as e:
-        return "", str(e), 1
-
-async def handle_spiderfoot(params: Dict[str, Any]) -> Dict[str, Any]:
-    """Handle SpiderFoot comprehensive OSINT scan."""
-    target = params["target"]
-    
-    # SpiderFoot reads API keys from environment variables or config file
-    cmd = ["python3", "/opt/spiderfoot/sf.py", 
-           "-s", target,
-           "-u", "all",
-           "-o", "json",
-           "-q"]
-    
-    stdout, stderr, returncode = await run_command_in_venv(cmd)
-    
-    if returncode == 0:
-        return {"success": True, "content": stdout}
-    else:
-        return {"success": False, "error": f"SpiderFoot failed: {stderr}"}
+try:
+    from osint_core import SPIDERFOOT_EVENTS_TOOL, SPIDERFOOT_RESULTS_TOOL, SPIDERFOOT_START_TOOL, SPIDERFOOT_STOP_TOOL, SPIDERFOOT_TOOL, serve
+except ImportError:
+    # Running from a source checkout: the shared core lives in the repo's src/
+    sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "src"))
+    from osint_core import SPIDERFOOT_EVENTS_TOOL, SPIDERFOOT_RESULTS_TOOL, SPIDERFOOT_START_TOOL, SPIDERFOOT_STOP_TOOL, SPIDERFOOT_TOOL, serve
 
 async def main():
     """Main MCP server loop - handles JSON-RPC over stdio."""
-    try:
-        while True:
-            try:
-                line = await asyncio.get_event_loop().run_in_executor(None, sys.stdin.readline)
-                if not line:
-                    break
-                
-                request = json.loads(line.strip())
-                method = request.get("method")
-                params = request.get("params", {})
-                request_id = request.get("id")
-                
-                if method == "initialize":
-                    response = {
-                        "jsonrpc": "2.0",
-                        "id": request_id,
-                        "result": {
-                            "protocolVersion": "2024-11-05",
-                            "capabilities": {
-                                "tools": {}
-                            },
-                            "serverInfo": {
-                                "name": "spiderfoot-mcp-server",
-                                "version": "1.0.0"
-                            }
-                        }
-                    }
-                elif method == "tools/list":
-                    tools = [
-                        {
-                            "name": "spiderfoot_scan",
-                            "description": "Comprehensive OSINT scan - auto-detects target type (IP, IPv6, domain, email, phone, username, person name, Bitcoin address, network block, BGP AS). API keys can be provided via environment variables (SHODAN_API_KEY, VIRUSTOTAL_API_KEY, etc.) for enhanced modules.",
-                            "inputSchema": {
-                                "type": "object",
-                                "properties": {
-                                    "target": {
-                                        "type": "string", 
-                                        "description": "Target to scan - SpiderFoot auto-detects type from: IP address, IPv6 address, domain, email, phone number, username, person name, Bitcoin address, network block, or BGP AS"
-                                    }
-                                },
-                                "required": ["target"]
-                            }
-                        }
-                    ]
-                    response = {
-                        "jsonrpc": "2.0",
-                        "id": request_id,
-                        "result": {"tools": tools}
-                    }
-                elif method == "tools/call":
-                    tool_name = params.get("name")
-                    tool_params = params.get("arguments", {})
-                    
-                    if tool_name == "spiderfoot_scan":
-                        result = await handle_spiderfoot(tool_params)
-                    else:
-                        result = {"success": False, "error": f"Unknown tool: {tool_name}"}
-                    
-                    response = {
-                        "jsonrpc": "2.0",
-                        "id": request_id,
-                        "result": {
-                            "content": [
-                                {
-                                    "type": "text",
-                                    "text": json.dumps(result, indent=2)
-                                }
-                            ]
-                        }
-                    }
-                else:
-                    response = {
-                        "jsonrpc": "2.0",
-                        "id": request_id,
-                        "error": {
-                            "code": -32601,
-                            "message": f"Method not found: {method}"
-                        }
-                    }
-                
-                print(json.dumps(response), flush=True)
-                
-            except json.JSONDecodeError as e:
-                error_response = {
-                    "jsonrpc": "2.0",
-                    "id": None,
-                    "error": {
-                        "code": -32700,
-                        "message": f"Parse error: {str(e)}"
-                    }
-                }
-                print(json.dumps(error_response), flush=True)
-            except Exception as e:
-                error_response = {
-                    "jsonrpc": "2.0",
-                    "id": request.get("id") if 'request' in locals() else None,
-                    "error": {
-                        "code": -32603,
-                        "message": f"Internal error: {str(e)}"
-                    }
-                }
-                print(json.dumps(error_response), flush=True)
-                
-    except KeyboardInterrupt:
-        pass
-    except Exception as e:
-        print(f"Server error: {e}", file=sys.stderr)
+    await serve([SPIDERFOOT_TOOL, SPIDERFOOT_START_TOOL, SPIDERFOOT_EVENTS_TOOL, SPIDERFOOT_RESULTS_TOOL, SPIDERFOOT_STOP_TOOL], "spiderfoot-mcp-server")
 
 if __name__ == "__main__":
     asyncio.run(main())
-
@@ -57,7 +57,8 @@ build_service() {
     
     cd "${service}"
     print_info "Building ${service}-mcp-server:latest..."
-    docker build -t "${service}-mcp-server:latest" .
+    # Build context is the repository root so the shared osint_core package is included
+    docker build -t "${service}-mcp-server:latest" -f Dockerfile ../..
     print_success "${service} image built successfully"
     cd ..
 }
@@ -0,0 +1,48 @@
+"""
+Shared runtime for the OSINT Tools MCP servers.
+
+The aggregate server and every per-tool service are thin entry points that
+call serve() with the ToolSpecs they expose.
+"""
+
+from .registry import ToolRegistry, ToolSpec
+from .server import UTILITY_TOOLS, serve
+from .tools import (
+    ALL_TOOLS,
+    BATCH_USERNAME_PROBE_TOOL,
+    BLACKBIRD_TOOL,
+    GHUNT_TOOL,
+    HOLEHE_BATCH_TOOL,
+    HOLEHE_TOOL,
+    MAIGRET_TOOL,
+    SHERLOCK_TOOL,
+    SPIDERFOOT_EVENTS_TOOL,
+    SPIDERFOOT_RESULTS_TOOL,
+    SPIDERFOOT_START_TOOL,
+    SPIDERFOOT_STOP_TOOL,
+    SPIDERFOOT_TOOL,
+    THEHARVESTER_TOOL,
+    USERNAME_PROBE_TOOL,
+)
+
+__all__ = [
+    "ALL_TOOLS",
+    "BATCH_USERNAME_PROBE_TOOL",
+    "BLACKBIRD_TOOL",
+    "GHUNT_TOOL",
+    "HOLEHE_BATCH_TOOL",
+    "HOLEHE_TOOL",
+    "MAIGRET_TOOL",
+    "SHERLOCK_TOOL",
+    "SPIDERFOOT_EVENTS_TOOL",
+    "SPIDERFOOT_RESULTS_TOOL",
+    "SPIDERFOOT_START_TOOL",
+    "SPIDERFOOT_STOP_TOOL",
+    "SPIDERFOOT_TOOL",
+    "THEHARVESTER_TOOL",
+    "USERNAME_PROBE_TOOL",
+    "UTILITY_TOOLS",
+    "ToolRegistry",
+    "ToolSpec",
+    "serve",
+]
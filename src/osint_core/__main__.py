@@ -0,0 +1,23 @@
+"""
+Maintenance commands for the shared runtime.
+
+    python -m osint_core build-site-index [PATH]
+"""
+
+import argparse
+import sys
+
+from .siteindex import SITE_INDEX_PATH, build_index_command
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m osint_core")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build-site-index", help="Compile the username site databases into the memory-mapped index")
+    build.add_argument("path", nargs="?", default=SITE_INDEX_PATH, help=f"Index file to write (default: {SITE_INDEX_PATH})")
+    args = parser.parse_args()
+    if args.command == "build-site-index":
+        return build_index_command(args.path)
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
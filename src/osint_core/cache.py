@@ -0,0 +1,255 @@
+"""
+Result caching and in-flight call coalescing.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from .progress import CURRENT_PROGRESS, ProgressFanout
+
+# Result cache: an in-memory LRU tier in front of a persistent SQLite tier
+CACHE_DB_PATH = os.environ.get("OSINT_CACHE_DB", "/app/reports/osint_cache.sqlite3")
+CACHE_MEMORY_BYTES = int(os.environ.get("OSINT_CACHE_MEMORY_BYTES", str(64 * 1024 * 1024)))
+CACHE_MAX_RESULT_BYTES = int(os.environ.get("OSINT_CACHE_MAX_RESULT_BYTES", str(32 * 1024 * 1024)))
+
+# Arguments that control how a call runs rather than what it returns
+CACHE_IGNORED_ARGUMENTS = {"cache", "max_runtime"}
+
+# Arguments compared case-insensitively when building cache keys
+CACHE_CASE_INSENSITIVE_ARGUMENTS = {"email", "domain", "identifier"}
+
+def canonicalize_arguments(value: Any, name: Optional[str] = None) -> Any:
+    """Normalize tool arguments so equivalent calls share a cache key."""
+    if isinstance(value, dict):
+        return {
+            key: canonicalize_arguments(item, key)
+            for key, item in value.items()
+            if key not in CACHE_IGNORED_ARGUMENTS and item is not None
+        }
+    if isinstance(value, list):
+        items = [canonicalize_arguments(item) for item in value]
+        if all(isinstance(item, (str, int, float, bool)) for item in items):
+            # Lists of scalars (e.g. sherlock sites) are sets
+            return sorted(set(items), key=lambda item: (type(item).__name__, item))
+        return items
+    if isinstance(value, str):
+        value = value.strip()
+        if name in CACHE_CASE_INSENSITIVE_ARGUMENTS:
+            value = value.lower()
+    return value
+
+def cache_key(tool_name: str, params: Dict[str, Any]) -> str:
+    """Cache key for a tool call: tool name plus canonicalized arguments."""
+    canonical = json.dumps(canonicalize_arguments(params), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{tool_name}\0{canonical}".encode("utf-8")).hexdigest()
+
+class ResultCache:
+    """Two-tier cache of successful tool results.
+    
+    The memory tier is an LRU bounded by the total size of the serialized
+    results. The disk tier is a SQLite database that survives restarts; all
+    SQLite access runs on one dedicated thread so the event loop never blocks
+    on disk I/O. If the database cannot be opened the cache runs memory-only.
+    """
+    
+    def __init__(self, db_path: Optional[str], memory_bytes: int, max_result_bytes: int, ttls: Dict[str, int]):
+        self.db_path = db_path
+        self.memory_bytes = memory_bytes
+        self.max_result_bytes = max_result_bytes
+        self.ttls = ttls
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._memory_used = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_failed = not db_path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="osint-cache")
+        self._writes = 0
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "bypassed": 0, "refreshed": 0}
+    
+    def ttl_for(self, tool_name: str) -> int:
+        return self.ttls.get(tool_name, 0)
+    
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open the database on the cache thread, once."""
+        if self._db is None and not self._db_failed:
+            try:
+                os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+                db = sqlite3.connect(self.db_path)
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS results ("
+                    "key TEXT PRIMARY KEY, tool TEXT NOT NULL, created REAL NOT NULL, "
+                    "expires REAL NOT NULL, result TEXT NOT NULL)"
+                )
+                db.commit()
+                self._db = db
+            except (OSError, sqlite3.Error) as e:
+                self._db_failed = True
+                print(f"Result cache: disk tier disabled ({self.db_path}: {e})", file=sys.stderr)
+        return self._db
+    
+    def _disk_get(self, key: str) -> Optional[tuple]:
+        db = self._connect()
+        if db is None:
+            return None
+        row = db.execute("SELECT created, expires, result FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return row
+    
+    def _disk_put(self, key: str, tool_name: str, created: float, expires: float, text: str) -> None:
+        db = self._connect()
+        if db is None:
+            return
+        db.execute(
+            "INSERT OR REPLACE INTO results (key, tool, created, expires, result) VALUES (?, ?, ?, ?, ?)",
+            (key, tool_name, created, expires, text)
+        )
+        self._writes += 1
+        if self._writes % 100 == 0:
+            db.execute("DELETE FROM results WHERE expires < ?", (time.time(),))
+        db.commit()
+    
+    def _remember(self, key: str, created: float, expires: float, text: str) -> None:
+        if len(text) > self.memory_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_used -= len(old[2])
+        self._memory[key] = (created, expires, text)
+        self._memory_used += len(text)
+        while self._memory_used > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_used -= len(evicted[2])
+    
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a fresh cached result with cache metadata attached, or None."""
+        now = time.time()
+        entry = self._memory.get(key)
+        tier = "memory"
+        if entry is not None and entry[1] < now:
+            self._memory_used -= len(entry[2])
+            del self._memory[key]
+            entry = None
+        if entry is not None:
+            self._memory.move_to_end(key)
+            self.counters["memory_hits"] += 1
+        else:
+            loop = asyncio.get_running_loop()
+            try:
+                entry = await loop.run_in_executor(self._executor, self._disk_get, key)
+            except sqlite3.Error as e:
+                print(f"Result cache read failed: {e}", file=sys.stderr)
+                entry = None
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+            tier = "disk"
+            self.counters["disk_hits"] += 1
+            self._remember(key, *entry)
+        result = json.loads(entry[2])
+        result["cache"] = {"hit": True, "tier": tier, "age_seconds": round(now - entry[0], 1)}
+        return result
+    
+    async def put(self, tool_name: str, key: str, result: Dict[str, Any]) -> None:
+        """Store a successful result in both tiers."""
+        ttl = self.ttl_for(tool_name)
+        text = json.dumps(result)
+        if ttl <= 0 or len(text) > self.max_result_bytes:
+            return
+        created = time.time()
+        expires = created + ttl
+        self._remember(key, created, expires, text)
+        self.counters["stores"] += 1
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._executor, self._disk_put, key, tool_name, created, expires, text)
+        except sqlite3.Error as e:
+            print(f"Result cache write failed: {e}", file=sys.stderr)
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.counters["memory_hits"] + self.counters["disk_hits"] + self.counters["misses"]
+        hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+        return dict(
+            self.counters,
+            hit_ratio=round(hits / lookups, 3) if lookups else 0.0,
+            memory_entries=len(self._memory),
+            memory_bytes=self._memory_used,
+            disk_enabled=self._db is not None or not self._db_failed,
+            ttls=self.ttls
+        )
+
+# TTLs in seconds per tool name (0 disables caching) are filled in from the
+# tool registry when a server starts; override with
+# OSINT_CACHE_TTLS="holehe_email_search=3600,spiderfoot_scan=0"
+RESULT_CACHE = ResultCache(CACHE_DB_PATH, CACHE_MEMORY_BYTES, CACHE_MAX_RESULT_BYTES, {})
+
+class SingleFlight:
+    """Coalesce identical tool calls that are in flight at the same time.
+    
+    The first caller for a key starts the execution as a separate task;
+    later callers with the same key wait on that task and receive a copy of
+    its result. The execution is only cancelled when every caller waiting on
+    it has been cancelled.
+    
+    The execution reports progress to a ProgressFanout, so every caller that
+    asked for progress receives it, whichever caller started the execution.
+    """
+    
+    def __init__(self):
+        self._calls: Dict[str, Dict[str, Any]] = {}
+        self.counters = {"executions": 0, "coalesced": 0}
+    
+    def _forget(self, key: str, call: Dict[str, Any]) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+    
+    async def run(self, key: str, execute) -> Dict[str, Any]:
+        """Return execute()'s result, sharing one execution per key."""
+        call = self._calls.get(key)
+        follower = call is not None
+        if call is None:
+            fanout = ProgressFanout()
+            
+            async def execute_with_fanout() -> Dict[str, Any]:
+                # The task runs in a copy of the leader's context; report to every caller instead
+                CURRENT_PROGRESS.set(fanout)
+                return await execute()
+            
+            call = {"task": asyncio.ensure_future(execute_with_fanout()), "waiters": 0, "progress": fanout}
+            self._calls[key] = call
+            call["task"].add_done_callback(lambda _, c=call: self._forget(key, c))
+            self.counters["executions"] += 1
+        else:
+            self.counters["coalesced"] += 1
+        reporter = CURRENT_PROGRESS.get()
+        if reporter is not None:
+            call["progress"].attach(reporter)
+        
+        call["waiters"] += 1
+        try:
+            result = await asyncio.shield(call["task"])
+        except asyncio.CancelledError:
+            call["waiters"] -= 1
+            if call["waiters"] == 0 and not call["task"].done():
+                self._forget(key, call)
+                call["task"].cancel()
+            raise
+        call["waiters"] -= 1
+        
+        result = dict(result)
+        if follower:
+            result["coalesced"] = True
+        return result
+    
+    def stats(self) -> Dict[str, Any]:
+        return dict(self.counters, in_flight=len(self._calls))
+
+SINGLE_FLIGHT = SingleFlight()
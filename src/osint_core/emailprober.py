@@ -0,0 +1,295 @@
+"""
+Native asyncio email prober built on Holehe's site modules.
+
+Holehe's modules are plain coroutines that take an httpx client, so a batch
+of addresses can run them in-process instead of spawning the CLI per email.
+All checks share one connection pool; each address gets its own client on
+that pool, so cookies and CSRF tokens of concurrent checks never mix. Checks
+against one platform are capped and spaced out, and the spacing grows while
+the platform answers with rate limits. Every request also goes through the
+shared per-host rate limits and circuit breakers of HOST_GUARD.
+"""
+
+import asyncio
+import os
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .hostguard import HOST_GUARD
+
+# Connections open at once across all email checks
+EMAIL_MAX_CONNECTIONS = int(os.environ.get("OSINT_EMAIL_CONNECTIONS", "100"))
+
+# Checks running at once against one platform, and seconds between their starts
+PLATFORM_CONCURRENCY = int(os.environ.get("OSINT_EMAIL_PLATFORM_CONCURRENCY", "2"))
+PLATFORM_INTERVAL_SECONDS = float(os.environ.get("OSINT_EMAIL_PLATFORM_INTERVAL", "0.25"))
+
+# Ceiling for the spacing of a platform that keeps rate limiting
+PLATFORM_MAX_INTERVAL_SECONDS = 5.0
+
+# Rate-limited answers in a row after which a platform is skipped, and for how long
+PLATFORM_GIVE_UP_AFTER = 5
+PLATFORM_COOLDOWN_SECONDS = 60.0
+
+# Default seconds per request, as in the holehe CLI
+EMAIL_TIMEOUT_SECONDS = 10
+
+# Modules that trigger a password-recovery flow the account owner may notice
+# (skipped by the CLI's --no-password-recovery)
+PASSWORD_RECOVERY_MODULES = {"adobe", "mail_ru", "odnoklassniki", "samsung"}
+
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+class PlatformLimiter:
+    """Caps concurrent checks against one platform and spaces out their starts.
+    
+    A rate-limited answer doubles the spacing, up to
+    PLATFORM_MAX_INTERVAL_SECONDS; any other answer resets it. After
+    PLATFORM_GIVE_UP_AFTER rate-limited answers in a row the platform is
+    skipped for PLATFORM_COOLDOWN_SECONDS, rather than stalling the batch.
+    """
+    
+    def __init__(self, concurrency: int, interval: float):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.base_interval = interval
+        self.interval = interval
+        self.rate_limited = 0
+        self.consecutive = 0
+        self.cooling_until = 0.0
+        self._next_start = 0.0
+    
+    @property
+    def cooling(self) -> bool:
+        return time.monotonic() < self.cooling_until
+    
+    async def acquire(self) -> bool:
+        """Wait for a turn; False (and nothing to release) if the platform is cooling down."""
+        await self.semaphore.acquire()
+        try:
+            while not self.cooling:
+                wait = self._next_start - time.monotonic()
+                if wait <= 0:
+                    self._next_start = time.monotonic() + self.interval
+                    return True
+                await asyncio.sleep(wait)
+        except BaseException:
+            self.semaphore.release()
+            raise
+        self.semaphore.release()
+        return False
+    
+    def release(self, rate_limited: bool) -> None:
+        if rate_limited:
+            self.rate_limited += 1
+            self.consecutive += 1
+            self.interval = min(max(self.interval, 0.5) * 2, PLATFORM_MAX_INTERVAL_SECONDS)
+            if self.consecutive >= PLATFORM_GIVE_UP_AFTER:
+                self.cooling_until = time.monotonic() + PLATFORM_COOLDOWN_SECONDS
+        else:
+            self.consecutive = 0
+            self.interval = self.base_interval
+        self.semaphore.release()
+
+class EmailProber:
+    """Runs Holehe's modules for many addresses over one shared connection pool."""
+    
+    def __init__(self, max_connections: int = EMAIL_MAX_CONNECTIONS, platform_concurrency: int = PLATFORM_CONCURRENCY, platform_interval: float = PLATFORM_INTERVAL_SECONDS):
+        self.max_connections = max_connections
+        self.platform_concurrency = platform_concurrency
+        self.platform_interval = platform_interval
+        self._pool = None
+        self._transport = None
+        self._modules: Optional[List[Tuple[str, str, Callable]]] = None
+        self._limiters: Dict[str, PlatformLimiter] = {}
+        self.counters = {"batches": 0, "checks": 0, "rate_limited": 0, "skipped": 0}
+    
+    def load_modules(self) -> List[Tuple[str, str, Callable]]:
+        """(name, category, function) for every Holehe module, imported once.
+        
+        Raises ImportError when Holehe is not installed. Importing all
+        modules takes a while; call this from a thread.
+        """
+        if self._modules is None:
+            from holehe.core import import_submodules
+            
+            modules = []
+            for path, module in sorted(import_submodules("holehe.modules").items()):
+                # holehe.modules.<category>.<name>, as in holehe.core.get_functions
+                parts = path.split(".")
+                if len(parts) == 4 and callable(getattr(module, parts[3], None)):
+                    modules.append((parts[3], parts[2], getattr(module, parts[3])))
+            self._modules = modules
+        return self._modules
+    
+    def select_modules(self, wanted: Optional[List[str]] = None, password_recovery: bool = True) -> List[Tuple[str, str, Callable]]:
+        """Modules matching wanted by name or category (all by default)."""
+        modules = self.load_modules()
+        if wanted:
+            names = {name.lower() for name in wanted}
+            modules = [module for module in modules if module[0] in names or module[1] in names]
+        if not password_recovery:
+            modules = [module for module in modules if module[0] not in PASSWORD_RECOVERY_MODULES]
+        return modules
+    
+    def _client(self, timeout: float):
+        # Imported here so the server runs without Holehe when the tool is unused
+        import httpx
+        
+        if self._transport is None:
+            class GuardedTransport(httpx.AsyncBaseTransport):
+                """Sends each request through HOST_GUARD; an open breaker fails it like a refused connection."""
+                
+                def __init__(self, transport):
+                    self.transport = transport
+                
+                async def handle_async_request(self, request):
+                    host = request.url.host
+                    if not await HOST_GUARD.acquire(host):
+                        raise httpx.ConnectError(f"Circuit open for {host}", request=request)
+                    try:
+                        response = await self.transport.handle_async_request(request)
+                    except httpx.TransportError:
+                        HOST_GUARD.record(host, None)
+                        raise
+                    HOST_GUARD.record(host, response.status_code)
+                    return response
+                
+                async def aclose(self):
+                    # Closing a client must not close the pool shared with the
+                    # other clients; EmailProber.close() closes it
+                    pass
+            
+            limits = httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+            self._pool = httpx.AsyncHTTPTransport(limits=limits)
+            self._transport = GuardedTransport(self._pool)
+        # The clients only hold cookies; the pool lives in the shared transport
+        return httpx.AsyncClient(transport=self._transport, timeout=timeout)
+    
+    def _limiter(self, name: str) -> PlatformLimiter:
+        limiter = self._limiters.get(name)
+        if limiter is None:
+            limiter = self._limiters[name] = PlatformLimiter(self.platform_concurrency, self.platform_interval)
+        return limiter
+    
+    async def check_module(self, name: str, function: Callable, email: str, client) -> Dict[str, Any]:
+        """Run one module for one address; failures count as rate limited, as in the CLI."""
+        out: List[Dict[str, Any]] = []
+        limiter = self._limiter(name)
+        if not await limiter.acquire():
+            self.counters["skipped"] += 1
+            return {"name": name, "rateLimit": True, "exists": False, "skipped": True}
+        # A cancelled check says nothing about the platform
+        rate_limited = False
+        try:
+            await function(email, client, out)
+            rate_limited = not out or bool(out[-1].get("rateLimit"))
+        except Exception as e:
+            rate_limited = True
+            out.append({"name": name, "rateLimit": True, "exists": False, "error": type(e).__name__})
+        finally:
+            limiter.release(rate_limited)
+        self.counters["checks"] += 1
+        if rate_limited:
+            self.counters["rate_limited"] += 1
+        return out[-1] if out else {"name": name, "rateLimit": True, "exists": False}
+    
+    async def probe_batch(self, emails: List[str], modules: List[Tuple[str, str, Callable]], timeout: float = EMAIL_TIMEOUT_SECONDS, on_result: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Run every module for every address and return the results per address.
+        
+        Address x module pairs go to a fixed set of workers one address after
+        another, so consecutive checks hit different platforms and each
+        address finishes (and can be reported) before the last one starts.
+        An address's client is created when its first check starts and
+        closed after its last one, so only the addresses in progress hold one.
+        """
+        self.counters["batches"] += 1
+        results: Dict[str, List[Dict[str, Any]]] = {email: [] for email in emails}
+        clients: Dict[str, Any] = {}
+        remaining = {email: len(modules) for email in emails}
+        pairs = ((email, module) for email in emails for module in modules)
+        
+        async def worker() -> None:
+            # The generator is shared; next() never awaits, so each pair is taken once
+            for email, (name, _, function) in pairs:
+                client = clients.get(email)
+                if client is None:
+                    client = clients[email] = self._client(timeout)
+                try:
+                    result = await self.check_module(name, function, email, client)
+                finally:
+                    remaining[email] -= 1
+                    if remaining[email] == 0:
+                        await clients.pop(email).aclose()
+                results[email].append(result)
+                if on_result is not None:
+                    on_result(email, result)
+        
+        try:
+            await asyncio.gather(*[worker() for _ in range(min(self.max_connections, len(emails) * len(modules)))])
+        finally:
+            # Clients of addresses left unfinished by a cancellation
+            for client in clients.values():
+                await client.aclose()
+        return results
+    
+    async def close(self) -> None:
+        if self._pool is not None:
+            await self._pool.aclose()
+            self._pool = None
+            self._transport = None
+    
+    def stats(self) -> Dict[str, Any]:
+        throttled = {name: round(limiter.interval, 2) for name, limiter in self._limiters.items() if limiter.interval > limiter.base_interval}
+        cooling = sorted(name for name, limiter in self._limiters.items() if limiter.cooling)
+        return dict(
+            self.counters,
+            max_connections=self.max_connections,
+            platform_concurrency=self.platform_concurrency,
+            platform_interval=self.platform_interval,
+            modules=len(self._modules) if self._modules is not None else None,
+            throttled_platforms=throttled,
+            cooling_platforms=cooling
+        )
+
+def summarize_email(email: str, results: List[Dict[str, Any]], only_used: bool = True) -> Dict[str, Any]:
+    """Group one address's module results into used, rate-limited and unused platforms."""
+    used = []
+    rate_limited = []
+    not_used = []
+    for item in results:
+        domain = item.get("domain") or item["name"]
+        if item.get("rateLimit"):
+            rate_limited.append(domain)
+        elif item.get("exists"):
+            extras = {key: item[key] for key in ("emailrecovery", "phoneNumber", "others") if item.get(key)}
+            used.append(dict({"platform": domain}, **extras))
+        else:
+            not_used.append(domain)
+    used.sort(key=lambda hit: hit["platform"])
+    summary = {
+        "email": email,
+        "used": used,
+        "stats": {"used": len(used), "not_used": len(not_used), "rate_limited": len(rate_limited), "checked": len(results)}
+    }
+    if not only_used:
+        summary["not_used"] = sorted(not_used)
+        summary["rate_limited"] = sorted(rate_limited)
+    return summary
+
+def normalize_emails(emails: List[str]) -> Tuple[List[str], List[str]]:
+    """Deduplicated addresses in request order, and the entries that are not addresses."""
+    valid: List[str] = []
+    invalid: List[str] = []
+    seen = set()
+    for email in emails:
+        email = email.strip()
+        if not EMAIL_PATTERN.match(email):
+            invalid.append(email)
+        elif email.lower() not in seen:
+            seen.add(email.lower())
+            valid.append(email)
+    return valid, invalid
+
+# Shared by every call, so connections and platform limits are server-wide
+EMAIL_PROBER = EmailProber()
@@ -0,0 +1,271 @@
+"""
+In-process tool engines for the warm worker pool.
+
+Each engine is a (loader, runner) pair: the loader imports a tool library and
+parses its site data once per worker; the runner serves one call through the
+library's Python API and returns the same result shape as the CLI handler.
+Runners report each site checked through emit(), as a line in the CLI's
+`[+] Site: url` format, so progress can be streamed while a call runs.
+Runners leave out the sites on the hosts in params["skip_hosts"] (open
+circuit breakers in the server) and return the status each host answered
+with as "host_statuses", so the server's breakers see their traffic.
+"""
+
+import asyncio
+import csv
+import io
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+Emit = Callable[[str], None]
+
+class EngineUnsupported(Exception):
+    """Raised by a worker engine for calls it cannot serve; the CLI is used instead."""
+
+def url_host(url: str) -> Optional[str]:
+    try:
+        return urlsplit(url).hostname
+    except ValueError:
+        return None
+
+def host_status(url: str, status: Any, failed: bool) -> Optional[Tuple[str, Optional[int]]]:
+    """(host, status) for the server's breakers; None status for a failed request."""
+    host = url_host(url or "")
+    if not host:
+        return None
+    if isinstance(status, int):
+        return (host, status)
+    return (host, None) if failed else None
+
+def load_sherlock_engine() -> Dict[str, Any]:
+    """Import Sherlock and parse its bundled site list once."""
+    from sherlock_project import sherlock as sherlock_module
+    from sherlock_project.notify import QueryNotify
+    from sherlock_project.result import QueryStatus
+    from sherlock_project.sites import SitesInformation
+    
+    class StreamingNotify(QueryNotify):
+        def __init__(self, emit: Emit):
+            super().__init__()
+            self.emit = emit
+        
+        def update(self, result):
+            super().update(result)
+            if result.status == QueryStatus.CLAIMED:
+                self.emit(f"[+] {result.site_name}: {result.site_url_user}")
+            else:
+                self.emit(f"[-] {result.site_name}")
+    
+    sites = SitesInformation(os.path.join(os.path.dirname(sherlock_module.__file__), "resources", "data.json"))
+    if hasattr(sites, "remove_nsfw_sites"):
+        # Same default as the CLI without --nsfw
+        sites.remove_nsfw_sites()
+    return {
+        "search": sherlock_module.sherlock,
+        "notify": StreamingNotify,
+        "claimed": QueryStatus.CLAIMED,
+        "unknown": QueryStatus.UNKNOWN,
+        "site_data": {site.name: site.information for site in sites}
+    }
+
+def run_sherlock_engine(engine: Dict[str, Any], params: Dict[str, Any], emit: Emit) -> Dict[str, Any]:
+    """Sherlock search through its Python API, producing the CLI's stdout and files."""
+    username = params["username"]
+    timeout = params.get("timeout", 10000)
+    sites = params.get("sites", [])
+    output_format = params.get("output_format", "csv")
+    if output_format == "xlsx":
+        raise EngineUnsupported("xlsx output requires the CLI")
+    
+    site_data = engine["site_data"]
+    if sites:
+        wanted = {site.lower() for site in sites}
+        site_data = {name: info for name, info in site_data.items() if name.lower() in wanted}
+    skip_hosts = set(params.get("skip_hosts") or [])
+    if skip_hosts:
+        site_data = {name: info for name, info in site_data.items() if url_host(info["url"].replace("{}", username)) not in skip_hosts}
+    results = engine["search"](username, site_data, engine["notify"](emit), timeout=timeout)
+    host_statuses = [
+        outcome for outcome in (
+            host_status(info.get("url_user"), info.get("http_status"), info["status"].status == engine["unknown"])
+            for info in results.values()
+        ) if outcome
+    ]
+    
+    claimed = [(site, info) for site, info in results.items() if info["status"].status == engine["claimed"]]
+    stdout_lines = [f"[*] Checking username {username} on:", ""]
+    stdout_lines += [f"[+] {site}: {info['url_user']}" for site, info in claimed]
+    stdout_lines.append(f"[*] Search completed with {len(claimed)} results")
+    
+    files = [{
+        "filename": f"{username}.txt",
+        "content": "".join(f"{info['url_user']}\n" for _, info in claimed)
+            + f"Total Websites Username Detected On : {len(claimed)}\n"
+    }]
+    if output_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["username", "name", "url_main", "url_user", "exists", "http_status", "response_time_s"])
+        for site, info in claimed:
+            writer.writerow([
+                username, site, info["url_main"], info["url_user"], str(info["status"].status),
+                info["http_status"], getattr(info["status"], "query_time", "")
+            ])
+        files.append({"filename": f"{username}.csv", "content": buffer.getvalue()})
+    return {"success": True, "content": {"stdout": "\n".join(stdout_lines) + "\n", "files": files}, "host_statuses": host_statuses}
+
+def load_maigret_engine() -> Dict[str, Any]:
+    """Import Maigret and parse its site database once."""
+    import logging
+    import maigret
+    from maigret.notify import QueryNotify
+    from maigret.report import save_json_report
+    from maigret.sites import MaigretDatabase
+    
+    class StreamingNotify(QueryNotify):
+        def __init__(self, emit: Emit):
+            super().__init__()
+            self.emit = emit
+        
+        def __getattr__(self, name):
+            # Maigret calls optional hooks (warning, ...) on its notifier
+            return lambda *args, **kwargs: None
+        
+        def update(self, result, is_similar=False):
+            # Status enums print as their value in both old and new releases
+            if str(result.status) == "Claimed":
+                self.emit(f"[+] {result.site_name}: {result.site_url_user}")
+            else:
+                self.emit(f"[-] {result.site_name}")
+    
+    db = MaigretDatabase().load_from_path(os.path.join(os.path.dirname(maigret.__file__), "resources", "data.json"))
+    logger = logging.getLogger("maigret")
+    logger.setLevel(logging.ERROR)
+    return {
+        "search": maigret.search,
+        "save_json_report": save_json_report,
+        "notify": StreamingNotify,
+        # Same site selection as the CLI defaults (top 500 enabled sites)
+        "site_dict": db.ranked_sites_dict(top=500),
+        "logger": logger
+    }
+
+def run_maigret_engine(engine: Dict[str, Any], params: Dict[str, Any], emit: Emit) -> Dict[str, Any]:
+    """Maigret search through its Python API, producing the CLI's ndjson report."""
+    username = params["username"]
+    timeout = params.get("timeout", 10000)
+    site_dict = engine["site_dict"]
+    skip_hosts = set(params.get("skip_hosts") or [])
+    if skip_hosts:
+        site_dict = {name: site for name, site in site_dict.items() if url_host(site.url_main or "") not in skip_hosts}
+    results = asyncio.run(engine["search"](
+        username=username,
+        site_dict=site_dict,
+        logger=engine["logger"],
+        query_notify=engine["notify"](emit),
+        timeout=timeout,
+        id_type="username",
+        is_parsing_enabled=True,
+        no_progressbar=True
+    ))
+    with tempfile.TemporaryDirectory() as temp_dir:
+        report_path = os.path.join(temp_dir, f"report_{username}_ndjson.json")
+        engine["save_json_report"](report_path, username, results, "ndjson")
+        content = Path(report_path).read_text(encoding="utf-8")
+    host_statuses = [
+        outcome for outcome in (
+            host_status(info.get("url_user"), info.get("http_status"), str(getattr(info.get("status"), "status", "")) == "Unknown")
+            for info in results.values() if isinstance(info, dict)
+        ) if outcome
+    ]
+    return {"success": True, "content": content, "host_statuses": host_statuses}
+
+def load_holehe_engine() -> Dict[str, Any]:
+    """Import Holehe and all of its site modules once."""
+    import httpx
+    import trio
+    from holehe.core import get_functions, import_submodules, launch_module
+    
+    class RecordingTransport(httpx.AsyncHTTPTransport):
+        """Records the status each host answers with and refuses the hosts to skip."""
+        
+        def __init__(self, skip_hosts: Set[str], host_statuses: List[Tuple[str, Optional[int]]], **kwargs):
+            super().__init__(**kwargs)
+            self.skip_hosts = skip_hosts
+            self.host_statuses = host_statuses
+        
+        async def handle_async_request(self, request):
+            host = request.url.host
+            if host in self.skip_hosts:
+                # Holehe reports a module whose request fails as rate limited
+                raise httpx.ConnectError(f"{host} skipped: circuit breaker open", request=request)
+            try:
+                response = await super().handle_async_request(request)
+            except httpx.TransportError:
+                self.host_statuses.append((host, None))
+                raise
+            self.host_statuses.append((host, response.status_code))
+            return response
+    
+    return {
+        "httpx": httpx,
+        "transport": RecordingTransport,
+        "trio": trio,
+        "launch_module": launch_module,
+        "websites": get_functions(import_submodules("holehe.modules"))
+    }
+
+def run_holehe_engine(engine: Dict[str, Any], params: Dict[str, Any], emit: Emit) -> Dict[str, Any]:
+    """Holehe check through its Python API, producing CLI-style text output."""
+    email = params["email"]
+    only_used = params.get("only_used", True)
+    timeout = params.get("timeout", 10000)
+    skip_hosts = set(params.get("skip_hosts") or [])
+    host_statuses: List[Tuple[str, Optional[int]]] = []
+    started = time.monotonic()
+    
+    async def check(website, client, out: List[Dict[str, Any]]) -> None:
+        count = len(out)
+        await engine["launch_module"](website, email, client, out)
+        if len(out) > count:
+            # launch_module appends this module's entry last, with no
+            # checkpoint before it returns
+            item = out[-1]
+            mark = "x" if item.get("rateLimit") else "+" if item.get("exists") else "-"
+            emit(f"[{mark}] {item.get('domain', item.get('name'))}")
+    
+    async def check_all() -> List[Dict[str, Any]]:
+        out: List[Dict[str, Any]] = []
+        client = engine["httpx"].AsyncClient(timeout=timeout, transport=engine["transport"](skip_hosts, host_statuses))
+        try:
+            async with engine["trio"].open_nursery() as nursery:
+                for website in engine["websites"]:
+                    nursery.start_soon(check, website, client, out)
+        finally:
+            await client.aclose()
+        return out
+    
+    out = sorted(engine["trio"].run(check_all), key=lambda item: item["name"])
+    lines = [email, ""]
+    for item in out:
+        if item.get("rateLimit"):
+            if not only_used:
+                lines.append(f"[x] {item['domain']}")
+        elif item.get("exists"):
+            extras = [str(item[key]) for key in ("emailrecovery", "phoneNumber", "others") if item.get(key)]
+            lines.append(" / ".join([f"[+] {item['domain']}"] + extras))
+        elif not only_used:
+            lines.append(f"[-] {item['domain']}")
+    lines += ["", f"{len(engine['websites'])} websites checked in {time.monotonic() - started:.2f} seconds"]
+    return {"success": True, "content": "\n".join(lines) + "\n", "host_statuses": host_statuses}
+
+# Engine name -> (loader run once per worker, runner run per call)
+WORKER_ENGINES = {
+    "sherlock": (load_sherlock_engine, run_sherlock_engine),
+    "maigret": (load_maigret_engine, run_maigret_engine),
+    "holehe": (load_holehe_engine, run_holehe_engine),
+}
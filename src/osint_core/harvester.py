@@ -0,0 +1,236 @@
+"""
+theHarvester sources and output parsing.
+
+A search runs one theHarvester process per data source, so a slow or hanging
+source only costs its own time budget. Each run's findings are read from the
+JSON report it writes (its XML report, or its printed sections, when that is
+missing) into typed sets of emails, hosts, IPs, ASNs and URLs, and merged
+across sources. Hosts keep the addresses they resolved to. The merged result
+is sorted and carries a digest of its content, so two searches can be
+compared or cached without looking at theHarvester's text again.
+"""
+
+import hashlib
+import ipaddress
+import json
+import os
+import re
+import xml.etree.ElementTree as ElementTree
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+HARVESTER_DIR = "/opt/theharvester"
+HARVESTER_SCRIPT = f"{HARVESTER_DIR}/theHarvester.py"
+
+# Sources run for "all"
+HARVESTER_SOURCES = [
+    "baidu", "bing", "bingapi", "certspotter", "crtsh", "dnsdumpster", "duckduckgo", "github-code",
+    "google", "hackertarget", "hunter", "linkedin", "linkedin_links", "otx", "pentesttools",
+    "projectdiscovery", "qwant", "rapiddns", "securityTrails", "sublist3r", "threatcrowd",
+    "threatminer", "trello", "twitter", "urlscan", "virustotal", "yahoo"
+]
+
+# Sources that only answer with an API key, and the variable holding it
+SOURCE_API_KEYS = {
+    "bingapi": "BING_API_KEY",
+    "hunter": "HUNTER_API_KEY",
+    "securityTrails": "SECURITYTRAILS_API_KEY",
+    "shodan": "SHODAN_API_KEY"
+}
+
+# Default seconds one source may run
+SOURCE_TIMEOUT_SECONDS = 120
+
+# Sources one search runs at once, so a search over every source leaves
+# theHarvester process slots to other callers
+SOURCES_PER_CALL = max(1, int(os.environ.get("OSINT_HARVESTER_SOURCES_PER_CALL", "2")))
+
+# Report and section names -> the set their entries go to
+ENTITY_KEYS = {
+    "emails": "emails",
+    "hosts": "hosts",
+    "vhosts": "hosts",
+    "ips": "ips",
+    "asns": "asns",
+    "interesting_urls": "interesting_urls",
+    "interesting urls": "interesting_urls",
+    "urls": "urls",
+    "trello_urls": "urls",
+    "trello urls": "urls",
+    "linkedin_links": "urls",
+    "linkedin links": "urls"
+}
+
+# "[*] Emails found: 3" starts a section, "[*] No emails found." an empty one
+SECTION_HEADER = re.compile(r"^\[\*\]\s+(.+?)\s+found:\s*\d+", re.IGNORECASE)
+
+def select_sources(sources: Optional[str]) -> List[str]:
+    """The sources of a comma-separated list, in order and without repeats; "all" for every source."""
+    names = [name.strip() for name in (sources or "all").split(",") if name.strip()]
+    if not names or "all" in names:
+        return list(HARVESTER_SOURCES)
+    return list(dict.fromkeys(names))
+
+def parse_sections(text: str) -> Dict[str, List[str]]:
+    """Lines of each "... found: N" section of theHarvester's output, keyed by the lowercased section name."""
+    sections: Dict[str, List[str]] = {}
+    current: Optional[List[str]] = None
+    for line in text.splitlines():
+        line = line.strip()
+        header = SECTION_HEADER.match(line)
+        if header:
+            current = sections.setdefault(header.group(1).lower(), [])
+        elif line.startswith("[*]") or line.startswith("*"):
+            current = None
+        elif current is not None and line and not set(line) <= {"-"}:
+            current.append(line)
+    return sections
+
+def is_address(value: str) -> bool:
+    """Whether value is a bare IPv4 or IPv6 address."""
+    try:
+        ipaddress.ip_address(value)
+    except ValueError:
+        return False
+    return True
+
+def address_order(address: str):
+    """Sort key for IP addresses: IPv4 first, then numerically."""
+    parsed = ipaddress.ip_address(address)
+    return parsed.version, parsed
+
+class HarvesterFindings:
+    """Deduplicated emails, hosts with their addresses, IPs, ASNs and URLs."""
+    
+    def __init__(self):
+        self.emails: Set[str] = set()
+        # Host name -> the addresses it resolved to, if any
+        self.hosts: Dict[str, Set[str]] = {}
+        self.ips: Set[str] = set()
+        self.asns: Set[str] = set()
+        self.urls: Set[str] = set()
+        self.interesting_urls: Set[str] = set()
+    
+    def add(self, key: str, value: str) -> None:
+        """Add one entry of a report or section, normalized for its kind."""
+        value = value.strip()
+        if not value:
+            return
+        if key == "emails":
+            if "@" in value:
+                self.emails.add(value.lower())
+        elif key == "hosts":
+            if is_address(value):
+                # Some sources list bare addresses among the hosts
+                self.add_host(None, [value])
+                return
+            # Resolved hosts are written as host:ip[, ip...]
+            host, _, addresses = value.partition(":")
+            self.add_host(host, addresses.split(","))
+        elif key == "ips":
+            self.add_host(None, [value])
+        elif key == "asns":
+            number = value.upper().removeprefix("AS")
+            if number.isdigit():
+                self.asns.add(f"AS{number}")
+        elif key in ("urls", "interesting_urls"):
+            getattr(self, key).add(value)
+    
+    def add_host(self, host: Optional[str], addresses: Iterable[str]) -> None:
+        """Add a host name and the addresses it resolved to; either may be missing."""
+        valid = set()
+        for address in addresses:
+            try:
+                valid.add(str(ipaddress.ip_address(address.strip())))
+            except ValueError:
+                continue
+        self.ips |= valid
+        host = (host or "").strip().lower().rstrip(".")
+        if host and host not in valid:
+            self.hosts.setdefault(host, set()).update(valid)
+    
+    def merge(self, other: "HarvesterFindings") -> None:
+        self.emails |= other.emails
+        for host, addresses in other.hosts.items():
+            self.hosts.setdefault(host, set()).update(addresses)
+        self.ips |= other.ips
+        self.asns |= other.asns
+        self.urls |= other.urls
+        self.interesting_urls |= other.interesting_urls
+    
+    def counts(self) -> Dict[str, int]:
+        return {
+            "emails": len(self.emails),
+            "hosts": len(self.hosts),
+            "ips": len(self.ips),
+            "asns": len(self.asns),
+            "urls": len(self.urls),
+            "interesting_urls": len(self.interesting_urls)
+        }
+    
+    def result(self) -> Dict[str, Any]:
+        """Sorted entity lists, the addresses of resolved hosts and a digest of both.
+        
+        Hosts are a plain sorted list; only hosts that resolved appear in
+        resolutions, so tens of thousands of subdomains stay compact. The
+        digest covers every entity, so equal digests mean equal findings.
+        """
+        entities = {
+            "emails": sorted(self.emails),
+            "hosts": sorted(self.hosts),
+            "resolutions": {host: sorted(addresses, key=address_order) for host, addresses in sorted(self.hosts.items()) if addresses},
+            "ips": sorted(self.ips, key=address_order),
+            "asns": sorted(self.asns, key=lambda asn: int(asn[2:])),
+            "urls": sorted(self.urls),
+            "interesting_urls": sorted(self.interesting_urls)
+        }
+        canonical = json.dumps(entities, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        return dict(entities, counts=self.counts(), digest=hashlib.blake2b(canonical, digest_size=16).hexdigest())
+
+def parse_harvester_output(text: str) -> HarvesterFindings:
+    """Findings in the sections one run printed."""
+    findings = HarvesterFindings()
+    for name, lines in parse_sections(text).items():
+        key = ENTITY_KEYS.get(name)
+        if key:
+            for line in lines:
+                findings.add(key, line)
+    return findings
+
+def parse_json_report(text: str) -> HarvesterFindings:
+    """Findings in a report written by `-f`, e.g. {"hosts": ["www.example.com:93.184.216.34"], ...}."""
+    report = json.loads(text)
+    if not isinstance(report, dict):
+        raise ValueError("theHarvester JSON report is not an object")
+    findings = HarvesterFindings()
+    for name, entries in report.items():
+        key = ENTITY_KEYS.get(name)
+        if key and isinstance(entries, list):
+            for entry in entries:
+                if isinstance(entry, str):
+                    findings.add(key, entry)
+    return findings
+
+def parse_xml_report(text: str) -> HarvesterFindings:
+    """Findings in an XML report, where resolved hosts are <host><ip/><hostname/></host>."""
+    root = ElementTree.fromstring(text)
+    findings = HarvesterFindings()
+    for element in root:
+        if element.tag == "host" and element.find("hostname") is not None:
+            findings.add_host(element.findtext("hostname"), (element.findtext("ip") or "").split(","))
+        elif element.tag in ("email", "host", "vhost", "ip", "asn", "url", "interesting_url"):
+            findings.add(ENTITY_KEYS.get(f"{element.tag}s", ""), element.text or "")
+    return findings
+
+def parse_harvester_run(report_base: Path, stdout: str) -> HarvesterFindings:
+    """Findings of one run: from the report written with `-f report_base`, else from its output.
+    
+    A run stopped early writes no report, but may have printed sections.
+    """
+    for suffix, parse in ((".json", parse_json_report), (".xml", parse_xml_report)):
+        path = report_base.with_suffix(suffix)
+        try:
+            return parse(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError, ElementTree.ParseError):
+            continue
+    return parse_harvester_output(stdout)
@@ -0,0 +1,202 @@
+"""
+Per-host rate limits and circuit breakers shared by every probe engine.
+
+The username and email probers, and the warm workers through their results,
+all report to HOST_GUARD. Each target host gets a token bucket that spaces
+requests to its budget, and a circuit breaker that stops sending requests to
+a host that keeps answering with rate limits or errors, so concurrent
+searches do not hammer one platform into soft-banning the server and turn
+its 429s into false negatives.
+"""
+
+import asyncio
+import os
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Default requests per second to one host; 0 disables the limit
+HOST_RATE = float(os.environ.get("OSINT_HOST_RATE", "10"))
+
+# Per-host budgets overriding HOST_RATE, e.g. "github.com=5,api.twitter.com=0.5".
+# A budget also applies to the subdomains of its host.
+HOST_BUDGETS_SETTING = os.environ.get("OSINT_HOST_BUDGETS")
+
+# Failed answers in a row that open a host's breaker, and seconds it stays open
+BREAKER_FAILURES = max(1, int(os.environ.get("OSINT_BREAKER_FAILURES", "5")))
+BREAKER_COOLDOWN_SECONDS = float(os.environ.get("OSINT_BREAKER_COOLDOWN", "60"))
+
+# Answers that say the host is throttling or failing rather than answering
+FAILURE_STATUSES = {429, 502, 503, 504}
+
+# Breakers listed by stats(), worst first
+STATS_MAX_HOSTS = 50
+
+def parse_host_budgets(value: Optional[str]) -> Dict[str, float]:
+    """Parse "host=rate,host=rate" requests-per-second budgets."""
+    budgets: Dict[str, float] = {}
+    if not value:
+        return budgets
+    for item in value.split(","):
+        host, _, rate = item.partition("=")
+        try:
+            budgets[host.strip().lower()] = float(rate)
+        except ValueError:
+            print(f"Ignoring invalid host budget: {item!r}", file=sys.stderr)
+    return budgets
+
+class TokenBucket:
+    """Spaces requests to rate per second, allowing bursts of up to burst."""
+    
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+    
+    def take(self) -> float:
+        """Take a token; return the seconds to wait before using it.
+        
+        Tokens may go negative, so concurrent callers queue up behind each
+        other in the order they asked.
+        """
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+class CircuitBreaker:
+    """Closed, open or half-open state of one host.
+    
+    threshold failures in a row open the breaker. Once cooldown seconds
+    have passed it lets one trial request through (half-open): a success
+    closes it again, a failure reopens it.
+    """
+    
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self.opened = 0
+        self.opened_at = 0.0
+        self.trial_started: Optional[float] = None
+    
+    def allow(self) -> bool:
+        now = time.monotonic()
+        if self.state == "open":
+            if now - self.opened_at < self.cooldown:
+                return False
+            self.state = "half_open"
+            self.trial_started = None
+        if self.state == "half_open":
+            # A trial that never reported back (cancelled) does not block forever
+            if self.trial_started is not None and now - self.trial_started < self.cooldown:
+                return False
+            self.trial_started = now
+        return True
+    
+    def record(self, ok: bool) -> None:
+        if ok:
+            self.state = "closed"
+            self.failures = 0
+            self.trial_started = None
+            return
+        self.failures += 1
+        if self.state == "half_open" or (self.state == "closed" and self.failures >= self.threshold):
+            self.state = "open"
+            self.opened += 1
+            self.opened_at = time.monotonic()
+            self.trial_started = None
+    
+    def retry_in(self) -> float:
+        if self.state != "open":
+            return 0.0
+        return max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+
+class HostGuard:
+    """Token bucket and circuit breaker per target host."""
+    
+    def __init__(self, rate: float = HOST_RATE, budgets: Optional[Dict[str, float]] = None, failures: int = BREAKER_FAILURES, cooldown: float = BREAKER_COOLDOWN_SECONDS):
+        self.rate = rate
+        self.budgets = budgets if budgets is not None else parse_host_budgets(HOST_BUDGETS_SETTING)
+        self.failures = failures
+        self.cooldown = cooldown
+        self._hosts: Dict[str, Tuple[TokenBucket, CircuitBreaker]] = {}
+        self.counters = {"requests": 0, "delayed": 0, "rejected": 0, "failures": 0}
+    
+    def budget(self, host: str) -> float:
+        """Requests per second for host: its own budget, its closest parent domain's, or the default."""
+        labels = host.split(".")
+        for start in range(len(labels)):
+            rate = self.budgets.get(".".join(labels[start:]))
+            if rate is not None:
+                return rate
+        return self.rate
+    
+    def _host(self, host: str) -> Tuple[TokenBucket, CircuitBreaker]:
+        entry = self._hosts.get(host)
+        if entry is None:
+            rate = self.budget(host)
+            entry = self._hosts[host] = (TokenBucket(rate, max(1.0, rate)), CircuitBreaker(self.failures, self.cooldown))
+        return entry
+    
+    async def acquire(self, host: Optional[str]) -> bool:
+        """Wait for host's rate limit; False without waiting if its breaker is open."""
+        if not host:
+            return True
+        bucket, breaker = self._host(host.lower())
+        if not breaker.allow():
+            self.counters["rejected"] += 1
+            return False
+        wait = bucket.take()
+        if wait > 0:
+            self.counters["delayed"] += 1
+            await asyncio.sleep(wait)
+            # The breaker may have opened while this request waited its turn
+            if breaker.state == "open":
+                self.counters["rejected"] += 1
+                return False
+        self.counters["requests"] += 1
+        return True
+    
+    def record(self, host: Optional[str], status: Optional[int]) -> None:
+        """Report an answer from host; None stands for a timeout or connection error."""
+        if not host:
+            return
+        ok = status is not None and status not in FAILURE_STATUSES
+        if not ok:
+            self.counters["failures"] += 1
+        self._host(host.lower())[1].record(ok)
+    
+    def record_many(self, outcomes: Iterable[Tuple[str, Optional[int]]]) -> None:
+        """Report answers seen by another process, e.g. a warm worker's search."""
+        for host, status in outcomes:
+            self.record(host, status)
+    
+    def open_hosts(self) -> List[str]:
+        """Hosts whose breaker currently rejects requests."""
+        return sorted(host for host, (_, breaker) in self._hosts.items() if breaker.state == "open" and breaker.retry_in() > 0)
+    
+    def stats(self) -> Dict[str, Any]:
+        troubled = [(host, breaker) for host, (_, breaker) in self._hosts.items() if breaker.state != "closed" or breaker.failures]
+        troubled.sort(key=lambda item: (item[1].state == "closed", -item[1].failures))
+        return dict(
+            self.counters,
+            hosts=len(self._hosts),
+            rate=self.rate,
+            budgets=self.budgets,
+            breaker_failures=self.failures,
+            breaker_cooldown=self.cooldown,
+            open=len(self.open_hosts()),
+            breakers={
+                host: {"state": breaker.state, "failures": breaker.failures, "opened": breaker.opened, "retry_in": round(breaker.retry_in(), 1)}
+                for host, breaker in troubled[:STATS_MAX_HOSTS]
+            }
+        )
+
+# Shared by every engine, so budgets and breakers hold across concurrent calls
+HOST_GUARD = HostGuard()
@@ -0,0 +1,234 @@
+"""
+Per-site response latency, learned from the probes the server sends.
+
+Each site keeps its recent response times and whether its recent requests
+answered at all. A site's timeout is a high percentile of its own latency
+times a safety margin, so one dead or slow site no longer holds a search
+open for the caller's full timeout; sites that mostly fail get a short one.
+Latencies are kept in SQLite next to the result cache, so what was learned
+survives restarts.
+"""
+
+import asyncio
+import json
+import math
+import os
+import sqlite3
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, Optional, Set
+
+LATENCY_DB_PATH = os.environ.get("OSINT_LATENCY_DB", "/app/reports/osint_latency.sqlite3")
+
+# A site's timeout is this percentile of its latency times the margin,
+# never below LATENCY_MIN_TIMEOUT_SECONDS nor above the caller's timeout
+LATENCY_PERCENTILE = float(os.environ.get("OSINT_LATENCY_PERCENTILE", "95"))
+LATENCY_MARGIN = float(os.environ.get("OSINT_LATENCY_MARGIN", "2.0"))
+LATENCY_MIN_TIMEOUT_SECONDS = 2.0
+
+# Latencies and outcomes remembered per site; fewer samples than the minimum
+# leave the caller's timeout in place
+LATENCY_SAMPLES = 50
+OUTCOME_SAMPLES = 20
+LATENCY_MIN_SAMPLES = 5
+
+# A site whose recent requests failed at least this often gets the minimum
+# timeout, except every FAILING_RECHECK_EVERY-th request, which gets the
+# caller's timeout so a site that came back slower than before can recover
+DEAD_SITE_FAILURE_RATIO = 0.5
+FAILING_RECHECK_EVERY = 10
+
+# Seconds after a first unsaved record before the history is written, so a
+# killed server loses at most this much of what it learned
+LATENCY_FLUSH_SECONDS = 30.0
+
+# Latencies across all sites, for tools that take a single timeout (the CLIs)
+OVERALL_SAMPLES = 2000
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+class SiteLatency:
+    """Recent latencies and outcomes of one site."""
+    
+    def __init__(self, latencies: Optional[List[float]] = None, outcomes: Optional[List[bool]] = None):
+        self.latencies: Deque[float] = deque(latencies or [], maxlen=LATENCY_SAMPLES)
+        self.outcomes: Deque[bool] = deque(outcomes or [], maxlen=OUTCOME_SAMPLES)
+        self.shortened = 0
+    
+    @property
+    def failing(self) -> bool:
+        if len(self.outcomes) < LATENCY_MIN_SAMPLES:
+            return False
+        return self.outcomes.count(False) / len(self.outcomes) >= DEAD_SITE_FAILURE_RATIO
+
+class LatencyTracker:
+    """Per-site latency history with a persistent SQLite copy.
+    
+    Lookups and records are in memory. The database is read once, and
+    changed sites are written back by flush(), on one dedicated thread like
+    the result cache. Without a usable database the history is memory-only.
+    """
+    
+    def __init__(self, db_path: Optional[str]):
+        self.db_path = db_path
+        self._sites: Dict[str, SiteLatency] = {}
+        self._overall: Deque[float] = deque(maxlen=OVERALL_SAMPLES)
+        self._dirty: Set[str] = set()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_failed = not db_path
+        self._loaded: Optional[asyncio.Future] = None
+        self._flush_timer: Optional[asyncio.TimerHandle] = None
+        self._flushing: Optional[asyncio.Future] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="osint-latency")
+        self.counters = {"records": 0, "timeouts": 0, "adapted": 0, "hedges": 0, "hedge_wins": 0}
+    
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._db is None and not self._db_failed:
+            try:
+                os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+                db = sqlite3.connect(self.db_path)
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS site_latency ("
+                    "key TEXT PRIMARY KEY, latencies TEXT NOT NULL, outcomes TEXT NOT NULL, updated REAL NOT NULL)"
+                )
+                db.commit()
+                self._db = db
+            except (OSError, sqlite3.Error) as e:
+                self._db_failed = True
+                print(f"Latency history: persistence disabled ({self.db_path}: {e})", file=sys.stderr)
+        return self._db
+    
+    def _read_all(self) -> List[tuple]:
+        db = self._connect()
+        if db is None:
+            return []
+        return db.execute("SELECT key, latencies, outcomes FROM site_latency").fetchall()
+    
+    def _write(self, rows: List[tuple]) -> None:
+        db = self._connect()
+        if db is None:
+            return
+        db.executemany("INSERT OR REPLACE INTO site_latency (key, latencies, outcomes, updated) VALUES (?, ?, ?, ?)", rows)
+        db.commit()
+    
+    async def load(self) -> None:
+        """Read the stored history once; later calls return immediately."""
+        if self._loaded is None:
+            self._loaded = asyncio.ensure_future(self._load())
+        await asyncio.shield(self._loaded)
+    
+    async def _load(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            rows = await loop.run_in_executor(self._executor, self._read_all)
+        except sqlite3.Error as e:
+            print(f"Latency history read failed: {e}", file=sys.stderr)
+            return
+        for key, latencies, outcomes in rows:
+            if key in self._sites:
+                continue
+            try:
+                site = SiteLatency(json.loads(latencies), json.loads(outcomes))
+            except ValueError:
+                continue
+            self._sites[key] = site
+            self._overall.extend(site.latencies)
+    
+    async def flush(self) -> None:
+        """Write the sites recorded since the last flush.
+        
+        Runs after every probe and LATENCY_FLUSH_SECONDS after the first
+        unsaved record.
+        """
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        if not self._dirty:
+            return
+        now = time.time()
+        rows = [
+            (key, json.dumps(list(self._sites[key].latencies)), json.dumps(list(self._sites[key].outcomes)), now)
+            for key in self._dirty
+        ]
+        self._dirty.clear()
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._executor, self._write, rows)
+        except sqlite3.Error as e:
+            print(f"Latency history write failed: {e}", file=sys.stderr)
+    
+    def record(self, key: str, seconds: Optional[float]) -> None:
+        """Record a response time for key; None for a request that timed out or failed."""
+        site = self._sites.get(key)
+        if site is None:
+            site = self._sites[key] = SiteLatency()
+        site.outcomes.append(seconds is not None)
+        if seconds is None:
+            self.counters["timeouts"] += 1
+        else:
+            site.latencies.append(round(seconds, 3))
+            self._overall.append(seconds)
+        self.counters["records"] += 1
+        self._dirty.add(key)
+        if self._flush_timer is None:
+            try:
+                self._flush_timer = asyncio.get_running_loop().call_later(LATENCY_FLUSH_SECONDS, self._flush_later)
+            except RuntimeError:
+                # No event loop (e.g. a script); flush() writes the history
+                pass
+    
+    def _flush_later(self) -> None:
+        self._flush_timer = None
+        self._flushing = asyncio.ensure_future(self.flush())
+    
+    def timeout_for(self, key: str, default: float) -> float:
+        """Timeout for one request to key, at most default."""
+        site = self._sites.get(key)
+        if site is None:
+            return default
+        if site.failing:
+            site.shortened += 1
+            if site.shortened % FAILING_RECHECK_EVERY == 0:
+                return default
+            timeout = LATENCY_MIN_TIMEOUT_SECONDS
+        elif len(site.latencies) >= LATENCY_MIN_SAMPLES:
+            timeout = max(LATENCY_MIN_TIMEOUT_SECONDS, percentile(list(site.latencies), LATENCY_PERCENTILE) * LATENCY_MARGIN)
+        else:
+            return default
+        if timeout < default:
+            self.counters["adapted"] += 1
+            return timeout
+        return default
+    
+    def hedge_delay(self, key: str, pct: float) -> Optional[float]:
+        """Seconds after which a request to key is slower than pct percent of its answers."""
+        site = self._sites.get(key)
+        if site is None or site.failing or len(site.latencies) < LATENCY_MIN_SAMPLES:
+            return None
+        return percentile(list(site.latencies), pct)
+    
+    def overall_timeout(self, default: float) -> float:
+        """One timeout for a tool that checks many sites, learned across all of them."""
+        if len(self._overall) < LATENCY_MIN_SAMPLES * 10:
+            return default
+        return min(default, max(LATENCY_MIN_TIMEOUT_SECONDS, percentile(list(self._overall), LATENCY_PERCENTILE) * LATENCY_MARGIN))
+    
+    def stats(self) -> Dict[str, Any]:
+        failing = sorted(key for key, site in self._sites.items() if site.failing)
+        return dict(
+            self.counters,
+            sites=len(self._sites),
+            failing_sites=len(failing),
+            overall_p95=round(percentile(list(self._overall), 95), 2) if self._overall else None,
+            persistent=self._db is not None or not self._db_failed
+        )
+
+# Shared by every probe, so each call benefits from what earlier calls saw
+LATENCY = LatencyTracker(LATENCY_DB_PATH)
@@ -0,0 +1,296 @@
+"""
+Native asyncio username prober.
+
+Probes the merged Sherlock, Maigret and WhatsMyName site list in one pass,
+for one username or a batch of them. All calls share one aiohttp session,
+so connections to popular hosts are kept alive and reused across sites,
+usernames and calls, and per-host limits apply to the whole server rather
+than to each tool run. Each site's timeout is learned from its latency, and
+a slow answer from a valuable site is hedged with a second request.
+"""
+
+import asyncio
+import os
+import re
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+from .hostguard import HOST_GUARD
+from .latency import LATENCY
+from .sites import DEFAULT_HEADERS, USERNAME, Site
+
+# Connections open at once across all probes, and per host
+PROBE_MAX_CONNECTIONS = int(os.environ.get("OSINT_PROBE_CONNECTIONS", "100"))
+PROBE_CONNECTIONS_PER_HOST = int(os.environ.get("OSINT_PROBE_CONNECTIONS_PER_HOST", "4"))
+
+# Verify the TLS certificates of probed sites; set OSINT_PROBE_VERIFY_TLS=0
+# to also probe sites with broken certificates (their answers are then
+# trusted without knowing who sent them)
+PROBE_VERIFY_TLS = os.environ.get("OSINT_PROBE_VERIFY_TLS", "1").lower() not in ("0", "false", "no")
+
+# Default seconds to connect to a site and between reads of its response
+PROBE_TIMEOUT_SECONDS = 15
+
+# Response bytes read for text checks; markers past this are not seen
+PROBE_MAX_BODY_BYTES = 1024 * 1024
+
+# Statuses that say nothing about the username (rate limits, server errors)
+INCONCLUSIVE_STATUSES = {429} | set(range(500, 600))
+
+# A site listed by several databases, or among Maigret's top HEDGE_TOP_RANK,
+# gets a second request once its answer is slower than HEDGE_PERCENTILE
+# percent of the answers it gave before
+HEDGE_TOP_RANK = 100
+HEDGE_PERCENTILE = 90
+
+# Username separators and camelCase boundaries used to build variants
+SEPARATORS = re.compile(r"[._\-\s]+")
+WORDS = re.compile(r"[A-Z]?[a-z]+\d*|[A-Z]+(?![a-z])\d*|\d+")
+
+class CircuitOpen(Exception):
+    """The target host's circuit breaker is open; no request was sent."""
+
+def worth_hedging(site: Site) -> bool:
+    return len(site.sources) > 1 or (site.rank is not None and site.rank < HEDGE_TOP_RANK)
+
+class UsernameProber:
+    """Probes sites for a username over one shared aiohttp session."""
+    
+    def __init__(self, max_connections: int = PROBE_MAX_CONNECTIONS, per_host: int = PROBE_CONNECTIONS_PER_HOST):
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self._session = None
+        self._regexes: Dict[str, Optional[re.Pattern]] = {}
+        self.counters = {"probes": 0, "requests": 0, "errors": 0}
+    
+    def _client(self):
+        # Imported here so the server runs without aiohttp when the prober is unused
+        import aiohttp
+        
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.per_host, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector, headers=DEFAULT_HEADERS, cookie_jar=aiohttp.DummyCookieJar())
+        return self._session
+    
+    def _username_fits(self, site: Site, username: str) -> bool:
+        if not site.regex:
+            return True
+        if site.regex not in self._regexes:
+            try:
+                self._regexes[site.regex] = re.compile(site.regex)
+            except re.error:
+                # Some patterns use syntax Python does not support
+                self._regexes[site.regex] = None
+        pattern = self._regexes[site.regex]
+        return pattern is None or pattern.search(username) is not None
+    
+    async def _fetch(self, site: Site, url: str, payload: Optional[str], timeout: float) -> Tuple[int, str]:
+        """Send one request; return the status and the body if the site's check needs it."""
+        import aiohttp
+        
+        host = urlsplit(url).hostname
+        if not await HOST_GUARD.acquire(host):
+            raise CircuitOpen(host)
+        self.counters["requests"] += 1
+        started = time.monotonic()
+        try:
+            async with self._client().request(
+                site.method,
+                url,
+                data=payload.encode("utf-8") if payload else None,
+                headers=site.headers or None,
+                allow_redirects=site.follow_redirects,
+                timeout=aiohttp.ClientTimeout(total=None, sock_connect=timeout, sock_read=timeout),
+                ssl=PROBE_VERIFY_TLS
+            ) as response:
+                status = response.status
+                body = ""
+                if site.needs_body and site.method != "HEAD":
+                    raw = await response.content.read(PROBE_MAX_BODY_BYTES)
+                    body = raw.decode(response.charset or "utf-8", errors="ignore")
+        except (aiohttp.ClientError, asyncio.TimeoutError, LookupError, ValueError):
+            self.counters["errors"] += 1
+            HOST_GUARD.record(host, None)
+            LATENCY.record(site.key, None)
+            raise
+        HOST_GUARD.record(host, status)
+        LATENCY.record(site.key, time.monotonic() - started)
+        return status, body
+    
+    async def _hedged_fetch(self, site: Site, url: str, payload: Optional[str], timeout: float) -> Tuple[int, str]:
+        """_fetch, plus a second request if the first is slower than usual; the first answer wins."""
+        delay = LATENCY.hedge_delay(site.key, HEDGE_PERCENTILE)
+        if delay is None or delay >= timeout:
+            return await self._fetch(site, url, payload, timeout)
+        first = asyncio.ensure_future(self._fetch(site, url, payload, timeout))
+        second = None
+        try:
+            done, _ = await asyncio.wait({first}, timeout=delay)
+            if done:
+                return first.result()
+            LATENCY.counters["hedges"] += 1
+            second = asyncio.ensure_future(self._fetch(site, url, payload, timeout))
+            pending = {first, second}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            LATENCY.counters["hedge_wins"] += 1
+                        return task.result()
+            # Both failed; report the original request's error
+            return first.result()
+        finally:
+            first.cancel()
+            if second is not None:
+                second.cancel()
+    
+    async def probe_site(self, site: Site, username: str, timeout: float) -> Dict[str, Any]:
+        """Check one site; the result's state is claimed, available, unknown or skipped."""
+        import aiohttp
+        
+        if not self._username_fits(site, username):
+            return {"state": "skipped"}
+        quoted = quote(username, safe="")
+        url = site.probe_url.replace(USERNAME, quoted)
+        payload = site.payload.replace(USERNAME, username) if site.payload else None
+        timeout = LATENCY.timeout_for(site.key, timeout)
+        fetch = self._hedged_fetch if worth_hedging(site) else self._fetch
+        try:
+            status, body = await fetch(site, url, payload, timeout)
+        except CircuitOpen:
+            return {"state": "unknown", "error": "CircuitOpen"}
+        except (aiohttp.ClientError, asyncio.TimeoutError, LookupError, ValueError) as e:
+            return {"state": "unknown", "error": type(e).__name__}
+        if status in INCONCLUSIVE_STATUSES:
+            return {"state": "unknown", "http_status": status}
+        state = "claimed" if site.is_claimed(status, body) else "available"
+        return {"state": state, "http_status": status, "url": site.url.replace(USERNAME, quoted)}
+    
+    async def probe(self, username: str, sites: List[Site], timeout: float = PROBE_TIMEOUT_SECONDS, on_result: Optional[Callable[[Site, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Probe every site concurrently and summarize the results.
+        
+        As in probe_batch, a fixed set of workers takes the sites one by
+        one. on_result is called with each site and its result as soon as
+        it is known, so progress can be streamed and partial results kept.
+        """
+        self.counters["probes"] += 1
+        started = time.monotonic()
+        await LATENCY.load()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(sites)
+        indexed = iter(enumerate(sites))
+        
+        async def worker() -> None:
+            for index, site in indexed:
+                result = await self.probe_site(site, username, timeout)
+                results[index] = result
+                if on_result is not None:
+                    on_result(site, result)
+        
+        try:
+            await asyncio.gather(*[worker() for _ in range(min(self.max_connections, len(sites)))])
+        finally:
+            # Also keeps what was learned when the probe is cancelled at its deadline
+            await asyncio.shield(LATENCY.flush())
+        summary = summarize(username, list(zip(sites, results)))
+        summary["stats"]["elapsed_seconds"] = round(time.monotonic() - started, 2)
+        return summary
+    
+    async def probe_batch(self, usernames: List[str], sites: List[Site], timeout: float = PROBE_TIMEOUT_SECONDS, on_result: Optional[Callable[[str, Site, Dict[str, Any]], None]] = None) -> Dict[str, List[Tuple[Site, Dict[str, Any]]]]:
+        """Probe every site for every username and return the results per username.
+        
+        The username x site pairs are fed to a fixed set of workers, one
+        username after another. Consecutive probes therefore go to different
+        hosts, the per-host limits rarely make a worker wait, and each
+        username finishes (and can be reported) before the last one starts.
+        """
+        self.counters["probes"] += 1
+        await LATENCY.load()
+        results: Dict[str, List[Tuple[Site, Dict[str, Any]]]] = {username: [] for username in usernames}
+        pairs = ((username, site) for username in usernames for site in sites)
+        
+        async def worker() -> None:
+            # The generator is shared; next() never awaits, so each pair is taken once
+            for username, site in pairs:
+                result = await self.probe_site(site, username, timeout)
+                results[username].append((site, result))
+                if on_result is not None:
+                    on_result(username, site, result)
+        
+        try:
+            await asyncio.gather(*[worker() for _ in range(min(self.max_connections, len(usernames) * len(sites)))])
+        finally:
+            await asyncio.shield(LATENCY.flush())
+        return results
+    
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
+    def stats(self) -> Dict[str, Any]:
+        return dict(self.counters, max_connections=self.max_connections, connections_per_host=self.per_host)
+
+def summarize(username: str, results: List[Any]) -> Dict[str, Any]:
+    """Group (site, result) pairs into hits and per-state counts."""
+    claimed = []
+    unknown = []
+    counts = {"claimed": 0, "available": 0, "unknown": 0, "skipped": 0}
+    for site, result in results:
+        counts[result["state"]] += 1
+        if result["state"] == "claimed":
+            claimed.append({"site": site.name, "url": result["url"], "sources": list(site.sources), "http_status": result["http_status"]})
+        elif result["state"] == "unknown":
+            unknown.append(site.name)
+    claimed.sort(key=lambda hit: hit["site"].lower())
+    return {
+        "username": username,
+        "claimed": claimed,
+        "unknown": sorted(unknown, key=str.lower),
+        "stats": dict(counts, sites=len(results))
+    }
+
+def username_variants(username: str, limit: int = 3) -> List[str]:
+    """Common spellings of a handle: lower case, separators joined or swapped, digits dropped.
+    
+    "John.Doe90" gives johndoe90, john_doe90, john.doe90, ... up to limit
+    variants, never including the username itself.
+    """
+    base = username.strip()
+    parts = [part for part in SEPARATORS.split(base) if part]
+    if len(parts) == 1:
+        parts = WORDS.findall(parts[0]) or parts
+    words = [part.lower() for part in parts]
+    candidates = [base.lower()]
+    if len(words) > 1:
+        candidates += ["".join(words), "_".join(words), ".".join(words), "-".join(words), words[0][0] + "".join(words[1:])]
+    without_digits = base.rstrip("0123456789")
+    if without_digits and without_digits != base:
+        candidates += username_variants(without_digits, limit) + [without_digits]
+    variants = []
+    for candidate in candidates:
+        if candidate and candidate != base and candidate not in variants:
+            variants.append(candidate)
+    return variants[:limit]
+
+def expand_usernames(usernames: Iterable[str], variants: bool = False, limit: int = 3) -> Tuple[List[str], Dict[str, List[str]]]:
+    """Deduplicated usernames, optionally with their variants appended.
+    
+    Returns the usernames to probe and, per requested username, the variants
+    that were added for it.
+    """
+    expanded: List[str] = []
+    added: Dict[str, List[str]] = {}
+    for username in usernames:
+        username = username.strip()
+        if username and username not in expanded:
+            expanded.append(username)
+    if variants:
+        for username in list(expanded):
+            added[username] = [variant for variant in username_variants(username, limit) if variant not in expanded]
+            expanded.extend(added[username])
+    return expanded, added
+
+# Shared by every call, so connections are pooled server-wide
+PROBER = UsernameProber()
@@ -0,0 +1,389 @@
+"""
+Tool subprocess execution.
+
+run_command_in_venv starts a tool in its own process group, enforces its
+deadline, kills the whole group on timeout or cancellation, and captures its
+output with bounded memory.
+"""
+
+import asyncio
+import codecs
+import math
+import os
+import signal
+import tempfile
+import sys
+from typing import Any, Callable, Dict, List, Optional
+
+from .registry import InvalidParams
+from .results import RESULT_STORE
+from .scheduler import SCHEDULER
+
+# Hard wall-clock limits in seconds for one tool process, keyed by process
+# name. Unlike the tools' own `timeout` options these are enforced by the
+# server: when a deadline passes the whole process group is killed. Defaults
+# come from the tool specs; override with OSINT_TOOL_DEADLINES="spiderfoot=7200"
+# or per call with the `max_runtime` argument.
+TOOL_DEADLINES: Dict[str, int] = {}
+
+# Seconds a process group gets to exit after SIGTERM before it is SIGKILLed
+KILL_GRACE_SECONDS = 5.0
+
+# Seconds to wait for remaining pipe output once the main process has exited
+PIPE_DRAIN_SECONDS = 2.0
+
+def resolve_deadline(tool: str, params: Dict[str, Any]) -> Optional[float]:
+    """Return the wall-clock deadline in seconds for one call of tool.
+    
+    The call's max_runtime, when given, must be a positive number of seconds
+    (or a string holding one); anything else raises InvalidParams.
+    """
+    value = params.get("max_runtime")
+    if value is None:
+        default = TOOL_DEADLINES.get(tool)
+        return float(default) if default else None
+    if isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            pass
+    # bool is an int subclass, but true is not a number of seconds
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) or value <= 0:
+        raise InvalidParams("max_runtime must be a positive number of seconds")
+    return float(value)
+
+def timeout_result(tool_label: str, deadline: Optional[float], partial_output: Any, stderr: str) -> Dict[str, Any]:
+    """Build the result for a call whose process was killed at its deadline.
+    
+    partial_output is the raw output of a CLI, or for handlers that build
+    structured results, what they had found so far in the shape of their
+    "content".
+    """
+    return {
+        "success": False,
+        "timed_out": True,
+        "error": f"{tool_label} exceeded its {deadline:g}s deadline and was terminated",
+        "partial_output": partial_output,
+        "stderr": stderr
+    }
+
+async def wait_for_exit(process: asyncio.subprocess.Process) -> None:
+    """Wait until the process itself has exited.
+    
+    process.wait() also waits for the stdout/stderr pipes to close, which never
+    happens while a grandchild keeps them open, so the return code is polled too.
+    """
+    waiter = asyncio.ensure_future(process.wait())
+    delay = 0.05
+    try:
+        while not waiter.done() and process.returncode is None:
+            await asyncio.wait([waiter], timeout=delay)
+            delay = min(delay * 2, 1.0)
+    finally:
+        waiter.cancel()
+
+def signal_process_group(process: asyncio.subprocess.Process, sig: int) -> None:
+    """Send sig to every process in the group led by process."""
+    try:
+        os.killpg(process.pid, sig)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+async def terminate_process_group(process: asyncio.subprocess.Process) -> None:
+    """Stop a tool process and everything it spawned.
+    
+    A still-running process gets SIGTERM and KILL_GRACE_SECONDS to exit before
+    the group is SIGKILLed. Once the main process is gone any remaining
+    group members are stragglers and are killed outright.
+    """
+    if process.returncode is None:
+        signal_process_group(process, signal.SIGTERM)
+        try:
+            await asyncio.wait_for(wait_for_exit(process), timeout=KILL_GRACE_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+    signal_process_group(process, signal.SIGKILL)
+    await wait_for_exit(process)
+
+# Tool output kept in memory per stream before it spills to a temporary file
+CAPTURE_MEMORY_BYTES = int(os.environ.get("OSINT_CAPTURE_MEMORY_BYTES", str(8 * 1024 * 1024)))
+
+# Hard cap on captured output per stream; anything beyond is dropped and a
+# truncation marker is appended
+CAPTURE_MAX_BYTES = int(os.environ.get("OSINT_CAPTURE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Directory for spilled output (defaults to the result store's directory, so
+# a spill file becomes a stored result without being copied)
+CAPTURE_SPILL_DIR = os.environ.get("OSINT_SPILL_DIR") or None
+
+# Characters of spilled output returned from its start and from its end
+CAPTURE_EXCERPT_CHARS = 64 * 1024
+
+class OutputCapture:
+    """Bounded-memory capture of one tool output stream.
+    
+    Bytes are decoded incrementally as they arrive, so multi-byte characters
+    split across reads are handled without buffering the raw output. Up to
+    memory_limit bytes are kept in memory; beyond that the text spills to a
+    temporary file. Output past hard_limit is dropped and replaced by a
+    truncation marker.
+    
+    Spilled output is never read back whole: getvalue() hands the spill file
+    to RESULT_STORE and returns its head and tail around a note with the
+    result handle, which osint_fetch_result pages through.
+    """
+    
+    def __init__(self, memory_limit: int = CAPTURE_MEMORY_BYTES, hard_limit: int = CAPTURE_MAX_BYTES, spill_dir: Optional[str] = CAPTURE_SPILL_DIR, label: str = "output"):
+        self.memory_limit = memory_limit
+        self.hard_limit = hard_limit
+        self.spill_dir = spill_dir
+        self.label = label
+        self.bytes_seen = 0
+        self.bytes_kept = 0
+        self.truncated = False
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        self._chunks: List[str] = []
+        self._spill = None
+        self._spill_path: Optional[str] = None
+        self._spill_bytes = 0
+        self._spill_newlines = 0
+        self._last_byte = b""
+        # Set once the spill file belongs to RESULT_STORE
+        self.result_handle: Optional[str] = None
+    
+    @property
+    def spilled(self) -> bool:
+        return self._spill is not None
+    
+    def feed(self, data: bytes) -> None:
+        """Add raw output bytes."""
+        self.bytes_seen += len(data)
+        if self.truncated:
+            return
+        room = self.hard_limit - self.bytes_kept
+        if len(data) > room:
+            data = data[:room]
+            self.truncated = True
+        self.bytes_kept += len(data)
+        self._write(self._decoder.decode(data, final=self.truncated))
+    
+    def finish(self) -> None:
+        """Flush any incomplete character left in the decoder."""
+        if not self.truncated:
+            self._write(self._decoder.decode(b"", final=True))
+    
+    def _write(self, text: str) -> None:
+        if not text:
+            return
+        if self._spill is None and self.bytes_kept > self.memory_limit:
+            directory = self.spill_dir or RESULT_STORE.directory
+            os.makedirs(directory, exist_ok=True)
+            fd, self._spill_path = tempfile.mkstemp(prefix="spill-", suffix=".txt", dir=directory)
+            self._spill = os.fdopen(fd, "w+b")
+            pending, self._chunks = self._chunks, []
+            for chunk in pending:
+                self._spill_text(chunk)
+        if self._spill is not None:
+            self._spill_text(text)
+        else:
+            self._chunks.append(text)
+    
+    def _spill_text(self, text: str) -> None:
+        data = text.encode("utf-8")
+        if data:
+            self._spill.write(data)
+            self._spill_bytes += len(data)
+            self._spill_newlines += data.count(b"\n")
+            self._last_byte = data[-1:]
+    
+    def _excerpt(self, offset: int, size: int) -> str:
+        """Text of size bytes of the spill file from offset, cut at character boundaries."""
+        self._spill.seek(offset)
+        raw = self._spill.read(size)
+        self._spill.seek(0, os.SEEK_END)
+        start = 0
+        while start < len(raw) and (raw[start] & 0xC0) == 0x80:
+            start += 1
+        return raw[start:].decode("utf-8", errors="ignore")
+    
+    def _adopt_spill(self) -> str:
+        """Hand the spill file to RESULT_STORE; return its head and tail around the handle."""
+        if self.result_handle is None:
+            self._spill.flush()
+            records = self._spill_newlines + (0 if self._last_byte == b"\n" else 1)
+            stored = RESULT_STORE.adopt(self.label, self._spill_path, self._spill_bytes, records)
+            self.result_handle = stored["handle"]
+        excerpt = CAPTURE_EXCERPT_CHARS
+        if self._spill_bytes <= 2 * excerpt:
+            return self._excerpt(0, self._spill_bytes)
+        head = self._excerpt(0, excerpt)
+        tail = self._excerpt(self._spill_bytes - excerpt, excerpt)
+        # Drop the partial lines at the cut points
+        head = head[:head.rfind("\n") + 1] or head
+        tail = tail[tail.find("\n") + 1:] or tail
+        return (
+            f"{head}\n[... {self._spill_bytes} bytes of output; only the start and end are shown. "
+            f"Read all of it with osint_fetch_result, handle {self.result_handle} ...]\n{tail}"
+        )
+    
+    def getvalue(self) -> str:
+        """Return the captured text, with a marker if output was truncated.
+        
+        Spilled output comes back as its head and tail only (see the class).
+        """
+        if self._spill is not None:
+            text = self._adopt_spill()
+        else:
+            text = "".join(self._chunks)
+        if self.truncated:
+            dropped = self.bytes_seen - self.bytes_kept
+            text += f"\n[... output truncated: {dropped} of {self.bytes_seen} bytes dropped after the {self.hard_limit}-byte limit ...]\n"
+        return text
+    
+    def close(self) -> None:
+        """Release the spill file, if any; a file handed to RESULT_STORE is kept."""
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+            if self.result_handle is None:
+                try:
+                    os.unlink(self._spill_path)
+                except OSError:
+                    pass
+        self._chunks = []
+
+def command_label(command: List[str]) -> str:
+    """Name of the program a command runs, e.g. "sherlock" or "theHarvester.py" behind python3."""
+    names = [os.path.basename(part) for part in command[:2]]
+    if len(names) > 1 and names[0].startswith("python"):
+        return names[1]
+    return names[0] if names else "output"
+
+# Longest partial line buffered for an on_stdout_line callback; longer lines
+# are not passed to the callback
+MAX_CALLBACK_LINE_BYTES = 64 * 1024
+
+def emit_lines(data: bytes, on_line: Callable[[str], None]) -> bytes:
+    """Pass each complete line in data to on_line; return the incomplete rest."""
+    *lines, rest = data.split(b"\n")
+    for line in lines:
+        if len(line) > MAX_CALLBACK_LINE_BYTES:
+            continue
+        try:
+            on_line(line.decode("utf-8", errors="ignore").rstrip("\r"))
+        except Exception as e:
+            print(f"Output line callback failed: {e}", file=sys.stderr)
+    return rest
+
+async def read_stream(stream: Optional[asyncio.StreamReader], capture: OutputCapture, on_line: Optional[Callable[[str], None]] = None) -> None:
+    """Feed a pipe's output into capture until EOF, and line by line to on_line.
+    
+    A line longer than MAX_CALLBACK_LINE_BYTES is skipped whole: nothing of
+    it reaches on_line, and reading for on_line resumes after its newline.
+    """
+    if stream is None:
+        return
+    partial = b""
+    discarding = False
+    while True:
+        chunk = await stream.read(65536)
+        if not chunk:
+            break
+        capture.feed(chunk)
+        if on_line is None:
+            continue
+        if discarding:
+            end = chunk.find(b"\n")
+            if end < 0:
+                continue
+            chunk = chunk[end + 1:]
+            discarding = False
+        partial = emit_lines(partial + chunk, on_line)
+        if len(partial) > MAX_CALLBACK_LINE_BYTES:
+            partial = b""
+            discarding = True
+    if on_line is not None and partial and not discarding:
+        emit_lines(partial + b"\n", on_line)
+
+async def run_command_in_venv(command: List[str], cwd: Optional[str] = None, input_data: Optional[str] = None, extra_env: Optional[Dict[str, str]] = None, tool: Optional[str] = None, deadline: Optional[float] = None, on_stdout_line: Optional[Callable[[str], None]] = None, stdout_capture: Optional[OutputCapture] = None) -> tuple[str, str, int, bool]:
+    """Run a command in the virtual environment.
+    
+    The command runs in its own process group. When the deadline passes, or
+    the calling task is cancelled, the whole group is terminated so hung
+    grandchildren do not outlive the call. Output is captured with
+    OutputCapture, so memory use stays bounded for very large outputs.
+    
+    Args:
+        command: Command to run
+        cwd: Working directory
+        input_data: Input data to send to stdin
+        extra_env: Additional environment variables to set
+        tool: Tool name used for admission control; the launch waits for a
+            free slot in that tool's budget before the process is started
+        deadline: Wall-clock limit in seconds for the process, None for no limit
+        on_stdout_line: Called with each line of stdout as it is produced, for
+            streaming progress while the tool is still running
+        stdout_capture: Receives stdout instead of a new OutputCapture, e.g. a
+            parser that keeps only what it extracts; anything with
+            OutputCapture's feed/finish/getvalue/close
+    
+    Returns:
+        (stdout, stderr, returncode, timed_out). On timeout stdout and stderr
+        hold whatever output was captured before the process was killed.
+    """
+    if tool:
+        async with SCHEDULER.slot(tool):
+            return await run_command_in_venv(command, cwd=cwd, input_data=input_data, extra_env=extra_env, deadline=deadline, on_stdout_line=on_stdout_line, stdout_capture=stdout_capture)
+    
+    try:
+        # Set up environment - use system Python in container
+        env = os.environ.copy()
+        if extra_env:
+            env.update(extra_env)
+        
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=cwd,
+            env=env,
+            stdin=asyncio.subprocess.PIPE if input_data else None,
+            start_new_session=True
+        )
+    except Exception as e:
+        return "", str(e), 1, False
+    
+    stdout_capture = stdout_capture or OutputCapture(label=f"{command_label(command)} stdout")
+    stderr_capture = OutputCapture(label=f"{command_label(command)} stderr")
+    readers = [
+        asyncio.create_task(read_stream(process.stdout, stdout_capture, on_stdout_line)),
+        asyncio.create_task(read_stream(process.stderr, stderr_capture))
+    ]
+    timed_out = False
+    try:
+        try:
+            if input_data:
+                process.stdin.write(input_data.encode())
+                try:
+                    await process.stdin.drain()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                process.stdin.close()
+            
+            try:
+                await asyncio.wait_for(wait_for_exit(process), timeout=deadline)
+            except asyncio.TimeoutError:
+                timed_out = True
+        finally:
+            # Runs on normal exit, timeout and cancellation alike
+            await asyncio.shield(terminate_process_group(process))
+        
+        await asyncio.wait(readers, timeout=PIPE_DRAIN_SECONDS)
+        stdout_capture.finish()
+        stderr_capture.finish()
+        return stdout_capture.getvalue(), stderr_capture.getvalue(), process.returncode, timed_out
+    finally:
+        for reader in readers:
+            reader.cancel()
+        stdout_capture.close()
+        stderr_capture.close()
@@ -0,0 +1,215 @@
+"""
+Streaming progress for long-running tool calls.
+
+When a tools/call carries `_meta.progressToken`, a ProgressReporter is bound
+to the call's task through CURRENT_PROGRESS. Tool output is parsed line by
+line as it arrives, and the reporter sends throttled MCP
+`notifications/progress` messages with the sites checked so far, the number
+of hits and the findings new since the previous notification.
+"""
+
+import asyncio
+import contextvars
+import json
+import os
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+# Minimum seconds between two progress notifications for one call
+PROGRESS_INTERVAL_SECONDS = float(os.environ.get("OSINT_PROGRESS_INTERVAL", "1.0"))
+
+# Findings included in one notification; further hits are still counted
+PROGRESS_MAX_FINDINGS = 50
+
+# A parsed output line: (sites checked, finding or None)
+ProgressEvent = Tuple[int, Optional[Dict[str, Any]]]
+ProgressParser = Callable[[str], Optional[ProgressEvent]]
+
+class ProgressReporter:
+    """Accumulates progress for one call and sends throttled notifications.
+    
+    record() may be called for every output line; at most one notification
+    goes out per interval, and a trailing one is scheduled so the latest
+    state is never held back for long. close() sends anything still pending.
+    """
+    
+    def __init__(self, token: Any, notify: Callable[[str], None], interval: float = PROGRESS_INTERVAL_SECONDS):
+        self.token = token
+        self.notify = notify
+        self.interval = interval
+        self.label = ""
+        self.total: Optional[int] = None
+        self.checked = 0
+        self.hits = 0
+        self._findings: List[Dict[str, Any]] = []
+        self._dirty = False
+        self._last_sent = 0.0
+        self._last_progress = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._closed = False
+    
+    def record(self, checked: int = 0, finding: Optional[Dict[str, Any]] = None) -> None:
+        if self._closed:
+            return
+        self.checked += checked
+        if finding is not None:
+            self.hits += 1
+            if len(self._findings) < PROGRESS_MAX_FINDINGS:
+                self._findings.append(finding)
+        self._dirty = True
+        wait = self._last_sent + self.interval - time.monotonic()
+        if wait <= 0:
+            self._send()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(wait, self._send)
+    
+    def _send(self) -> None:
+        self._timer = None
+        if not self._dirty:
+            return
+        # progress must increase with every notification
+        progress = max(self.checked, self.hits, self._last_progress + 1)
+        self._dirty = False
+        self._last_sent = time.monotonic()
+        self._last_progress = progress
+        findings, self._findings = self._findings, []
+        params = {
+            "progressToken": self.token,
+            "progress": progress,
+            "message": f"{self.label or 'tool'}: {self.checked} checked, {self.hits} found",
+            "hits": self.hits,
+            "findings": findings
+        }
+        if self.total is not None:
+            params["total"] = max(self.total, progress)
+        self.notify(json.dumps({"jsonrpc": "2.0", "method": "notifications/progress", "params": params}))
+    
+    def close(self) -> None:
+        """Send any pending progress; later records are ignored."""
+        if self._timer is not None:
+            self._timer.cancel()
+        self._send()
+        self._closed = True
+    
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+class ProgressFanout:
+    """Progress of one shared execution, forwarded to every caller's reporter.
+    
+    Coalesced calls (see SingleFlight) run once for all callers waiting on
+    them. The execution reports to a fanout, which passes label, total and
+    every record on to the reporter of each caller that asked for progress.
+    A caller that joins late starts from the counts reached so far. A
+    caller that goes away closes its reporter, and it is dropped without
+    affecting the others.
+    """
+    
+    def __init__(self):
+        self.reporters: List[ProgressReporter] = []
+        self._label = ""
+        self._total: Optional[int] = None
+        self.checked = 0
+        self.hits = 0
+    
+    @property
+    def label(self) -> str:
+        return self._label
+    
+    @label.setter
+    def label(self, value: str) -> None:
+        self._label = value
+        for reporter in self.reporters:
+            reporter.label = value
+    
+    @property
+    def total(self) -> Optional[int]:
+        return self._total
+    
+    @total.setter
+    def total(self, value: Optional[int]) -> None:
+        self._total = value
+        for reporter in self.reporters:
+            reporter.total = value
+    
+    def attach(self, reporter: ProgressReporter) -> None:
+        reporter.label = self._label or reporter.label
+        reporter.total = self._total
+        reporter.checked = self.checked
+        reporter.hits = self.hits
+        self.reporters.append(reporter)
+    
+    def record(self, checked: int = 0, finding: Optional[Dict[str, Any]] = None) -> None:
+        self.checked += checked
+        if finding is not None:
+            self.hits += 1
+        self.reporters = [reporter for reporter in self.reporters if not reporter.closed]
+        for reporter in self.reporters:
+            reporter.record(checked, finding)
+
+# Reporter of the tool call running in the current task, if the client asked
+# for progress; a ProgressFanout inside coalesced executions
+CURRENT_PROGRESS: contextvars.ContextVar[Optional[Union[ProgressReporter, ProgressFanout]]] = contextvars.ContextVar("osint_progress", default=None)
+
+# Where notifications for the request being handled are sent, for transports
+# that answer each request on its own stream (HTTP with SSE); None uses the
+# session's notify
+NOTIFY_TARGET: contextvars.ContextVar[Optional[Callable[[str], None]]] = contextvars.ContextVar("osint_notify_target", default=None)
+
+# Progress parser per process name, filled in from the tool registry
+PROGRESS_PARSERS: Dict[str, ProgressParser] = {}
+
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+BRACKET_LINE = re.compile(r"^\[(?P<mark>[+\-x!])\]\s+(?P<site>[^:]+?)(?::\s+(?P<detail>.*))?$")
+URL = re.compile(r"https?://\S+")
+
+def parse_bracket_line(line: str) -> Optional[ProgressEvent]:
+    """Parse `[+] Site: url` / `[-] Site` lines (Sherlock, Maigret, Holehe)."""
+    match = BRACKET_LINE.match(ANSI_ESCAPE.sub("", line).strip())
+    if match is None:
+        return None
+    if match.group("mark") != "+":
+        return 1, None
+    # Holehe appends recovery details as " / ..."
+    finding = {"site": match.group("site").split(" / ")[0].strip()}
+    detail = match.group("detail") or ""
+    url = URL.search(detail)
+    if url:
+        finding["url"] = url.group(0)
+    return 1, finding
+
+def parse_blackbird_line(line: str) -> Optional[ProgressEvent]:
+    """Parse Blackbird's `✔️ [Site] url` hit and `✖ [Site]` miss lines."""
+    text = ANSI_ESCAPE.sub("", line).strip()
+    site = re.search(r"\[([^\]]+)\]", text)
+    if site is None:
+        return None
+    if "✔" in text:
+        finding = {"site": site.group(1)}
+        url = URL.search(text)
+        if url:
+            finding["url"] = url.group(0)
+        return 1, finding
+    if "✖" in text or "❌" in text:
+        return 1, None
+    return None
+
+def progress_line_handler(tool: str) -> Optional[Callable[[str], None]]:
+    """Return a stdout line callback feeding tool's output to the current reporter.
+    
+    None when the caller did not ask for progress or the tool has no parser.
+    """
+    reporter = CURRENT_PROGRESS.get()
+    parser = PROGRESS_PARSERS.get(tool)
+    if reporter is None or parser is None:
+        return None
+    reporter.label = reporter.label or tool
+    
+    def on_line(line: str) -> None:
+        event = parser(line)
+        if event is not None:
+            reporter.record(*event)
+    
+    return on_line
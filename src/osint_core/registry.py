@@ -0,0 +1,115 @@
+"""
+Declarative tool registry.
+
+Each tool is described once by a ToolSpec: its MCP schema, its handler and
+the runtime policy the server applies to it (process budget, queue priority,
+deadline, cache TTL, call coalescing). Servers are built from a list of specs,
+so every entry point shares one dispatch path and one tools/list definition.
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from .progress import ProgressParser
+
+class InvalidParams(ValueError):
+    """A tool call's arguments are invalid; answered with JSON-RPC error -32602."""
+
+Handler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+CACHE_PROPERTY = {
+    "type": "string",
+    "enum": ["default", "bypass", "refresh"],
+    "description": "Result cache control: bypass skips the cache, refresh re-runs the tool and updates the cache (default: reuse a fresh cached result)"
+}
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """One MCP tool and the policy the server runs it under.
+    
+    Attributes:
+        name: MCP tool name
+        description: MCP tool description
+        properties: JSON Schema properties of the tool's own arguments
+        required: Required argument names
+        handler: Coroutine taking the call arguments and returning a result dict
+        process_name: Name the tool's processes are scheduled, deadlined and
+            pooled under; None for tools that run no external process
+        concurrency_limit: Default number of processes allowed at once
+        priority: Default queue priority (lower runs first)
+        deadline: Default hard run time limit in seconds
+        cache_ttl: Default seconds a successful result stays cached (0 disables)
+        coalesce: Whether identical in-flight calls share one execution
+        progress_parser: Parses one line of the tool's output into progress
+            (sites checked, finding or None); None if the tool reports none
+    """
+    name: str
+    description: str
+    properties: Dict[str, Any]
+    required: List[str]
+    handler: Handler
+    process_name: Optional[str] = None
+    concurrency_limit: int = 1
+    priority: int = 0
+    deadline: Optional[int] = None
+    cache_ttl: int = 0
+    coalesce: bool = True
+    progress_parser: Optional[ProgressParser] = None
+    
+    @property
+    def runs_process(self) -> bool:
+        return self.process_name is not None
+    
+    def input_schema(self) -> Dict[str, Any]:
+        """JSON Schema for the tool's arguments, including the server-level ones."""
+        properties = dict(self.properties)
+        if self.deadline:
+            properties["max_runtime"] = {
+                "type": "integer",
+                "description": f"Hard limit on run time in seconds; the tool is stopped and partial output returned (default: {self.deadline})"
+            }
+        if self.cache_ttl:
+            properties["cache"] = CACHE_PROPERTY
+        schema = {"type": "object", "properties": properties}
+        if self.required:
+            schema["required"] = list(self.required)
+        return schema
+    
+    def describe(self) -> Dict[str, Any]:
+        """The tool's entry in a tools/list response."""
+        return {"name": self.name, "description": self.description, "inputSchema": self.input_schema()}
+
+class ToolRegistry:
+    """Name-indexed set of ToolSpecs with a pre-serialized tools/list body."""
+    
+    def __init__(self, tools: Iterable[ToolSpec]):
+        self.tools: Dict[str, ToolSpec] = {}
+        for spec in tools:
+            if spec.name in self.tools:
+                raise ValueError(f"Duplicate tool name: {spec.name}")
+            self.tools[spec.name] = spec
+        # The tool list never changes while the server runs, so it is
+        # serialized once and spliced into every tools/list response
+        self.tools_json = json.dumps([spec.describe() for spec in self.tools.values()])
+    
+    def get(self, name: str) -> Optional[ToolSpec]:
+        return self.tools.get(name)
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self.tools
+    
+    def __iter__(self):
+        return iter(self.tools.values())
+    
+    def process_defaults(self, attribute: str) -> Dict[str, Any]:
+        """Map each process name to the given ToolSpec attribute."""
+        return {
+            spec.process_name: getattr(spec, attribute)
+            for spec in self.tools.values()
+            if spec.runs_process and getattr(spec, attribute) is not None
+        }
+    
+    def cache_ttls(self) -> Dict[str, int]:
+        """Default cache TTLs keyed by tool name."""
+        return {spec.name: spec.cache_ttl for spec in self.tools.values() if spec.cache_ttl}
@@ -0,0 +1,318 @@
+"""
+Server-side storage for oversized tool results.
+
+Results too large to return inline are written to disk and replaced by a
+handle that clients page through with osint_fetch_result.
+"""
+
+import asyncio
+import codecs
+import json
+import os
+import tempfile
+import time
+import uuid
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .registry import InvalidParams
+
+# Tool results whose JSON text is larger than this are stored server-side and
+# returned as a handle that can be read back in pages with osint_fetch_result
+INLINE_RESULT_BYTES = int(os.environ.get("OSINT_INLINE_RESULT_BYTES", str(256 * 1024)))
+
+# Where stored results live, how much disk they may use and how long they are kept
+RESULTS_DIR = os.environ.get("OSINT_RESULTS_DIR") or os.path.join(tempfile.gettempdir(), "osint-results")
+RESULTS_MAX_BYTES = int(os.environ.get("OSINT_RESULTS_MAX_BYTES", str(1024 * 1024 * 1024)))
+RESULTS_TTL_SECONDS = int(os.environ.get("OSINT_RESULTS_TTL_SECONDS", str(6 * 3600)))
+
+# Characters of a stored result included inline as a preview
+RESULT_PREVIEW_CHARS = 2000
+
+# Default and maximum page sizes for osint_fetch_result
+RESULT_PAGE_BYTES = 64 * 1024
+RESULT_MAX_PAGE_BYTES = 1024 * 1024
+RESULT_PAGE_RECORDS = 500
+RESULT_MAX_PAGE_RECORDS = 5000
+
+class ResultStore:
+    """Server-side storage for oversized tool results.
+    
+    Each stored result is a UTF-8 text file addressed by an opaque handle.
+    Clients read it back in byte ranges or in record (line) ranges, so
+    neither side ever has to hold a multi-megabyte JSON-RPC message. Entries
+    expire after ttl seconds and the oldest are evicted past max_bytes.
+    """
+    
+    def __init__(self, directory: str, max_bytes: int, ttl: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._total_bytes = 0
+        self._swept = False
+    
+    def _sweep_stale_files(self) -> None:
+        """Remove files left behind by earlier server runs."""
+        self._swept = True
+        os.makedirs(self.directory, exist_ok=True)
+        cutoff = time.time() - self.ttl
+        for path in Path(self.directory).glob("*.txt"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
+    
+    def _remove(self, handle: str) -> None:
+        entry = self._entries.pop(handle, None)
+        if entry is None:
+            return
+        self._total_bytes -= entry["bytes"]
+        try:
+            os.unlink(entry["path"])
+        except OSError:
+            pass
+    
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Drop expired entries, then the oldest ones past max_bytes.
+        
+        keep is never evicted for size, so a result larger than max_bytes on
+        its own can still be read until another result replaces it.
+        """
+        now = time.monotonic()
+        for handle, entry in list(self._entries.items()):
+            if now - entry["created"] > self.ttl:
+                self._remove(handle)
+        while self._total_bytes > self.max_bytes:
+            oldest = next((handle for handle in self._entries if handle != keep), None)
+            if oldest is None:
+                break
+            self._remove(oldest)
+    
+    @staticmethod
+    def _write_file(path: str, chunks: Iterable[str]) -> Tuple[int, int, str]:
+        """Write chunks to path; return the bytes and records written and a preview."""
+        size = newlines = 0
+        preview: List[str] = []
+        preview_chars = 0
+        last = b""
+        with open(path, "wb") as f:
+            for chunk in chunks:
+                if preview_chars < RESULT_PREVIEW_CHARS:
+                    preview.append(chunk[:RESULT_PREVIEW_CHARS - preview_chars])
+                    preview_chars += len(preview[-1])
+                data = chunk.encode("utf-8")
+                if data:
+                    f.write(data)
+                    size += len(data)
+                    newlines += data.count(b"\n")
+                    last = data[-1:]
+        return size, newlines + (0 if last in (b"\n", b"") else 1), "".join(preview)
+    
+    async def store(self, tool: str, chunks: Iterable[str]) -> Tuple[Dict[str, Any], str]:
+        """Write the text chunks, produced lazily, and return the handle description and a preview.
+        
+        Serializing and writing happen in a thread, off the event loop.
+        """
+        if not self._swept:
+            await asyncio.to_thread(self._sweep_stale_files)
+        handle = uuid.uuid4().hex
+        path = os.path.join(self.directory, f"{handle}.txt")
+        size, records, preview = await asyncio.to_thread(self._write_file, path, chunks)
+        return self._register(handle, path, tool, size, records), preview
+    
+    def adopt(self, tool: str, path: str, size: int, records: int) -> Dict[str, Any]:
+        """Take over an already written file as a stored result and return its handle description.
+        
+        The file is removed with the entry, like any stored result.
+        """
+        if not self._swept:
+            self._sweep_stale_files()
+        return self._register(uuid.uuid4().hex, path, tool, size, records)
+    
+    def _register(self, handle: str, path: str, tool: str, size: int, records: int) -> Dict[str, Any]:
+        self._entries[handle] = {
+            "path": path,
+            "tool": tool,
+            "bytes": size,
+            "records": records,
+            "created": time.monotonic(),
+            "line_offsets": None
+        }
+        self._total_bytes += size
+        self._evict(keep=handle)
+        return {
+            "handle": handle,
+            "tool": tool,
+            "total_bytes": size,
+            "total_records": records,
+            "expires_in_seconds": self.ttl
+        }
+    
+    def _entry(self, handle: str) -> Dict[str, Any]:
+        self._evict(keep=handle)
+        entry = self._entries.get(handle)
+        if entry is None:
+            raise KeyError(f"Unknown or expired result handle: {handle}")
+        return entry
+    
+    @staticmethod
+    def _read_range(handle: str, path: str, offset: int, length: int) -> bytes:
+        try:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                return f.read(length)
+        except OSError:
+            # Evicted while the read was queued
+            raise KeyError(f"Unknown or expired result handle: {handle}")
+    
+    async def read_bytes(self, handle: str, offset: int, length: int) -> Dict[str, Any]:
+        """Read up to length bytes starting at offset, never splitting a character.
+        
+        The file is read in a thread, off the event loop.
+        """
+        entry = self._entry(handle)
+        offset = max(0, min(offset, entry["bytes"]))
+        raw = await asyncio.to_thread(self._read_range, handle, entry["path"], offset, length)
+        # Skip continuation bytes if the offset landed inside a character
+        start = 0
+        while start < len(raw) and (raw[start] & 0xC0) == 0x80:
+            start += 1
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        text = decoder.decode(raw[start:])
+        pending = len(decoder.getstate()[0])
+        next_offset = offset + len(raw) - pending
+        return {
+            "handle": handle,
+            "offset": offset,
+            "next_offset": next_offset if next_offset < entry["bytes"] else None,
+            "total_bytes": entry["bytes"],
+            "data": text
+        }
+    
+    @staticmethod
+    def _scan_line_offsets(handle: str, path: str, size: int) -> array:
+        """Byte offset of the start of every line of the file."""
+        offsets = array("Q", [0])
+        position = 0
+        try:
+            with open(path, "rb") as f:
+                while True:
+                    block = f.read(1024 * 1024)
+                    if not block:
+                        break
+                    index = block.find(b"\n")
+                    while index != -1:
+                        offsets.append(position + index + 1)
+                        index = block.find(b"\n", index + 1)
+                    position += len(block)
+        except OSError:
+            raise KeyError(f"Unknown or expired result handle: {handle}")
+        if offsets[-1] >= size and len(offsets) > 1:
+            offsets.pop()
+        return offsets
+    
+    async def _line_offsets(self, handle: str, entry: Dict[str, Any]) -> array:
+        """Line offsets of a result, scanned in a thread once per result."""
+        if entry["line_offsets"] is None:
+            entry["line_offsets"] = await asyncio.to_thread(self._scan_line_offsets, handle, entry["path"], entry["bytes"])
+        return entry["line_offsets"]
+    
+    async def read_records(self, handle: str, start: int, count: int, max_bytes: int = RESULT_MAX_PAGE_BYTES) -> Dict[str, Any]:
+        """Read count records (lines) starting at record index start.
+        
+        The page also ends before it would exceed max_bytes, but always
+        holds at least one record. The file is scanned and read in a
+        thread, off the event loop.
+        """
+        entry = self._entry(handle)
+        offsets = await self._line_offsets(handle, entry)
+        total = entry["records"]
+        start = max(0, min(start, total))
+        end = min(total, start + max(0, count))
+        records: List[str] = []
+        if end > start:
+            begin = offsets[start]
+            if entry["bytes"] - begin > max_bytes:
+                end = min(end, max(start + 1, bisect_right(offsets, begin + max_bytes) - 1))
+            stop = offsets[end] if end < len(offsets) else entry["bytes"]
+            raw = await asyncio.to_thread(self._read_range, handle, entry["path"], begin, stop - begin)
+            records = raw.decode("utf-8", errors="ignore").splitlines()
+        return {
+            "handle": handle,
+            "record_start": start,
+            "next_record": end if end < total else None,
+            "total_records": total,
+            "records": records
+        }
+    
+    def stats(self) -> Dict[str, Any]:
+        return {"stored_results": len(self._entries), "stored_bytes": self._total_bytes}
+
+RESULT_STORE = ResultStore(RESULTS_DIR, RESULTS_MAX_BYTES, RESULTS_TTL_SECONDS)
+
+async def offload_result(tool_name: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Move the bulky part of an oversized result into RESULT_STORE.
+    
+    The main payload ("content", or "partial_output" for timed-out calls) is
+    stored as text and replaced by a handle, size information and a short
+    preview. Other fields are kept inline.
+    """
+    field = "content" if "content" in result else "partial_output" if "partial_output" in result else None
+    if field is None:
+        payload = result
+        summary = {"success": result.get("success", False)}
+    else:
+        payload = result[field]
+        summary = {
+            key: (value[:RESULT_PREVIEW_CHARS] if isinstance(value, str) else value)
+            for key, value in result.items() if key != field
+        }
+    # Strings are stored as they are; anything else is serialized while it is written
+    chunks = [payload] if isinstance(payload, str) else json.JSONEncoder(indent=2).iterencode(payload)
+    stored, preview = await RESULT_STORE.store(tool_name, chunks)
+    stored["field"] = field or "result"
+    summary["result_handle"] = stored
+    summary["preview"] = preview
+    summary["note"] = "Result too large to return inline; read it with osint_fetch_result using result_handle.handle"
+    return summary
+
+def integer_argument(params: Dict[str, Any], name: str, default: int) -> int:
+    """An integer argument, or default when it is absent; raises InvalidParams for anything else."""
+    value = params.get(name, default)
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    elif isinstance(value, str) and value.strip().lstrip("-").isdigit():
+        value = int(value)
+    # bool is an int subclass, but true is not a page size
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise InvalidParams(f"{name} must be an integer")
+    return value
+
+async def handle_fetch_result(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Read back part of a stored result by byte range or record range.
+    
+    Page sizes are clamped to at least one byte or record and at most
+    RESULT_MAX_PAGE_BYTES or RESULT_MAX_PAGE_RECORDS.
+    """
+    handle = params.get("handle")
+    if not isinstance(handle, str):
+        raise InvalidParams("handle must be a string")
+    try:
+        if "record_start" in params or "record_count" in params:
+            count = integer_argument(params, "record_count", RESULT_PAGE_RECORDS)
+            page = await RESULT_STORE.read_records(
+                handle,
+                integer_argument(params, "record_start", 0),
+                max(1, min(count, RESULT_MAX_PAGE_RECORDS))
+            )
+        else:
+            length = max(1, min(integer_argument(params, "length", RESULT_PAGE_BYTES), RESULT_MAX_PAGE_BYTES))
+            page = await RESULT_STORE.read_bytes(handle, integer_argument(params, "offset", 0), length)
+    except KeyError as e:
+        return {"success": False, "error": str(e.args[0])}
+    return {"success": True, "content": page}
@@ -0,0 +1,156 @@
+"""
+Process admission control.
+
+Every tool subprocess (or warm-worker call) takes a slot from SCHEDULER before
+it starts, which bounds how many processes each tool and the server as a
+whole can run at once.
+"""
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import math
+import os
+import sys
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+# Maximum number of tool subprocesses running at the same time, across all tools
+MAX_TOOL_PROCESSES = max(1, int(os.environ.get("OSINT_MAX_TOOL_PROCESSES", "6")))
+
+def parse_tool_settings(value: Optional[str], defaults: Dict[str, int]) -> Dict[str, int]:
+    """Parse "tool=number,tool=number" overrides on top of per-tool defaults."""
+    settings = dict(defaults)
+    if not value:
+        return settings
+    for item in value.split(","):
+        name, _, number = item.partition("=")
+        try:
+            settings[name.strip()] = int(number)
+        except ValueError:
+            print(f"Ignoring invalid tool setting: {item!r}", file=sys.stderr)
+    return settings
+
+class ToolScheduler:
+    """Admission control for tool subprocesses.
+    
+    Every tool has its own concurrency budget and all tools share a global
+    process budget. Launches that cannot start immediately wait in a single
+    priority queue (priority, then arrival order), so quick checks overtake
+    queued full scans without starving tools whose budget is still free.
+    """
+    
+    def __init__(self, limits: Dict[str, int], priorities: Dict[str, int], max_processes: int):
+        self.limits = limits
+        self.priorities = priorities
+        self.max_processes = max_processes
+        self._running: Dict[str, int] = {}
+        self._total_running = 0
+        self._queue: List[tuple] = []
+        self._seq = itertools.count()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+    
+    def configure(self, limits: Dict[str, int], priorities: Dict[str, int]) -> None:
+        """Replace the per-tool budgets and priorities."""
+        self.limits = limits
+        self.priorities = priorities
+        self._wake()
+    
+    def _tool_stats(self, tool: str) -> Dict[str, Any]:
+        if tool not in self._stats:
+            self._stats[tool] = {"launched": 0, "total_wait": 0.0, "max_wait": 0.0, "recent_waits": deque(maxlen=256)}
+        return self._stats[tool]
+    
+    def _has_room(self, tool: str) -> bool:
+        if self._total_running >= self.max_processes:
+            return False
+        return self._running.get(tool, 0) < max(1, self.limits.get(tool, self.max_processes))
+    
+    def _wake(self) -> None:
+        """Grant slots to queued launches in priority order."""
+        waiting = []
+        while self._queue:
+            entry = heapq.heappop(self._queue)
+            future = entry[3]
+            if future.done():
+                continue
+            if self._has_room(entry[2]):
+                self._running[entry[2]] = self._running.get(entry[2], 0) + 1
+                self._total_running += 1
+                future.set_result(None)
+            else:
+                waiting.append(entry)
+        for entry in waiting:
+            heapq.heappush(self._queue, entry)
+    
+    async def acquire(self, tool: str, priority: Optional[int] = None) -> float:
+        """Wait for a process slot for tool. Returns the time spent queued in seconds."""
+        if priority is None:
+            priority = self.priorities.get(tool, 1)
+        started = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._seq), tool, future))
+        self._wake()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was granted just before the cancellation arrived
+                self.release(tool)
+            else:
+                future.cancel()
+            raise
+        waited = time.monotonic() - started
+        stats = self._tool_stats(tool)
+        stats["launched"] += 1
+        stats["total_wait"] += waited
+        stats["max_wait"] = max(stats["max_wait"], waited)
+        stats["recent_waits"].append(waited)
+        return waited
+    
+    def release(self, tool: str) -> None:
+        """Return a process slot and start the next queued launch."""
+        self._running[tool] = max(0, self._running.get(tool, 0) - 1)
+        self._total_running = max(0, self._total_running - 1)
+        self._wake()
+    
+    @contextlib.asynccontextmanager
+    async def slot(self, tool: str, priority: Optional[int] = None):
+        """Hold a process slot for tool for the duration of the block."""
+        waited = await self.acquire(tool, priority)
+        try:
+            yield waited
+        finally:
+            self.release(tool)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Report queue depth, running processes and wait times per tool."""
+        queued: Dict[str, int] = {}
+        for entry in self._queue:
+            if not entry[3].done():
+                queued[entry[2]] = queued.get(entry[2], 0) + 1
+        tools = {}
+        for tool in sorted(set(self.limits) | set(self._running) | set(self._stats)):
+            stats = self._tool_stats(tool)
+            recent = sorted(stats["recent_waits"])
+            tools[tool] = {
+                "limit": self.limits.get(tool, self.max_processes),
+                "priority": self.priorities.get(tool, 1),
+                "running": self._running.get(tool, 0),
+                "queued": queued.get(tool, 0),
+                "launched": stats["launched"],
+                "avg_wait_seconds": round(stats["total_wait"] / stats["launched"], 3) if stats["launched"] else 0.0,
+                "p95_wait_seconds": round(recent[max(0, math.ceil(0.95 * len(recent)) - 1)], 3) if recent else 0.0,
+                "max_wait_seconds": round(stats["max_wait"], 3),
+            }
+        return {
+            "max_processes": self.max_processes,
+            "running": self._total_running,
+            "queued": sum(queued.values()),
+            "tools": tools,
+        }
+
+# Limits and priorities are filled in from the tool registry when a server starts
+SCHEDULER = ToolScheduler({}, {}, MAX_TOOL_PROCESSES)
@@ -0,0 +1,412 @@
+"""
+MCP server runtime shared by the aggregate server and the per-tool services.
+
+serve() runs the JSON-RPC loop for any list of ToolSpecs, over stdio or the
+streamable HTTP transport; tool calls are routed through the registry, the
+result cache, in-flight coalescing and the process scheduler.
+"""
+
+import asyncio
+import json
+import os
+import sys
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from .cache import RESULT_CACHE, SINGLE_FLIGHT, cache_key
+from .emailprober import EMAIL_PROBER
+from .hostguard import HOST_GUARD
+from .latency import LATENCY
+from .prober import PROBER
+from .process import TOOL_DEADLINES
+from .progress import CURRENT_PROGRESS, NOTIFY_TARGET, PROGRESS_PARSERS, ProgressReporter
+from .registry import InvalidParams, ToolRegistry, ToolSpec
+from .results import INLINE_RESULT_BYTES, RESULT_STORE, handle_fetch_result, offload_result
+from .scheduler import SCHEDULER, parse_tool_settings
+from .sfdaemon import SPIDERFOOT_DAEMON
+from .stdio import MessageTooLarge, MessageWriter, open_stdin_reader, read_message_line
+from .streamable_http import StreamableHttpServer
+from .workers import WORKER_POOL
+
+# Maximum number of tool calls executed at the same time. Additional calls
+# wait for a free slot; the stdin loop keeps reading requests meanwhile.
+MAX_CONCURRENT_CALLS = max(1, int(os.environ.get("OSINT_MAX_CONCURRENT_CALLS", "8")))
+
+# "stdio" for one client on stdin/stdout, "http" to serve many clients over
+# MCP streamable HTTP (see OSINT_HTTP_HOST / OSINT_HTTP_PORT)
+TRANSPORT = os.environ.get("OSINT_TRANSPORT", "stdio").lower()
+
+# Counters of the running transport by name, reported by osint_server_status
+TRANSPORT_STATS: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+async def handle_server_status(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Report server load: process queues and wait times per tool."""
+    return {
+        "success": True,
+        "content": {
+            "max_concurrent_calls": MAX_CONCURRENT_CALLS,
+            "scheduler": SCHEDULER.stats(),
+            "result_store": RESULT_STORE.stats(),
+            "cache": RESULT_CACHE.stats(),
+            "coalescing": SINGLE_FLIGHT.stats(),
+            "worker_pool": WORKER_POOL.stats(),
+            "prober": PROBER.stats(),
+            "email_prober": EMAIL_PROBER.stats(),
+            "hosts": HOST_GUARD.stats(),
+            "latency": LATENCY.stats(),
+            "spiderfoot_daemon": SPIDERFOOT_DAEMON.stats(),
+            "transport": {name: stats() for name, stats in TRANSPORT_STATS.items()}
+        }
+    }
+
+FETCH_RESULT_TOOL = ToolSpec(
+    name="osint_fetch_result",
+    description="Read back an oversized tool result that was stored server-side, either as a byte range (offset/length) or as a range of records (lines)",
+    properties={
+        "handle": {"type": "string", "description": "The result_handle.handle value returned by the original tool call"},
+        "offset": {"type": "integer", "description": "Byte offset to start reading at (default: 0); use next_offset from the previous page to continue"},
+        "length": {"type": "integer", "description": "Maximum bytes to return (default: 65536, max: 1048576)"},
+        "record_start": {"type": "integer", "description": "Record (line) index to start at; use with record_count to page by records instead of bytes"},
+        "record_count": {"type": "integer", "description": "Number of records to return (default: 500, max: 5000); a page also stops before it exceeds 1048576 bytes"}
+    },
+    required=["handle"],
+    handler=handle_fetch_result,
+    coalesce=False
+)
+
+SERVER_STATUS_TOOL = ToolSpec(
+    name="osint_server_status",
+    description="Report server load: running and queued tool processes, per-tool limits and queue wait times",
+    properties={},
+    required=[],
+    handler=handle_server_status,
+    coalesce=False
+)
+
+# Tools every server exposes next to its OSINT tools
+UTILITY_TOOLS = [FETCH_RESULT_TOOL, SERVER_STATUS_TOOL]
+
+def configure_runtime(registry: ToolRegistry) -> None:
+    """Apply the registry's tool defaults, overridden from the environment."""
+    SCHEDULER.configure(
+        parse_tool_settings(os.environ.get("OSINT_TOOL_LIMITS"), registry.process_defaults("concurrency_limit")),
+        parse_tool_settings(os.environ.get("OSINT_TOOL_PRIORITIES"), registry.process_defaults("priority"))
+    )
+    TOOL_DEADLINES.clear()
+    TOOL_DEADLINES.update(parse_tool_settings(os.environ.get("OSINT_TOOL_DEADLINES"), registry.process_defaults("deadline")))
+    RESULT_CACHE.ttls = parse_tool_settings(os.environ.get("OSINT_CACHE_TTLS"), registry.cache_ttls())
+    WORKER_POOL.configure([spec.process_name for spec in registry if spec.runs_process])
+    PROGRESS_PARSERS.clear()
+    PROGRESS_PARSERS.update({spec.process_name: spec.progress_parser for spec in registry if spec.runs_process and spec.progress_parser})
+
+async def handle_tool_call(registry: ToolRegistry, tool_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Handle tool calls by routing to the registered handler."""
+    spec = registry.get(tool_name)
+    if spec is None:
+        return {"success": False, "error": f"Unknown tool: {tool_name}"}
+    try:
+        return await spec.handler(params)
+    except InvalidParams:
+        raise
+    except Exception as e:
+        return {"success": False, "error": f"Tool execution failed: {str(e)}"}
+
+async def cached_tool_call(registry: ToolRegistry, tool_name: str, params: Dict[str, Any], call_slots: asyncio.Semaphore) -> Dict[str, Any]:
+    """Run a tool call through the result cache and in-flight coalescing.
+    
+    The per-call `cache` argument selects the behaviour: "bypass" skips the
+    cache entirely, "refresh" re-runs the tool and replaces the cached entry,
+    anything else returns a fresh cached result when one exists. Only
+    complete successful results are cached; results marked partial (some
+    sources failed or ran out of time) are not. Cache hits do not take a
+    call slot.
+    
+    Calls that do run are coalesced by the same key, so identical requests
+    arriving while a scan is in progress share that scan instead of
+    launching another one. Only calls with the same max_runtime share an
+    execution, so no caller waits past its own deadline or is cut short by
+    another caller's.
+    """
+    spec = registry.get(tool_name)
+    if spec is None or not spec.coalesce:
+        return await handle_tool_call(registry, tool_name, params)
+    
+    mode = params.get("cache", "default")
+    use_cache = RESULT_CACHE.ttl_for(tool_name) > 0 and mode != "bypass"
+    key = cache_key(tool_name, params)
+    if mode == "bypass":
+        RESULT_CACHE.counters["bypassed"] += 1
+    elif mode == "refresh":
+        RESULT_CACHE.counters["refreshed"] += 1
+    elif use_cache:
+        cached = await RESULT_CACHE.get(key)
+        if cached is not None:
+            return cached
+    
+    async def execute() -> Dict[str, Any]:
+        async with call_slots:
+            result = await handle_tool_call(registry, tool_name, params)
+        if use_cache and result.get("success") and not result.get("partial"):
+            await RESULT_CACHE.put(tool_name, key, result)
+        return result
+    
+    return await SINGLE_FLIGHT.run(f"{key}:{params.get('max_runtime')}", execute)
+
+def serialize_within(result: Dict[str, Any], limit: int) -> Optional[str]:
+    """The result as indented JSON, or None as soon as it grows past limit characters."""
+    chunks = []
+    size = 0
+    for chunk in json.JSONEncoder(indent=2).iterencode(result):
+        size += len(chunk)
+        if size > limit:
+            return None
+        chunks.append(chunk)
+    return "".join(chunks)
+
+async def build_tool_response(request_id: Any, result: Dict[str, Any], tool_name: Optional[str] = None) -> Dict[str, Any]:
+    """Wrap a tool result in a JSON-RPC tools/call response.
+    
+    Results larger than INLINE_RESULT_BYTES are stored server-side and
+    replaced by a handle (see offload_result). Serialization stops once the
+    limit is passed, so an oversized result is never built as one string.
+    """
+    if tool_name == FETCH_RESULT_TOOL.name:
+        # Pages are bounded by osint_fetch_result itself
+        text = json.dumps(result, indent=2)
+    else:
+        text = serialize_within(result, INLINE_RESULT_BYTES)
+        if text is None:
+            text = json.dumps(await offload_result(tool_name or "unknown", result), indent=2)
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "result": {
+            "content": [
+                {
+                    "type": "text",
+                    "text": text
+                }
+            ]
+        }
+    }
+
+def error_response(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+    """Build a JSON-RPC error response."""
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "error": {
+            "code": code,
+            "message": message
+        }
+    }
+
+async def tool_call_response(registry: ToolRegistry, request_id: Any, tool_name: str, tool_params: Dict[str, Any], call_slots: asyncio.Semaphore, progress: Optional[ProgressReporter] = None) -> Optional[Dict[str, Any]]:
+    """Run one tools/call request and return its response.
+    
+    Returns None when the call is cancelled by the client
+    (notifications/cancelled); the tool's processes are already terminated
+    by then and no response is sent. When progress is given it is bound to
+    this task, so the tool's output streams notifications/progress, and it
+    is flushed before the response.
+    """
+    if progress is not None:
+        CURRENT_PROGRESS.set(progress)
+    try:
+        result = await cached_tool_call(registry, tool_name, tool_params, call_slots)
+        return await build_tool_response(request_id, result, tool_name)
+    except asyncio.CancelledError:
+        return None
+    except InvalidParams as e:
+        return error_response(request_id, -32602, f"Invalid params: {str(e)}")
+    except Exception as e:
+        return error_response(request_id, -32603, f"Internal error: {str(e)}")
+    finally:
+        if progress is not None:
+            progress.close()
+
+class McpSession:
+    """JSON-RPC protocol state for one connected client.
+    
+    handle_line() takes one framed message, which is either a single request
+    or a batch array, and returns the serialized response. It returns None
+    when nothing is to be sent (notifications, cancelled calls). Batch
+    members are handled concurrently and answered together in one array.
+    Server-initiated notifications, such as progress, go out through notify
+    as soon as they are produced.
+    """
+    
+    def __init__(self, registry: ToolRegistry, server_name: str, call_slots: asyncio.Semaphore, notify: Callable[[str], None]):
+        self.registry = registry
+        self.server_name = server_name
+        self.call_slots = call_slots
+        self.notify = notify
+        # In-flight tool calls by JSON-RPC id, used to honour notifications/cancelled
+        self.active_calls: Dict[Any, asyncio.Task] = {}
+    
+    async def handle_line(self, line: bytes) -> Optional[str]:
+        try:
+            payload = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            return json.dumps(error_response(None, -32700, f"Parse error: {str(e)}"))
+        return await self.handle_payload(payload)
+    
+    async def handle_payload(self, payload: Any) -> Optional[str]:
+        """Answer a parsed request or batch."""
+        if not isinstance(payload, list):
+            return await self.handle_request(payload)
+        if not payload:
+            return json.dumps(error_response(None, -32600, "Invalid Request: empty batch"))
+        responses = await asyncio.gather(*[self.handle_request(request) for request in payload])
+        responses = [response for response in responses if response is not None]
+        # A batch of notifications gets no response at all
+        return f"[{', '.join(responses)}]" if responses else None
+    
+    async def handle_request(self, request: Any) -> Optional[str]:
+        """Answer one request object; None for notifications and cancelled calls."""
+        if not isinstance(request, dict):
+            return json.dumps(error_response(None, -32600, "Invalid Request: expected an object"))
+        request_id = request.get("id")
+        try:
+            return await self._dispatch(request, request_id)
+        except Exception as e:
+            return json.dumps(error_response(request_id, -32603, f"Internal error: {str(e)}"))
+    
+    async def _dispatch(self, request: Dict[str, Any], request_id: Any) -> Optional[str]:
+        method = request.get("method")
+        params = request.get("params") or {}
+        
+        # Handle different MCP methods
+        if method == "initialize":
+            response = {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "result": {
+                    "protocolVersion": "2024-11-05",
+                    "capabilities": {
+                        "tools": {}
+                    },
+                    "serverInfo": {
+                        "name": self.server_name,
+                        "version": "1.0.0"
+                    }
+                }
+            }
+        elif method == "tools/list":
+            # Splice in the tool list serialized at startup
+            envelope = json.dumps({"jsonrpc": "2.0", "id": request_id})
+            return f'{envelope[:-1]}, "result": {{"tools": {self.registry.tools_json}}}}}'
+        elif method == "tools/call":
+            return await self._call_tool(request_id, params)
+        elif method == "notifications/cancelled":
+            # Cancel the in-flight call; this also kills its tool
+            # processes. Unknown or finished ids are ignored.
+            task = self.active_calls.get(params.get("requestId"))
+            if task is not None:
+                task.cancel()
+            return None
+        elif isinstance(method, str) and method.startswith("notifications/"):
+            # Notifications never get a response
+            return None
+        else:
+            response = error_response(request_id, -32601, f"Method not found: {method}")
+        return json.dumps(response)
+    
+    async def _call_tool(self, request_id: Any, params: Dict[str, Any]) -> Optional[str]:
+        # The call runs as its own task so notifications/cancelled can stop
+        # it without cancelling the batch or connection waiting on it
+        token = (params.get("_meta") or {}).get("progressToken")
+        progress = ProgressReporter(token, NOTIFY_TARGET.get() or self.notify) if token is not None else None
+        task = asyncio.create_task(tool_call_response(
+            self.registry, request_id, params.get("name"), params.get("arguments") or {}, self.call_slots, progress
+        ))
+        if request_id is not None:
+            self.active_calls[request_id] = task
+        try:
+            await asyncio.wait([task])
+        finally:
+            task.cancel()
+            if self.active_calls.get(request_id) is task:
+                del self.active_calls[request_id]
+        response = None if task.cancelled() else task.result()
+        return json.dumps(response) if response is not None else None
+
+SessionFactory = Callable[[Callable[[str], None]], McpSession]
+
+async def serve_stdio(new_session: SessionFactory) -> None:
+    """Serve one client over stdin/stdout until stdin closes."""
+    pending: Set[asyncio.Task] = set()
+    reader = await open_stdin_reader()
+    writer = MessageWriter()
+    writer.start()
+    session = new_session(writer.send_text)
+    TRANSPORT_STATS["stdio"] = lambda: dict(writer.counters, active_calls=len(session.active_calls))
+    
+    async def answer(line: bytes) -> None:
+        response = await session.handle_line(line)
+        if response is not None:
+            writer.send_text(response)
+    
+    try:
+        # Read from stdin and write to stdout
+        while True:
+            try:
+                line = await read_message_line(reader)
+            except MessageTooLarge as e:
+                writer.send(error_response(None, -32600, f"Invalid Request: {str(e)}"))
+                continue
+            if line is None:
+                break
+            if not line.strip():
+                continue
+            task = asyncio.create_task(answer(line))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        
+        # stdin closed - let in-flight tool calls finish and write their responses
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    finally:
+        await writer.close()
+
+async def serve_http(new_session: SessionFactory) -> None:
+    """Serve any number of clients over streamable HTTP until cancelled."""
+    server = StreamableHttpServer(new_session)
+    TRANSPORT_STATS["http"] = server.stats
+    await server.serve_forever()
+
+async def serve(tools: List[ToolSpec], server_name: str) -> None:
+    """Main MCP server loop.
+    
+    Serves tools plus the utility tools (osint_fetch_result,
+    osint_server_status) under serverInfo name server_name, over the
+    transport selected by OSINT_TRANSPORT. Each message is handled as its
+    own task, so a slow scan does not hold up other requests; responses are
+    matched to requests by their JSON-RPC id.
+    """
+    registry = ToolRegistry(list(tools) + UTILITY_TOOLS)
+    configure_runtime(registry)
+    # One call budget for every session the transport serves
+    call_slots = asyncio.Semaphore(MAX_CONCURRENT_CALLS)
+    
+    def new_session(notify: Callable[[str], None]) -> McpSession:
+        return McpSession(registry, server_name, call_slots, notify)
+    
+    transports = {"stdio": serve_stdio, "http": serve_http}
+    if TRANSPORT not in transports:
+        print(f"Unknown OSINT_TRANSPORT {TRANSPORT!r}; expected one of {', '.join(transports)}", file=sys.stderr)
+        return
+    # Warm the worker pool in the background while requests are served
+    warmup = asyncio.create_task(WORKER_POOL.start()) if WORKER_POOL.enabled else None
+    try:
+        await transports[TRANSPORT](new_session)
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(f"Server error: {e}", file=sys.stderr)
+    finally:
+        if warmup is not None:
+            warmup.cancel()
+        await PROBER.close()
+        await EMAIL_PROBER.close()
+        await SPIDERFOOT_DAEMON.close()
+        await LATENCY.flush()
@@ -0,0 +1,341 @@
+"""
+Long-lived SpiderFoot instance for asynchronous scans.
+
+Rather than cold-starting sf.py for every scan, the server starts
+SpiderFoot's web server once, bound to localhost, and submits scans to it
+through its HTTP API. Scans run inside that instance, so they outlive the
+MCP call that started them, run side by side, and share its loaded module
+registry and database. Each scan's events are fetched from the instance and
+kept in arrival order without duplicates, so clients can page through them
+with a cursor while the scan is still running. A refresh only downloads the
+event types whose count grew since the previous one, and skips events older
+than the newest it already read of that type.
+"""
+
+import asyncio
+import html
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from .process import terminate_process_group
+from .sfevents import EventCollector
+from .sfprofiles import SPIDERFOOT_DIR
+
+# Address of the SpiderFoot web server; only bind it to localhost
+SPIDERFOOT_LISTEN = os.environ.get("OSINT_SPIDERFOOT_LISTEN", "127.0.0.1:5001")
+
+# Seconds SpiderFoot gets to start answering, and per API request
+DAEMON_START_SECONDS = 60
+REQUEST_TIMEOUT_SECONDS = 30
+
+# Scan states SpiderFoot reports once a scan has stopped
+FINISHED_STATES = {"FINISHED", "ABORTED", "ERROR-FAILED"}
+
+# Scans remembered by the server; the oldest finished ones are forgotten first
+MAX_TRACKED_SCANS = 100
+
+# Event type filter and plan of the scans started here, so they still apply
+# after a server restart; empty to keep them in memory only
+SPIDERFOOT_SCANS_PATH = os.environ.get("OSINT_SPIDERFOOT_SCANS", "/app/reports/osint_spiderfoot_scans.json")
+
+# Format of SpiderFoot's last-seen times, and how far before the newest one
+# read a refresh looks again, for events stored some time after they were found
+LAST_SEEN_FORMAT = "%Y-%m-%d %H:%M:%S"
+LAST_SEEN_GRACE_SECONDS = 120
+
+class SpiderFootError(Exception):
+    """The SpiderFoot instance could not be started or refused a request."""
+
+def last_seen_cutoff(last_seen: str) -> str:
+    """The last-seen time LAST_SEEN_GRACE_SECONDS before last_seen, in the same format."""
+    try:
+        seconds = time.mktime(time.strptime(last_seen, LAST_SEEN_FORMAT))
+    except ValueError:
+        return ""
+    return time.strftime(LAST_SEEN_FORMAT, time.localtime(seconds - LAST_SEEN_GRACE_SECONDS))
+
+class DaemonScan:
+    """A scan running in the SpiderFoot instance and the events seen so far.
+    
+    Events go through an EventCollector, so they are deduplicated and bounded
+    in count and data size like the output of a one-shot scan. The
+    collector's records are the only copy of each event; the scan keeps
+    references to them in the order they arrived, for cursor paging.
+    """
+    
+    def __init__(self, scan_id: str, target: str, event_types: Optional[List[str]] = None, plan: Optional[Dict[str, Any]] = None, started: Optional[float] = None):
+        self.scan_id = scan_id
+        self.target = target
+        self.event_types = set(event_types or [])
+        self.plan = plan
+        self.started = started or time.time()
+        self.status = "STARTING"
+        self.collector = EventCollector()
+        # (event type, collector record) of every kept event, oldest first
+        self.order: List[Tuple[str, Dict[str, Any]]] = []
+        # Per event type: how many events SpiderFoot had stored at the last
+        # refresh, and the newest last-seen time read
+        self.type_totals: Dict[str, Any] = {}
+        self.last_seen: Dict[str, str] = {}
+    
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+    
+    @property
+    def event_count(self) -> int:
+        return len(self.order)
+    
+    @property
+    def full(self) -> bool:
+        return self.collector.counters["kept"] >= self.collector.max_events
+    
+    def wants(self, event_type: str) -> bool:
+        return event_type != "ROOT" and (not self.event_types or event_type in self.event_types)
+    
+    def add(self, event_type: str, rows: List[List[Any]]) -> List[Dict[str, Any]]:
+        """Record the scaneventresults rows of event_type not seen before; return them.
+        
+        Rows are [last seen, data, source data, module, ...] with data and
+        source HTML-escaped.
+        """
+        newest = self.last_seen.get(event_type, "")
+        cutoff = last_seen_cutoff(newest) if newest else ""
+        added = []
+        for row in rows:
+            if not isinstance(row, list) or len(row) < 4:
+                continue
+            last_seen = str(row[0])
+            if last_seen < cutoff:
+                continue
+            newest = max(newest, last_seen)
+            source = html.unescape(str(row[2])) if row[2] else None
+            record = self.collector.add(event_type, html.unescape(str(row[1])), row[3], source)
+            if record is None:
+                continue
+            record["last_seen"] = last_seen
+            self.order.append((event_type, record))
+            added.append({"type": event_type, **record})
+        self.last_seen[event_type] = newest
+        return added
+    
+    def events(self, cursor: int, limit: int) -> List[Dict[str, Any]]:
+        """Up to limit events from index cursor on, in the order they arrived."""
+        return [{"type": event_type, **record} for event_type, record in self.order[cursor:cursor + limit]]
+    
+    def saved(self) -> Dict[str, Any]:
+        """What a restarted server needs to keep treating the scan the same way."""
+        return {"target": self.target, "event_types": sorted(self.event_types), "plan": self.plan, "started": self.started}
+    
+    def describe(self) -> Dict[str, Any]:
+        return {"scan_id": self.scan_id, "target": self.target, "status": self.status, "finished": self.finished, "event_count": self.event_count}
+
+class SpiderFootDaemon:
+    """One SpiderFoot web server, started on first use, and the scans submitted to it."""
+    
+    def __init__(self, listen: str = SPIDERFOOT_LISTEN, spiderfoot_dir: str = SPIDERFOOT_DIR, scans_path: Optional[str] = SPIDERFOOT_SCANS_PATH):
+        self.listen = listen
+        self.spiderfoot_dir = spiderfoot_dir
+        self.scans_path = scans_path
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._lock = asyncio.Lock()
+        self.scans: "OrderedDict[str, DaemonScan]" = OrderedDict()
+        # saved() of the scans started here, read from scans_path on first use
+        self._saved: "Optional[OrderedDict[str, Dict[str, Any]]]" = None
+        self._save_lock = asyncio.Lock()
+        self.counters = {"daemon_starts": 0, "scans_started": 0, "refreshes": 0, "type_fetches": 0}
+    
+    def _call(self, path: str, params: Optional[Dict[str, Any]] = None, post: bool = False) -> Any:
+        url = f"http://{self.listen}/{path}"
+        query = urlencode(params or {})
+        headers = {"Accept": "application/json"}
+        if post:
+            request = Request(url, data=query.encode(), headers=headers)
+        else:
+            request = Request(f"{url}?{query}" if query else url, headers=headers)
+        with urlopen(request, timeout=REQUEST_TIMEOUT_SECONDS) as response:
+            body = response.read()
+        return json.loads(body) if body.strip() else None
+    
+    async def request(self, path: str, params: Optional[Dict[str, Any]] = None, post: bool = False) -> Any:
+        """Call one API endpoint and return its decoded JSON reply."""
+        try:
+            reply = await asyncio.to_thread(self._call, path, params, post)
+        except (OSError, ValueError) as e:
+            raise SpiderFootError(f"SpiderFoot {path} request failed: {e}") from e
+        # Failures come back as ["ERROR", message]
+        if isinstance(reply, list) and reply[:1] == ["ERROR"]:
+            raise SpiderFootError(f"SpiderFoot {path}: {reply[1] if len(reply) > 1 else 'error'}")
+        return reply
+    
+    async def _alive(self) -> bool:
+        try:
+            await asyncio.to_thread(self._call, "ping")
+        except (OSError, ValueError):
+            return False
+        return True
+    
+    async def ensure_started(self) -> None:
+        """Start the web server unless one already answers on the address.
+        
+        An instance left running by an earlier server process is reused, so
+        its scans can still be read.
+        """
+        async with self._lock:
+            if await self._alive():
+                return
+            if self._process is None or self._process.returncode is not None:
+                sf_path = os.path.join(self.spiderfoot_dir, "sf.py")
+                if not os.path.exists(sf_path):
+                    raise SpiderFootError(f"SpiderFoot is not installed in {self.spiderfoot_dir}")
+                self._process = await asyncio.create_subprocess_exec(
+                    "python3", sf_path, "-l", self.listen,
+                    cwd=self.spiderfoot_dir,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.DEVNULL,
+                    start_new_session=True
+                )
+                self.counters["daemon_starts"] += 1
+            give_up = time.monotonic() + DAEMON_START_SECONDS
+            while time.monotonic() < give_up:
+                if self._process.returncode is not None:
+                    raise SpiderFootError(f"SpiderFoot exited with code {self._process.returncode} while starting")
+                if await self._alive():
+                    return
+                await asyncio.sleep(0.5)
+            raise SpiderFootError(f"SpiderFoot did not answer on {self.listen} within {DAEMON_START_SECONDS}s")
+    
+    def _read_saved(self) -> "OrderedDict[str, Dict[str, Any]]":
+        if not self.scans_path:
+            return OrderedDict()
+        try:
+            with open(self.scans_path, encoding="utf-8") as f:
+                return OrderedDict(json.load(f))
+        except FileNotFoundError:
+            return OrderedDict()
+        except (OSError, ValueError, TypeError) as e:
+            print(f"SpiderFoot: ignoring saved scans in {self.scans_path} ({e})", file=sys.stderr)
+            return OrderedDict()
+    
+    def _write_saved(self, saved: Dict[str, Dict[str, Any]]) -> None:
+        directory = os.path.dirname(self.scans_path) or "."
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".spiderfoot-scans-")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(saved, f)
+            os.replace(temp_path, self.scans_path)
+        except OSError as e:
+            print(f"SpiderFoot: could not save scans to {self.scans_path} ({e})", file=sys.stderr)
+    
+    async def _load_saved(self) -> "OrderedDict[str, Dict[str, Any]]":
+        if self._saved is None:
+            saved = await asyncio.to_thread(self._read_saved)
+            if self._saved is None:
+                self._saved = saved
+        return self._saved
+    
+    async def _save(self, scan: DaemonScan) -> None:
+        """Remember scan's filter and plan across restarts."""
+        saved = await self._load_saved()
+        saved[scan.scan_id] = scan.saved()
+        while len(saved) > MAX_TRACKED_SCANS:
+            saved.popitem(last=False)
+        if self.scans_path:
+            async with self._save_lock:
+                await asyncio.to_thread(self._write_saved, dict(saved))
+    
+    def _track(self, scan: DaemonScan) -> None:
+        self.scans[scan.scan_id] = scan
+        while len(self.scans) > MAX_TRACKED_SCANS:
+            oldest = next((scan_id for scan_id, tracked in self.scans.items() if tracked.finished), None)
+            if oldest is None:
+                break
+            del self.scans[oldest]
+    
+    async def start_scan(self, target: str, modules: List[str], event_types: Optional[List[str]] = None, plan: Optional[Dict[str, Any]] = None) -> DaemonScan:
+        """Submit a scan and return it without waiting for any results."""
+        await self.ensure_started()
+        reply = await self.request("startscan", {
+            "scanname": f"osint-mcp {target}",
+            "scantarget": target,
+            "modulelist": ",".join(modules),
+            # Ignored when modules are given; event types are filtered here instead
+            "typelist": "",
+            "usecase": ""
+        }, post=True)
+        if not (isinstance(reply, list) and len(reply) > 1):
+            raise SpiderFootError(f"Unexpected reply to startscan: {reply!r}")
+        scan = DaemonScan(str(reply[1]), target, event_types, plan)
+        self._track(scan)
+        self.counters["scans_started"] += 1
+        await self._save(scan)
+        return scan
+    
+    async def refresh(self, scan_id: str) -> Tuple[DaemonScan, List[Dict[str, Any]]]:
+        """Update a scan's status and events from the instance; return it and its new events.
+        
+        Scans started before a server restart are picked up by their id, with
+        the event type filter they were started with. Only the event types
+        whose count grew since the last refresh are downloaded again.
+        """
+        await self.ensure_started()
+        # [name, target, created, started, ended, status, risk matrix]
+        status = await self.request("scanstatus", {"id": scan_id})
+        if not (isinstance(status, list) and len(status) > 5):
+            raise SpiderFootError(f"Unknown SpiderFoot scan {scan_id}")
+        scan = self.scans.get(scan_id)
+        if scan is None:
+            saved = (await self._load_saved()).get(scan_id) or {}
+            scan = DaemonScan(scan_id, saved.get("target") or status[1], saved.get("event_types"), saved.get("plan"), saved.get("started"))
+            self._track(scan)
+        # Status first: a scan reported finished has all its events stored
+        scan.status = status[5]
+        self.counters["refreshes"] += 1
+        added: List[Dict[str, Any]] = []
+        if scan.full:
+            return scan, added
+        # [type, description, last seen, total, unique total, ...] per event type
+        summary = await self.request("scansummary", {"id": scan_id, "by": "type"})
+        for row in summary if isinstance(summary, list) else []:
+            if not (isinstance(row, list) and len(row) > 3) or not scan.wants(row[0]):
+                continue
+            event_type, total = row[0], row[3]
+            if scan.type_totals.get(event_type) == total:
+                continue
+            rows = await self.request("scaneventresults", {"id": scan_id, "eventType": event_type})
+            self.counters["type_fetches"] += 1
+            added.extend(scan.add(event_type, rows if isinstance(rows, list) else []))
+            scan.type_totals[event_type] = total
+            if scan.full:
+                break
+        return scan, added
+    
+    async def stop_scan(self, scan_id: str) -> None:
+        await self.ensure_started()
+        await self.request("stopscan", {"id": scan_id})
+    
+    async def close(self) -> None:
+        """Stop the instance if this server started it; its scans end with it."""
+        if self._process is not None:
+            await terminate_process_group(self._process)
+            self._process = None
+    
+    def stats(self) -> Dict[str, Any]:
+        return dict(
+            self.counters,
+            listen=self.listen,
+            running=self._process is not None and self._process.returncode is None,
+            scans=[scan.describe() for scan in self.scans.values() if not scan.finished]
+        )
+
+# One instance per server, started by the first asynchronous scan
+SPIDERFOOT_DAEMON = SpiderFootDaemon()
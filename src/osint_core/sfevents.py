@@ -0,0 +1,159 @@
+"""
+Incremental parsing of SpiderFoot's JSON event output.
+
+`sf.py -o json` writes one JSON array with an event per line. The parser
+takes the place of the output capture: each event is decoded as soon as its
+line is complete, reduced to a compact record and dropped if an identical
+(type, data, module) event was seen before, so the raw document is never
+held in memory. Records are grouped by event type, and the result is
+bounded in event count and per-event data size.
+"""
+
+import codecs
+import hashlib
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+# Distinct events kept per scan; later ones are counted but not kept
+MAX_EVENTS = int(os.environ.get("OSINT_SPIDERFOOT_MAX_EVENTS", "50000"))
+
+# Characters of an event's data kept; longer data is cut and marked
+MAX_DATA_CHARS = 4096
+
+# Characters of an event's source data kept
+MAX_SOURCE_CHARS = 256
+
+# A single event line longer than this is skipped rather than buffered
+MAX_EVENT_BYTES = 16 * 1024 * 1024
+
+# Characters of non-event output (warnings, errors) kept
+MAX_TEXT_CHARS = 64 * 1024
+
+EventCallback = Callable[[str, Dict[str, Any]], None]
+
+class EventCollector:
+    """Deduplicated, size-bounded event records grouped by event type."""
+    
+    def __init__(self, max_events: int = MAX_EVENTS, max_data_chars: int = MAX_DATA_CHARS):
+        self.max_events = max_events
+        self.max_data_chars = max_data_chars
+        self.groups: Dict[str, List[Dict[str, Any]]] = {}
+        # Digests rather than the data itself, so large events are not kept twice
+        self._seen: Set[Tuple[str, Optional[str], bytes]] = set()
+        self.counters = {"events": 0, "kept": 0, "duplicates": 0, "dropped": 0, "data_truncated": 0}
+    
+    def add(self, event_type: str, data: Any, module: Optional[str], source: Any = None) -> Optional[Dict[str, Any]]:
+        """Record one event; return its record, or None for a duplicate or once full."""
+        self.counters["events"] += 1
+        data = data if isinstance(data, str) else json.dumps(data)
+        key = (event_type, module, hashlib.blake2b(data.encode("utf-8", errors="ignore"), digest_size=16).digest())
+        if key in self._seen:
+            self.counters["duplicates"] += 1
+            return None
+        if self.counters["kept"] >= self.max_events:
+            self.counters["dropped"] += 1
+            return None
+        self._seen.add(key)
+        record: Dict[str, Any] = {"data": data[:self.max_data_chars], "module": module}
+        if len(data) > self.max_data_chars:
+            record["data_length"] = len(data)
+            self.counters["data_truncated"] += 1
+        if source:
+            record["source"] = str(source)[:MAX_SOURCE_CHARS]
+        self.groups.setdefault(event_type, []).append(record)
+        self.counters["kept"] += 1
+        return record
+    
+    def result(self) -> Dict[str, Any]:
+        return {
+            "counts": {event_type: len(records) for event_type, records in sorted(self.groups.items())},
+            "events": dict(sorted(self.groups.items())),
+            "stats": dict(self.counters)
+        }
+
+class SpiderFootEventParser:
+    """Streaming parser for `sf.py -o json`, usable as run_command_in_venv's stdout capture.
+    
+    feed() takes raw output bytes; each complete event line goes to the
+    collector, and on_event is called with its type and record. Lines that
+    are not events (warnings, errors) are kept as text, up to
+    MAX_TEXT_CHARS, and returned by getvalue().
+    """
+    
+    def __init__(self, on_event: Optional[EventCallback] = None, collector: Optional[EventCollector] = None):
+        self.on_event = on_event
+        self.collector = collector or EventCollector()
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        self._json = json.JSONDecoder()
+        # Text of the incomplete last line, in the pieces it arrived in
+        self._pending: List[str] = []
+        self._pending_chars = 0
+        # Inside an oversized line, discarded up to its end
+        self._skipping = False
+        self._text: List[str] = []
+        self._text_chars = 0
+        self.oversized = 0
+    
+    def feed(self, data: bytes) -> None:
+        self._take(self._decoder.decode(data))
+    
+    def finish(self) -> None:
+        self._take(self._decoder.decode(b"", final=True))
+        if self._pending and not self._skipping:
+            self._line("".join(self._pending))
+        self._pending = []
+    
+    def _take(self, text: str) -> None:
+        end = text.find("\n")
+        if end < 0:
+            if not self._skipping:
+                self._pending.append(text)
+                self._pending_chars += len(text)
+                if self._pending_chars > MAX_EVENT_BYTES:
+                    self._pending = []
+                    self._skipping = True
+                    self.oversized += 1
+            return
+        if not self._skipping:
+            self._line("".join(self._pending) + text[:end])
+        self._skipping = False
+        *lines, rest = text[end + 1:].split("\n")
+        for line in lines:
+            self._line(line)
+        self._pending = [rest] if rest else []
+        self._pending_chars = len(rest)
+    
+    def _line(self, line: str) -> None:
+        # Events may be wrapped in the array's brackets and separating commas
+        text = line.strip().lstrip("[,").rstrip("],").strip()
+        if not text:
+            return
+        if text.startswith("{"):
+            try:
+                event, _ = self._json.raw_decode(text)
+            except ValueError:
+                event = None
+            if isinstance(event, dict) and "type" in event:
+                record = self.collector.add(str(event["type"]), event.get("data", ""), event.get("module"), event.get("source"))
+                if record is not None and self.on_event is not None:
+                    self.on_event(str(event["type"]), record)
+                return
+        if self._text_chars < MAX_TEXT_CHARS:
+            kept = line[:MAX_TEXT_CHARS - self._text_chars]
+            self._text.append(kept + "\n")
+            self._text_chars += len(kept) + 1
+    
+    def getvalue(self) -> str:
+        """Output that was not an event."""
+        return "".join(self._text)
+    
+    def close(self) -> None:
+        self._pending = []
+        self._text = []
+    
+    def result(self) -> Dict[str, Any]:
+        result = self.collector.result()
+        if self.oversized:
+            result["stats"]["oversized_skipped"] = self.oversized
+        return result
@@ -0,0 +1,164 @@
+"""
+SpiderFoot scan profiles.
+
+Rather than launching every module with `-u all`, a scan picks its modules
+from a named profile, an explicit module list, or the event types wanted.
+Module metadata (use cases, flags, produced and watched events) is read from
+SpiderFoot's module sources with ast, without importing them, and cached
+until the modules directory changes. Modules that need an API key are left
+out unless the key is set in the environment.
+"""
+
+import ast
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+SPIDERFOOT_DIR = os.environ.get("OSINT_SPIDERFOOT_DIR", "/opt/spiderfoot")
+
+# Profile name -> (SpiderFoot use case or None for every module, module flags
+# that exclude a module). passive-fast also drops modules that need external
+# tools or Tor, which fail or stall without extra setup.
+SCAN_PROFILES: Dict[str, Tuple[Optional[str], Set[str]]] = {
+    "passive-fast": ("Passive", {"slow", "invasive", "errorprone", "tool", "tor"}),
+    "footprint": ("Footprint", set()),
+    "investigate": ("Investigate", set()),
+    "all": (None, set()),
+}
+DEFAULT_PROFILE = "footprint"
+
+class SpiderFootModule:
+    """Metadata of one sfp_* module, as declared in its source."""
+    
+    def __init__(self, name: str, use_cases: List[str], flags: List[str], produces: List[str], watches: List[str]):
+        self.name = name
+        self.use_cases = use_cases
+        self.flags = flags
+        self.produces = produces
+        self.watches = watches
+    
+    @property
+    def key_variable(self) -> Optional[str]:
+        """Environment variable holding the module's API key, e.g. SHODAN_API_KEY for sfp_shodan."""
+        if "apikey" not in self.flags:
+            return None
+        return f"{self.name[len('sfp_'):].upper()}_API_KEY"
+
+def parse_module(path: Path) -> Optional[SpiderFootModule]:
+    """Read a module's meta, producedEvents() and watchedEvents() from its source."""
+    try:
+        tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    except (OSError, SyntaxError, ValueError):
+        return None
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == path.stem:
+            break
+    else:
+        return None
+    meta: Dict[str, Any] = {}
+    events: Dict[str, List[str]] = {}
+    for item in node.body:
+        try:
+            if isinstance(item, ast.Assign) and any(isinstance(target, ast.Name) and target.id == "meta" for target in item.targets):
+                meta = ast.literal_eval(item.value)
+            elif isinstance(item, ast.FunctionDef) and item.name in ("producedEvents", "watchedEvents"):
+                returned = next((statement.value for statement in ast.walk(item) if isinstance(statement, ast.Return) and statement.value is not None), None)
+                events[item.name] = list(ast.literal_eval(returned)) if returned is not None else []
+        except (TypeError, ValueError):
+            # Computed rather than literal; treated as not declared
+            continue
+    return SpiderFootModule(
+        node.name,
+        list(meta.get("useCases", [])) if isinstance(meta, dict) else [],
+        list(meta.get("flags", [])) if isinstance(meta, dict) else [],
+        events.get("producedEvents", []),
+        events.get("watchedEvents", [])
+    )
+
+_catalog: Optional[Tuple[float, Dict[str, SpiderFootModule]]] = None
+
+def load_modules(spiderfoot_dir: str = SPIDERFOOT_DIR) -> Dict[str, SpiderFootModule]:
+    """Every sfp_* module of the installation, re-read when the modules directory changes.
+    
+    Storage modules (sfp__*) are left out; sf.py adds them itself. Parsing
+    a few hundred files takes a moment; call this from a thread.
+    """
+    global _catalog
+    modules_dir = Path(spiderfoot_dir) / "modules"
+    try:
+        mtime = modules_dir.stat().st_mtime
+    except OSError:
+        return {}
+    if _catalog is None or _catalog[0] != mtime:
+        modules = {}
+        for path in sorted(modules_dir.glob("sfp_*.py")):
+            if path.stem.startswith("sfp__"):
+                continue
+            module = parse_module(path)
+            if module is None:
+                print(f"SpiderFoot module metadata unreadable: {path.name}", file=sys.stderr)
+                continue
+            modules[module.name] = module
+        _catalog = (mtime, modules)
+    return _catalog[1]
+
+def with_producers(candidates: Dict[str, SpiderFootModule], event_types: Set[str]) -> Set[str]:
+    """Modules among candidates producing event_types, plus those producing what they watch, recursively."""
+    wanted = set(event_types)
+    chosen: Set[str] = set()
+    while True:
+        added = {name for name, module in candidates.items() if name not in chosen and wanted.intersection(module.produces)}
+        if not added:
+            return chosen
+        chosen |= added
+        # "*" (every event) says nothing about dependencies
+        wanted = {event for name in added for event in candidates[name].watches if event != "*"}
+
+def plan_scan(profile: Optional[str] = None, modules: Optional[List[str]] = None, event_types: Optional[List[str]] = None, spiderfoot_dir: str = SPIDERFOOT_DIR) -> Dict[str, Any]:
+    """Choose the modules of a scan.
+    
+    Explicit modules replace the profile. Event types narrow the profile's
+    modules to those producing the types, plus the modules they depend on.
+    Returns the sorted module names, the modules pruned for a missing API
+    key with the variable they need, and any unknown names.
+    Raises ValueError for an unknown profile and LookupError when SpiderFoot
+    is not installed.
+    """
+    catalog = load_modules(spiderfoot_dir)
+    if not catalog:
+        raise LookupError(f"No SpiderFoot modules found in {spiderfoot_dir}")
+    unknown: List[str] = []
+    if modules:
+        profile = "custom"
+        selected = set()
+        for name in modules:
+            name = name.strip().lower()
+            name = name if name.startswith("sfp_") else f"sfp_{name}"
+            if name in catalog:
+                selected.add(name)
+            else:
+                unknown.append(name)
+    else:
+        profile = profile or DEFAULT_PROFILE
+        if profile not in SCAN_PROFILES:
+            raise ValueError(f"Unknown SpiderFoot profile {profile!r}; choose one of {', '.join(SCAN_PROFILES)}")
+        use_case, excluded = SCAN_PROFILES[profile]
+        selected = {
+            name for name, module in catalog.items()
+            if (use_case is None or use_case in module.use_cases) and not excluded.intersection(module.flags)
+        }
+    if event_types and not modules:
+        # Explicit modules are run as given; the types then only filter the output
+        selected = with_producers({name: catalog[name] for name in selected}, set(event_types))
+    pruned = {}
+    for name in sorted(selected):
+        variable = catalog[name].key_variable
+        if variable and not os.environ.get(variable):
+            pruned[name] = variable
+    return {
+        "profile": profile,
+        "modules": sorted(selected - set(pruned)),
+        "pruned_missing_keys": pruned,
+        "unknown_modules": unknown
+    }
@@ -0,0 +1,331 @@
+"""
+Compiled site-definition index.
+
+The Sherlock, Maigret and WhatsMyName site databases are compiled once (at
+image build time, or on first use) into one versioned binary file. Every
+string in it, from URL templates and detection markers to header sets and
+tags, is stored once in an interned string table. Regexes that Python
+cannot compile are dropped at build time. The file is memory-mapped
+read-only, so loading it parses no JSON and processes that open it share
+the same pages. Site objects are decoded only for the sites a call selects.
+
+Build it with: python -m osint_core build-site-index [PATH]
+"""
+
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .sites import (
+    MAIGRET_TOP_SITES,
+    SITE_SOURCES,
+    Site,
+    load_maigret_sites,
+    load_sherlock_sites,
+    load_sites,
+    load_wmn_sites,
+    site_database_paths,
+)
+
+# Location of the compiled index; built here on first use if missing or stale
+SITE_INDEX_PATH = os.environ.get("OSINT_SITE_INDEX", "/app/data/sites.idx")
+
+MAGIC = b"OSINTIDX"
+FORMAT_VERSION = 1
+
+# magic, format version, metadata length, string count, string bytes,
+# list item count, entry count
+HEADER = struct.Struct("<8sIIIIII")
+
+# source, flags, claimed status (-1 for any), rank, then string ids of key,
+# name, url, probe_url, method, payload, headers and regex, then (start,
+# count) into the list table for absent statuses, absent strings, present
+# strings and tags
+ENTRY = struct.Struct("<BBhI8I8I")
+
+NONE = 0xFFFFFFFF
+FLAG_REQUIRE_SUCCESS = 1
+FLAG_FOLLOW_REDIRECTS = 2
+
+class IndexUnavailable(Exception):
+    """Raised when an index file is missing, corrupt or from another format version."""
+
+def source_signature(path: Optional[str]) -> Optional[List[Any]]:
+    """Identify a source database file by path, size and modification time."""
+    if path is None:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [path, stat.st_size, stat.st_mtime_ns]
+
+def valid_regex(pattern: Optional[str]) -> Optional[str]:
+    if not pattern:
+        return None
+    try:
+        re.compile(pattern)
+    except re.error:
+        return None
+    return pattern
+
+def build_index(path: str = SITE_INDEX_PATH) -> Dict[str, Any]:
+    """Compile every available source database into an index file at path.
+    
+    All enabled Maigret sites are included in rank order, so calls can pick
+    the top N. The file is written to a temporary name and renamed, so
+    processes that have the previous index mapped keep a consistent view.
+    Returns the index metadata.
+    """
+    paths = site_database_paths()
+    loaders = {"sherlock": load_sherlock_sites, "maigret": lambda source: load_maigret_sites(source, None), "blackbird": load_wmn_sites}
+    strings: Dict[str, int] = {}
+    items: List[int] = []
+    entries: List[bytes] = []
+    meta: Dict[str, Any] = {"format": FORMAT_VERSION, "built_at": time.time(), "sources": {}}
+    
+    def string_id(value: Optional[str]) -> int:
+        if value is None:
+            return NONE
+        if value not in strings:
+            strings[value] = len(strings)
+        return strings[value]
+    
+    def list_ref(values: Iterable[int]) -> Tuple[int, int]:
+        values = list(values)
+        start = len(items)
+        items.extend(values)
+        return start, len(values)
+    
+    for number, source in enumerate(SITE_SOURCES):
+        signature = source_signature(paths.get(source))
+        meta["sources"][source] = {"signature": signature, "sites": 0}
+        if signature is None:
+            continue
+        try:
+            sites = loaders[source](signature[0])
+        except (OSError, ValueError, AttributeError, TypeError) as e:
+            meta["sources"][source]["error"] = str(e)
+            continue
+        meta["sources"][source]["sites"] = len(sites)
+        for site in sites:
+            flags = (FLAG_REQUIRE_SUCCESS if site.require_success else 0) | (FLAG_FOLLOW_REDIRECTS if site.follow_redirects else 0)
+            headers = json.dumps(site.headers, sort_keys=True) if site.headers else None
+            entries.append(ENTRY.pack(
+                number,
+                flags,
+                site.claimed_status if site.claimed_status is not None else -1,
+                site.rank if site.rank is not None else NONE,
+                string_id(site.key),
+                string_id(site.name),
+                string_id(site.url),
+                string_id(site.probe_url),
+                string_id(site.method),
+                string_id(site.payload),
+                string_id(headers),
+                string_id(valid_regex(site.regex)),
+                *list_ref(site.absent_statuses),
+                *list_ref(string_id(text) for text in site.absent_strings),
+                *list_ref(string_id(text) for text in site.present_strings),
+                *list_ref(string_id(tag) for tag in site.tags)
+            ))
+    
+    encoded = [value.encode("utf-8") for value in strings]
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    meta_bytes = json.dumps(meta).encode("utf-8")
+    
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".sites-", suffix=".idx")
+    try:
+        os.chmod(temp_path, 0o644)
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(meta_bytes), len(encoded), offsets[-1], len(items), len(entries)))
+            f.write(meta_bytes)
+            f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+            f.write(b"".join(encoded))
+            f.write(struct.pack(f"<{len(items)}I", *items))
+            f.write(b"".join(entries))
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return meta
+
+class SiteIndex:
+    """Read-only, memory-mapped view of a compiled site index."""
+    
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            with open(path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise IndexUnavailable(f"cannot open {path}: {e}")
+        if len(self._map) < HEADER.size:
+            raise IndexUnavailable(f"{path} is truncated")
+        magic, version, meta_length, string_count, string_bytes, item_count, entry_count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise IndexUnavailable(f"{path} is not a format {FORMAT_VERSION} site index")
+        offset = HEADER.size
+        try:
+            self.meta = json.loads(self._map[offset:offset + meta_length])
+        except ValueError:
+            raise IndexUnavailable(f"{path} has corrupt metadata")
+        offset += meta_length
+        self._offsets = offset
+        self._strings_start = offset + (string_count + 1) * 4
+        self._items = self._strings_start + string_bytes
+        self._entries = self._items + item_count * 4
+        self.entry_count = entry_count
+        if self._entries + entry_count * ENTRY.size != len(self._map):
+            raise IndexUnavailable(f"{path} has an inconsistent size")
+        # Decoded strings, interned so equal templates share one object
+        self._strings: List[Optional[str]] = [None] * string_count
+        # Selections already decoded, by (sources, maigret_top); callers
+        # filter the site list but never modify the sites
+        self._selections: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+    
+    def string(self, number: int) -> Optional[str]:
+        if number == NONE:
+            return None
+        value = self._strings[number]
+        if value is None:
+            start, end = struct.unpack_from("<II", self._map, self._offsets + number * 4)
+            value = sys.intern(self._map[self._strings_start + start:self._strings_start + end].decode("utf-8"))
+            self._strings[number] = value
+        return value
+    
+    def numbers(self, start: int, count: int) -> Tuple[int, ...]:
+        return struct.unpack_from(f"<{count}I", self._map, self._items + start * 4) if count else ()
+    
+    def is_current(self) -> bool:
+        """Whether the index was built from the source databases present now."""
+        paths = site_database_paths()
+        return all(
+            (self.meta["sources"].get(source) or {}).get("signature") == source_signature(paths.get(source))
+            for source in SITE_SOURCES
+        )
+    
+    def _site(self, fields: Tuple[int, ...], sources: List[str]) -> Site:
+        number, flags, claimed_status, rank = fields[:4]
+        key, name, url, probe_url, method, payload, headers, regex = fields[4:12]
+        lists = fields[12:]
+        return Site(
+            name=self.string(name),
+            url=self.string(url),
+            probe_url=self.string(probe_url),
+            method=self.string(method),
+            payload=self.string(payload),
+            headers=json.loads(self.string(headers)) if headers != NONE else {},
+            regex=self.string(regex),
+            claimed_status=claimed_status if claimed_status >= 0 else None,
+            require_success=bool(flags & FLAG_REQUIRE_SUCCESS),
+            absent_statuses=self.numbers(lists[0], lists[1]),
+            absent_strings=tuple(self.string(item) for item in self.numbers(lists[2], lists[3])),
+            present_strings=tuple(self.string(item) for item in self.numbers(lists[4], lists[5])),
+            follow_redirects=bool(flags & FLAG_FOLLOW_REDIRECTS),
+            sources=sources,
+            tags=tuple(self.string(item) for item in self.numbers(lists[6], lists[7])),
+            rank=rank if rank != NONE else None
+        )
+    
+    def select(self, sources: Iterable[str] = SITE_SOURCES, maigret_top: Optional[int] = MAIGRET_TOP_SITES) -> Dict[str, Any]:
+        """Merged sites of the chosen sources, in the same shape as sites.load_sites()."""
+        wanted = {SITE_SOURCES.index(source) for source in sources if source in SITE_SOURCES}
+        cache_key = (tuple(sorted(wanted)), maigret_top)
+        if cache_key in self._selections:
+            return dict(self._selections[cache_key])
+        maigret = SITE_SOURCES.index("maigret")
+        # Entries are stored in merge order, so the first entry of a key wins
+        chosen: Dict[int, Tuple[Tuple[int, ...], List[str]]] = {}
+        counts = [0] * len(SITE_SOURCES)
+        duplicates = 0
+        for position in range(self.entry_count):
+            fields = ENTRY.unpack_from(self._map, self._entries + position * ENTRY.size)
+            number, rank, key = fields[0], fields[3], fields[4]
+            if number not in wanted or (number == maigret and maigret_top is not None and rank >= maigret_top):
+                continue
+            counts[number] += 1
+            if key in chosen:
+                duplicates += 1
+                if SITE_SOURCES[number] not in chosen[key][1]:
+                    chosen[key][1].append(SITE_SOURCES[number])
+            else:
+                chosen[key] = (fields, [SITE_SOURCES[number]])
+        unavailable = {}
+        per_source = {}
+        for number in sorted(wanted):
+            source = SITE_SOURCES[number]
+            info = self.meta["sources"].get(source) or {}
+            if info.get("signature") is None:
+                unavailable[source] = "site database not found"
+            elif info.get("error"):
+                unavailable[source] = f"could not load {info['signature'][0]}: {info['error']}"
+            else:
+                per_source[source] = counts[number]
+        selection = {
+            "sites": [self._site(fields, sources) for fields, sources in chosen.values()],
+            "per_source": per_source,
+            "duplicates": duplicates,
+            "unavailable": unavailable
+        }
+        self._selections[cache_key] = selection
+        return dict(selection)
+    
+    def close(self) -> None:
+        self._map.close()
+
+_index: Optional[SiteIndex] = None
+_index_lock = threading.Lock()
+# Index path that could not be built, so it is not retried on every call
+_unbuildable: Optional[str] = None
+
+def open_site_index(path: str = SITE_INDEX_PATH) -> Optional[SiteIndex]:
+    """Return the process's index, rebuilding it when sources changed; None if unusable."""
+    global _index, _unbuildable
+    with _index_lock:
+        if _index is not None and _index.path == path and _index.is_current():
+            return _index
+        if _unbuildable == path:
+            return None
+        try:
+            index = SiteIndex(path)
+            if not index.is_current():
+                index.close()
+                raise IndexUnavailable(f"{path} is out of date")
+        except IndexUnavailable:
+            try:
+                build_index(path)
+                index = SiteIndex(path)
+            except (OSError, IndexUnavailable) as e:
+                print(f"Site index unavailable ({e}), parsing the site databases", file=sys.stderr)
+                _unbuildable = path
+                return None
+        # The previous mapping is not closed here: a call on another
+        # thread may still be reading it
+        _index = index
+        return index
+
+def select_sites(sources: Iterable[str] = SITE_SOURCES, maigret_top: Optional[int] = MAIGRET_TOP_SITES) -> Dict[str, Any]:
+    """Merged sites for a call, from the compiled index when one is usable."""
+    index = open_site_index()
+    if index is None:
+        return load_sites(sources, maigret_top)
+    return index.select(sources, maigret_top)
+
+def build_index_command(path: str = SITE_INDEX_PATH) -> int:
+    """Build the index and print a per-source summary."""
+    meta = build_index(path)
+    summary = ", ".join(f"{source}: {info['sites']}" for source, info in meta["sources"].items())
+    print(f"Wrote site index {path} ({summary})")
+    return 0
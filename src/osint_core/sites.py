@@ -0,0 +1,313 @@
+"""
+Username site databases.
+
+Sherlock, Maigret and Blackbird (WhatsMyName) each ship a JSON list of sites
+with a profile URL template and a rule for telling a claimed username from a
+free one. The loaders here turn all three formats into one Site model, and
+merge_sites() deduplicates them by normalized URL template, so a site listed
+by several databases is probed once and reports every database that covers
+it.
+"""
+
+import importlib.util
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Placeholder for the username in every normalized URL and payload template
+USERNAME = "{username}"
+
+# Source databases in merge order; a site listed by several keeps the check
+# of the first one
+SITE_SOURCES = ["sherlock", "maigret", "blackbird"]
+
+# Maigret sites probed by default, by rank, matching the CLI's default
+MAIGRET_TOP_SITES = 500
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:129.0) Gecko/20100101 Firefox/129.0"
+}
+
+@dataclass
+class Site:
+    """One probeable site and the rule that detects a claimed username.
+    
+    A response means the username is claimed when its status is not one of
+    absent_statuses and matches (claimed_status exactly, otherwise any 2xx
+    unless require_success is off), its body contains none of absent_strings
+    and, if present_strings is set, at least one of them. Templates use
+    {username}. rank orders Maigret sites by popularity (0 is the top site).
+    """
+    name: str
+    url: str
+    probe_url: str
+    method: str = "GET"
+    payload: Optional[str] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+    regex: Optional[str] = None
+    claimed_status: Optional[int] = None
+    require_success: bool = True
+    absent_statuses: Tuple[int, ...] = ()
+    absent_strings: Tuple[str, ...] = ()
+    present_strings: Tuple[str, ...] = ()
+    follow_redirects: bool = True
+    sources: List[str] = field(default_factory=list)
+    tags: Tuple[str, ...] = ()
+    rank: Optional[int] = None
+    
+    @property
+    def needs_body(self) -> bool:
+        return bool(self.absent_strings or self.present_strings)
+    
+    @property
+    def key(self) -> str:
+        return site_key(self.url)
+    
+    def is_claimed(self, status: int, body: str) -> bool:
+        if status in self.absent_statuses:
+            return False
+        if self.claimed_status is not None:
+            if status != self.claimed_status:
+                return False
+        elif self.require_success and not 200 <= status < 300:
+            return False
+        if any(text in body for text in self.absent_strings):
+            return False
+        return not self.present_strings or any(text in body for text in self.present_strings)
+
+def site_key(url: str) -> str:
+    """Normalize a profile URL template for deduplication.
+    
+    Scheme, a leading www., letter case and a trailing slash are ignored, so
+    https://www.github.com/{username} and http://github.com/{username}/ match.
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    key = host + parts.path.rstrip("/").lower()
+    if parts.query:
+        key += "?" + parts.query.lower()
+    return key
+
+def strings(value: Any) -> Tuple[str, ...]:
+    """A string or list of strings from a site entry, as a tuple."""
+    if not value:
+        return ()
+    if isinstance(value, str):
+        return (value,)
+    return tuple(str(item) for item in value if item)
+
+def statuses(value: Any) -> Tuple[int, ...]:
+    if value is None:
+        return ()
+    if isinstance(value, (int, str)):
+        value = [value]
+    try:
+        return tuple(int(item) for item in value)
+    except (TypeError, ValueError):
+        return ()
+
+def map_strings(value: Any, function) -> Any:
+    """Apply function to every string in a JSON payload."""
+    if isinstance(value, str):
+        return function(value)
+    if isinstance(value, dict):
+        return {key: map_strings(item, function) for key, item in value.items()}
+    if isinstance(value, list):
+        return [map_strings(item, function) for item in value]
+    return value
+
+def json_payload(value: Any, headers: Dict[str, str]) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value
+    headers.setdefault("Content-Type", "application/json")
+    return json.dumps(value)
+
+def load_sherlock_sites(path: str, include_nsfw: bool = False) -> List[Site]:
+    """Sites from Sherlock's data.json."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    sites = []
+    for name, info in data.items():
+        if not isinstance(info, dict) or "url" not in info:
+            continue
+        if info.get("isNSFW") and not include_nsfw:
+            continue
+        error_type = info.get("errorType")
+        headers = dict(info.get("headers") or {})
+        site = Site(
+            name=name,
+            url=info["url"].replace("{}", USERNAME),
+            probe_url=(info.get("urlProbe") or info["url"]).replace("{}", USERNAME),
+            # Like the CLI, plain status checks only need the headers
+            method=(info.get("request_method") or ("HEAD" if error_type == "status_code" else "GET")).upper(),
+            payload=json_payload(map_strings(info.get("request_payload"), lambda text: text.replace("{}", USERNAME)), headers),
+            headers=headers,
+            regex=info.get("regexCheck"),
+            absent_statuses=statuses(info.get("errorCode")),
+            sources=["sherlock"]
+        )
+        if error_type == "message":
+            # Sherlock only looks for the error text, whatever the status
+            site.absent_strings = strings(info.get("errorMsg"))
+            site.require_success = False
+            if not site.absent_strings:
+                continue
+        elif error_type == "response_url":
+            site.follow_redirects = False
+        elif error_type != "status_code":
+            continue
+        sites.append(site)
+    return sites
+
+def load_maigret_sites(path: str, top: Optional[int] = MAIGRET_TOP_SITES) -> List[Site]:
+    """Enabled sites from Maigret's data.json, the top ones by rank unless top is None."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    engines = data.get("engines") or {}
+    entries = [(name, info) for name, info in (data.get("sites") or {}).items() if not info.get("disabled")]
+    # Unranked sites sort last, as in Maigret's ranked_sites_dict
+    entries.sort(key=lambda entry: entry[1].get("alexaRank") or sys.maxsize)
+    if top is not None:
+        entries = entries[:top]
+    sites = []
+    for rank, (name, info) in enumerate(entries):
+        engine = engines.get(info.get("engine") or "", {}).get("site", {})
+        merged = dict(engine, **info)
+        url = merged.get("url")
+        if not url:
+            continue
+        # Maigret templates are str.format patterns
+        values = {"urlMain": merged.get("urlMain") or "", "urlSubpath": merged.get("urlSubpath") or "", "username": USERNAME}
+        headers = dict(merged.get("headers") or {})
+        try:
+            payload = map_strings(merged.get("requestPayload"), lambda text: text.format(**values))
+            site = Site(
+                name=name,
+                url=url.format(**values),
+                probe_url=(merged.get("urlProbe") or url).format(**values),
+                method=(merged.get("requestMethod") or ("HEAD" if merged.get("requestHeadOnly") else "GET")).upper(),
+                payload=json_payload(payload, headers),
+                headers=headers,
+                regex=merged.get("regexCheck"),
+                sources=["maigret"],
+                tags=strings(merged.get("tags")),
+                rank=rank
+            )
+        except (KeyError, IndexError, ValueError):
+            continue
+        check_type = merged.get("checkType")
+        if check_type == "message":
+            site.absent_strings = strings(merged.get("absenceStrs"))
+            site.present_strings = strings(merged.get("presenseStrs"))
+            if not site.needs_body:
+                continue
+            # Like Maigret, the page text decides whatever the status
+            site.require_success = False
+        elif check_type == "response_url":
+            site.follow_redirects = False
+        elif check_type != "status_code":
+            continue
+        sites.append(site)
+    return sites
+
+def load_wmn_sites(path: str) -> List[Site]:
+    """Sites from a WhatsMyName wmn-data.json, as used by Blackbird."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    sites = []
+    for info in data.get("sites") or []:
+        if not isinstance(info, dict) or not info.get("uri_check") or info.get("valid") is False:
+            continue
+        headers = dict(info.get("headers") or {})
+        payload = info.get("post_body")
+        site = Site(
+            name=info.get("name") or info["uri_check"],
+            url=(info.get("uri_pretty") or info["uri_check"]).replace("{account}", USERNAME),
+            probe_url=info["uri_check"].replace("{account}", USERNAME),
+            method="POST" if payload else "GET",
+            payload=payload.replace("{account}", USERNAME) if payload else None,
+            headers=headers,
+            claimed_status=int(info["e_code"]) if info.get("e_code") is not None else None,
+            absent_strings=strings(info.get("m_string")),
+            present_strings=strings(info.get("e_string")),
+            sources=["blackbird"],
+            tags=strings(info.get("cat"))
+        )
+        sites.append(site)
+    return sites
+
+def merge_sites(site_lists: Iterable[List[Site]]) -> Tuple[List[Site], int]:
+    """Deduplicate sites by URL template; return them and the number merged away."""
+    merged: Dict[str, Site] = {}
+    duplicates = 0
+    for sites in site_lists:
+        for site in sites:
+            existing = merged.get(site.key)
+            if existing is None:
+                merged[site.key] = site
+                continue
+            duplicates += 1
+            for source in site.sources:
+                if source not in existing.sources:
+                    existing.sources.append(source)
+    return list(merged.values()), duplicates
+
+def package_resource(package: str, *parts: str) -> Optional[str]:
+    """Path of a data file inside an installed package, without importing it."""
+    try:
+        spec = importlib.util.find_spec(package)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    path = Path(list(spec.submodule_search_locations)[0], *parts)
+    return str(path) if path.is_file() else None
+
+def site_database_paths() -> Dict[str, Optional[str]]:
+    """Locate each source database; environment variables take precedence."""
+    wmn_candidates = [os.environ.get("OSINT_WMN_DATA"), "/opt/blackbird/data/wmn-data.json", "/app/data/wmn-data.json"]
+    return {
+        "sherlock": os.environ.get("OSINT_SHERLOCK_DATA") or package_resource("sherlock_project", "resources", "data.json"),
+        "maigret": os.environ.get("OSINT_MAIGRET_DATA") or package_resource("maigret", "resources", "data.json"),
+        "blackbird": next((path for path in wmn_candidates if path and os.path.isfile(path) and os.path.getsize(path) > 2), None)
+    }
+
+def load_sites(sources: Iterable[str] = SITE_SOURCES, maigret_top: Optional[int] = MAIGRET_TOP_SITES) -> Dict[str, Any]:
+    """Load and merge the requested source databases.
+    
+    Returns the merged sites, the site count per source and the sources
+    that could not be loaded with the reason.
+    """
+    paths = site_database_paths()
+    loaders = {
+        "sherlock": load_sherlock_sites,
+        "maigret": lambda path: load_maigret_sites(path, maigret_top),
+        "blackbird": load_wmn_sites
+    }
+    loaded: List[List[Site]] = []
+    per_source: Dict[str, int] = {}
+    unavailable: Dict[str, str] = {}
+    for source in SITE_SOURCES:
+        if source not in sources:
+            continue
+        path = paths.get(source)
+        if path is None:
+            unavailable[source] = "site database not found"
+            continue
+        try:
+            sites = loaders[source](path)
+        except (OSError, ValueError, AttributeError, TypeError) as e:
+            unavailable[source] = f"could not load {path}: {e}"
+            continue
+        per_source[source] = len(sites)
+        loaded.append(sites)
+    sites, duplicates = merge_sites(loaded)
+    return {"sites": sites, "per_source": per_source, "duplicates": duplicates, "unavailable": unavailable}
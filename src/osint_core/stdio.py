@@ -0,0 +1,147 @@
+"""
+Asyncio stdio framing for JSON-RPC messages.
+
+Requests are read from stdin with an asyncio StreamReader, one message per
+line. Every outgoing message goes through a single MessageWriter task, so
+concurrent responses never interleave and flushes are batched.
+"""
+
+import asyncio
+import json
+import os
+import stat
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+# Largest accepted request line in bytes; longer lines are discarded and
+# answered with an Invalid Request error
+MAX_LINE_BYTES = max(1024, int(os.environ.get("OSINT_MAX_LINE_BYTES", str(16 * 1024 * 1024))))
+
+# Bytes read from stdin per chunk when it is not a pipe or socket
+STDIN_CHUNK_BYTES = 65536
+
+class MessageTooLarge(Exception):
+    """Raised for a request line longer than MAX_LINE_BYTES."""
+
+def feed_from_thread(reader: asyncio.StreamReader, stream, loop: asyncio.AbstractEventLoop) -> None:
+    """Copy stream into reader from a dedicated thread until EOF."""
+    fd = stream.fileno()
+    try:
+        while True:
+            chunk = os.read(fd, STDIN_CHUNK_BYTES)
+            if not chunk:
+                break
+            loop.call_soon_threadsafe(reader.feed_data, chunk)
+    except OSError:
+        pass
+    finally:
+        loop.call_soon_threadsafe(reader.feed_eof)
+
+async def open_stdin_reader(stream=None, limit: int = MAX_LINE_BYTES) -> asyncio.StreamReader:
+    """Return a StreamReader over stdin.
+    
+    Pipes and sockets, which is how MCP clients launch servers, are read
+    natively by the event loop. Anything else (a terminal, or a file
+    redirected to stdin) is read by a dedicated thread that feeds the
+    reader: files cannot be polled, and switching a terminal to
+    non-blocking mode would also affect stdout.
+    """
+    stream = stream or sys.stdin
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=limit)
+    mode = os.fstat(stream.fileno()).st_mode
+    if stat.S_ISFIFO(mode) or stat.S_ISSOCK(mode):
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), stream)
+    else:
+        threading.Thread(target=feed_from_thread, args=(reader, stream, loop), name="osint-stdin", daemon=True).start()
+    return reader
+
+async def read_message_line(reader: asyncio.StreamReader) -> Optional[bytes]:
+    """Return the next request line, or None at EOF.
+    
+    Raises MessageTooLarge after discarding a line longer than the reader's
+    limit, so the next call starts at the following message.
+    """
+    try:
+        return await reader.readuntil(b"\n")
+    except asyncio.IncompleteReadError as e:
+        # A final line without a trailing newline
+        return e.partial or None
+    except asyncio.LimitOverrunError as e:
+        consumed = e.consumed
+    while True:
+        await reader.readexactly(consumed)
+        try:
+            await reader.readuntil(b"\n")
+            break
+        except asyncio.IncompleteReadError:
+            break
+        except asyncio.LimitOverrunError as e:
+            consumed = e.consumed
+    raise MessageTooLarge("Message exceeds the maximum line size (OSINT_MAX_LINE_BYTES)")
+
+class MessageWriter:
+    """Single writer for stdout.
+    
+    Messages are queued as complete lines and written by one task, so
+    responses that finish at the same time never interleave. Everything
+    queued since the last write goes out in one write and one flush. The
+    blocking write runs on a dedicated thread so a slow reader on the other
+    end of the pipe never stalls the event loop.
+    """
+    
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout.buffer
+        self._queue: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="osint-stdout")
+        self._task: Optional[asyncio.Task] = None
+        self.counters = {"messages": 0, "flushes": 0}
+    
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+    
+    def send(self, message: Dict[str, Any]) -> None:
+        """Queue a JSON-RPC message."""
+        self.send_text(json.dumps(message))
+    
+    def send_text(self, text: str) -> None:
+        """Queue an already serialized JSON-RPC message."""
+        self._queue.put_nowait(text.encode("utf-8") + b"\n")
+    
+    def _write(self, data: bytes) -> None:
+        self.stream.write(data)
+        self.stream.flush()
+    
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        closing = False
+        while not closing:
+            batch: List[bytes] = []
+            item = await self._queue.get()
+            while True:
+                if item is None:
+                    closing = True
+                else:
+                    batch.append(item)
+                if closing or self._queue.empty():
+                    break
+                item = self._queue.get_nowait()
+            if not batch:
+                continue
+            try:
+                await loop.run_in_executor(self._executor, self._write, b"".join(batch))
+            except (BrokenPipeError, ConnectionResetError, ValueError):
+                # The client went away; nothing more can be delivered
+                return
+            self.counters["messages"] += len(batch)
+            self.counters["flushes"] += 1
+    
+    async def close(self) -> None:
+        """Write everything queued so far, then stop the writer."""
+        if self._task is not None:
+            self._queue.put_nowait(None)
+            await self._task
+            self._task = None
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,385 @@
+"""
+MCP streamable HTTP transport.
+
+One server process serves many clients over HTTP, so the warm worker pool,
+the result cache and the process scheduler are shared by all of them instead
+of being rebuilt for every stdio session. Clients POST JSON-RPC messages to
+/mcp. A request is answered either as a single JSON body or, when the client
+accepts text/event-stream, as an SSE stream that carries the call's progress
+notifications followed by the response. initialize starts a session whose id
+is returned in the Mcp-Session-Id header; later requests send it back, and
+DELETE ends the session. With OSINT_HTTP_TOKEN set, every request must carry
+it as a bearer token; without one the server only binds to loopback.
+"""
+
+import asyncio
+import ipaddress
+import json
+import os
+import secrets
+import sys
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .progress import NOTIFY_TARGET
+from .stdio import MAX_LINE_BYTES
+
+# Address the HTTP transport listens on; use 0.0.0.0 inside a container
+HTTP_HOST = os.environ.get("OSINT_HTTP_HOST", "127.0.0.1")
+HTTP_PORT = int(os.environ.get("OSINT_HTTP_PORT", "8000"))
+
+# Sessions without requests for this many seconds are discarded
+HTTP_SESSION_IDLE_SECONDS = float(os.environ.get("OSINT_HTTP_SESSION_IDLE", "3600"))
+
+# Bearer token every request must send in its Authorization header; required
+# to listen on anything but a loopback address
+HTTP_TOKEN = os.environ.get("OSINT_HTTP_TOKEN") or None
+
+# Browser origins allowed to call the server besides localhost, comma separated
+HTTP_ALLOWED_ORIGINS = {origin.strip().rstrip("/") for origin in os.environ.get("OSINT_HTTP_ALLOWED_ORIGINS", "").split(",") if origin.strip()}
+
+MCP_PATH = "/mcp"
+
+# Longest accepted request line or header line
+MAX_HEADER_BYTES = 65536
+MAX_HEADERS = 100
+
+# Seconds between SSE comments that keep an idle stream open through proxies
+SSE_KEEPALIVE_SECONDS = 15.0
+
+REASONS = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    401: "Unauthorized",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    431: "Request Header Fields Too Large"
+}
+
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+class HttpError(Exception):
+    """An HTTP request that is answered with an error status."""
+    
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+class HttpRequest:
+    """One parsed HTTP request; header names are lower-case."""
+    
+    def __init__(self, method: str, path: str, version: str, headers: Dict[str, str], body: bytes = b""):
+        self.method = method
+        self.path = path
+        self.version = version
+        self.headers = headers
+        self.body = body
+    
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+    
+    def accepts(self, media_type: str) -> bool:
+        return media_type in self.headers.get("accept", "")
+
+async def read_request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> Optional[HttpRequest]:
+    """Read one request from a connection; None when the client closed it."""
+    try:
+        line = await reader.readline()
+        if not line:
+            return None
+        parts = line.decode("latin-1").split()
+        if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+            raise HttpError(400, "Malformed request line")
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise HttpError(431, "Too many headers")
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+    except (ValueError, asyncio.LimitOverrunError):
+        # StreamReader.readline raises ValueError for lines over its limit
+        raise HttpError(431, "Header line too long")
+    
+    method, target, version = parts
+    request = HttpRequest(method.upper(), urlsplit(target).path, version, headers)
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        raise HttpError(411, "Chunked request bodies are not supported; send Content-Length")
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise HttpError(400, "Invalid Content-Length")
+    if length > MAX_LINE_BYTES:
+        raise HttpError(413, "Request body exceeds OSINT_MAX_LINE_BYTES")
+    if length:
+        if headers.get("expect", "").lower() == "100-continue":
+            writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+        request.body = await reader.readexactly(length)
+    return request
+
+def response_head(status: int, headers: Dict[str, str]) -> bytes:
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+def sse_event(data: str) -> bytes:
+    return b"event: message\ndata: " + data.encode("utf-8") + b"\n\n"
+
+def expects_response(payload: Any) -> bool:
+    """Whether a POSTed message or batch contains anything that is answered.
+    
+    Notifications (method without id) and client responses (id without
+    method) get 202 Accepted and no body.
+    """
+    messages = payload if isinstance(payload, list) else [payload]
+    if not messages:
+        return True
+    return any(not isinstance(message, dict) or ("method" in message) == ("id" in message) for message in messages)
+
+def is_initialize(message: Any) -> bool:
+    return isinstance(message, dict) and message.get("method") == "initialize"
+
+def is_loopback(host: str) -> bool:
+    if host in LOCAL_HOSTS:
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+def drop_notification(text: str) -> None:
+    """Session notify for HTTP: notifications only go out on a request's SSE stream."""
+
+class StreamableHttpServer:
+    """Serves MCP sessions over HTTP for one set of tools.
+    
+    new_session builds the protocol state for a client, given the function
+    its server-initiated notifications are sent through. Sessions share the
+    process-wide call limit, worker pool and caches.
+    """
+    
+    def __init__(self, new_session: Callable[[Callable[[str], None]], Any], host: str = HTTP_HOST, port: int = HTTP_PORT, idle_seconds: float = HTTP_SESSION_IDLE_SECONDS, token: Optional[str] = HTTP_TOKEN):
+        self.new_session = new_session
+        self.host = host
+        self.port = port
+        self.idle_seconds = idle_seconds
+        self.token = token
+        # Session id -> (session, monotonic time of its last request)
+        self.sessions: Dict[str, Tuple[Any, float]] = {}
+        self.counters = {"sessions_started": 0, "sessions_expired": 0, "requests": 0, "unauthorized": 0}
+    
+    async def serve_forever(self) -> None:
+        """Listen until cancelled. Raises RuntimeError for a non-loopback host without a token."""
+        if self.token is None and not is_loopback(self.host):
+            raise RuntimeError(f"Refusing to serve HTTP on {self.host} without authentication; set OSINT_HTTP_TOKEN or bind to 127.0.0.1")
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port, limit=MAX_HEADER_BYTES)
+        addresses = ", ".join(f"{sock.getsockname()[0]}:{sock.getsockname()[1]}" for sock in server.sockets)
+        print(f"MCP streamable HTTP transport listening on {addresses}{MCP_PATH}", file=sys.stderr)
+        expiry = asyncio.create_task(self.expire_periodically())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            expiry.cancel()
+    
+    async def expire_periodically(self) -> None:
+        """Discard idle sessions even when no new client arrives."""
+        interval = max(1.0, min(self.idle_seconds / 4, 60.0))
+        while True:
+            await asyncio.sleep(interval)
+            self.expire_sessions()
+    
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    request = await read_request(reader, writer)
+                    if request is None:
+                        break
+                    self.counters["requests"] += 1
+                    keep_alive = await self.handle_request(request, writer)
+                except HttpError as e:
+                    await self.send_error(writer, e)
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    
+    async def handle_request(self, request: HttpRequest, writer: asyncio.StreamWriter) -> bool:
+        """Answer one request; return whether the connection stays open."""
+        if request.path != MCP_PATH:
+            raise HttpError(404, f"Not found: {request.path}")
+        self.check_origin(request)
+        self.check_token(request)
+        if request.method == "POST":
+            return await self.handle_post(request, writer)
+        if request.method == "DELETE":
+            session_id = self.session_id(request)
+            session, _ = self.sessions.pop(session_id)
+            for task in list(session.active_calls.values()):
+                task.cancel()
+            await self.send(writer, 200, b"", {}, request.keep_alive)
+            return request.keep_alive
+        # There are no server-initiated messages outside a request, so no
+        # standalone GET stream is offered
+        raise HttpError(405, f"Method not allowed: {request.method}", {"Allow": "POST, DELETE"})
+    
+    def check_origin(self, request: HttpRequest) -> None:
+        """Reject browser requests from foreign origins (DNS rebinding)."""
+        origin = request.headers.get("origin")
+        if origin is None:
+            return
+        if origin.rstrip("/") in HTTP_ALLOWED_ORIGINS or urlsplit(origin).hostname in LOCAL_HOSTS:
+            return
+        raise HttpError(403, f"Origin not allowed: {origin}")
+    
+    def check_token(self, request: HttpRequest) -> None:
+        """Require the bearer token, when one is configured."""
+        if self.token is None:
+            return
+        scheme, _, credentials = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and secrets.compare_digest(credentials.strip().encode(), self.token.encode()):
+            return
+        self.counters["unauthorized"] += 1
+        raise HttpError(401, "Missing or invalid bearer token", {"WWW-Authenticate": 'Bearer realm="osint-mcp"'})
+    
+    def session_id(self, request: HttpRequest) -> str:
+        session_id = request.headers.get("mcp-session-id")
+        if session_id is None:
+            raise HttpError(400, "Missing Mcp-Session-Id header")
+        if session_id not in self.sessions:
+            raise HttpError(404, "Unknown or expired session")
+        return session_id
+    
+    def start_session(self) -> str:
+        session_id = secrets.token_hex(16)
+        self.sessions[session_id] = (self.new_session(drop_notification), time.monotonic())
+        self.counters["sessions_started"] += 1
+        return session_id
+    
+    def expire_sessions(self) -> None:
+        cutoff = time.monotonic() - self.idle_seconds
+        for session_id, (session, last_used) in list(self.sessions.items()):
+            if last_used < cutoff and not session.active_calls:
+                del self.sessions[session_id]
+                self.counters["sessions_expired"] += 1
+    
+    async def handle_post(self, request: HttpRequest, writer: asyncio.StreamWriter) -> bool:
+        try:
+            payload = json.loads(request.body)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            body = json.dumps({"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": f"Parse error: {str(e)}"}})
+            await self.send(writer, 400, body.encode("utf-8"), {"Content-Type": "application/json"}, request.keep_alive)
+            return request.keep_alive
+        
+        headers: Dict[str, str] = {}
+        if isinstance(payload, list) and any(is_initialize(message) for message in payload):
+            raise HttpError(400, "initialize must be sent on its own, not in a batch")
+        if is_initialize(payload):
+            if "mcp-session-id" in request.headers:
+                # Re-initializing would silently abandon the client's session
+                raise HttpError(400, "initialize cannot be sent with an Mcp-Session-Id; DELETE the session first")
+            session_id = self.start_session()
+            headers["Mcp-Session-Id"] = session_id
+        else:
+            session_id = self.session_id(request)
+        session, _ = self.sessions[session_id]
+        self.sessions[session_id] = (session, time.monotonic())
+        
+        if not expects_response(payload):
+            await session.handle_payload(payload)
+            await self.send(writer, 202, b"", headers, request.keep_alive)
+            return request.keep_alive
+        if request.accepts("text/event-stream"):
+            await self.stream_response(session, payload, headers, writer)
+            return False
+        response = await session.handle_payload(payload)
+        if response is None:
+            # Every call in the request was cancelled
+            await self.send(writer, 202, b"", headers, request.keep_alive)
+        else:
+            headers["Content-Type"] = "application/json"
+            await self.send(writer, 200, response.encode("utf-8"), headers, request.keep_alive)
+        return request.keep_alive
+    
+    async def stream_response(self, session: Any, payload: Any, headers: Dict[str, str], writer: asyncio.StreamWriter) -> None:
+        """Answer on an SSE stream: progress notifications, then the response."""
+        outbox: "asyncio.Queue[str]" = asyncio.Queue()
+        connected = True
+        
+        def to_stream(text: str) -> None:
+            # Once the stream is gone, notifications of the detached call are dropped
+            if connected:
+                outbox.put_nowait(text)
+        
+        # The call task copies this context, so its notifications reach the stream
+        token = NOTIFY_TARGET.set(to_stream)
+        try:
+            task = asyncio.create_task(session.handle_payload(payload))
+        finally:
+            NOTIFY_TARGET.reset(token)
+        
+        headers.update({"Content-Type": "text/event-stream", "Cache-Control": "no-cache", "Connection": "close"})
+        writer.write(response_head(200, headers))
+        getter: Optional[asyncio.Future] = None
+        try:
+            while not task.done():
+                getter = asyncio.ensure_future(outbox.get())
+                done, _ = await asyncio.wait([getter, task], timeout=SSE_KEEPALIVE_SECONDS, return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    writer.write(sse_event(getter.result()))
+                else:
+                    getter.cancel()
+                    if not done:
+                        writer.write(b": keepalive\n\n")
+                await writer.drain()
+            # Progress sent while the call finished goes out before the response
+            chunks = [sse_event(outbox.get_nowait()) for _ in range(outbox.qsize())]
+            response = task.result()
+            if response is not None:
+                chunks.append(sse_event(response))
+            writer.write(b"".join(chunks))
+            await writer.drain()
+        except ConnectionError:
+            # A dropped stream is not a cancellation; the call finishes and
+            # its result is cached
+            connected = False
+            while not outbox.empty():
+                outbox.get_nowait()
+        finally:
+            if getter is not None:
+                getter.cancel()
+    
+    async def send(self, writer: asyncio.StreamWriter, status: int, body: bytes, headers: Dict[str, str], keep_alive: bool) -> None:
+        headers = dict(headers)
+        headers["Content-Length"] = str(len(body))
+        if not keep_alive:
+            headers["Connection"] = "close"
+        writer.write(response_head(status, headers) + body)
+        await writer.drain()
+    
+    async def send_error(self, writer: asyncio.StreamWriter, error: HttpError) -> None:
+        body = json.dumps({"error": str(error)}).encode("utf-8")
+        headers = dict(error.headers)
+        headers["Content-Type"] = "application/json"
+        try:
+            await self.send(writer, error.status, body, headers, False)
+        except ConnectionError:
+            pass
+    
+    def stats(self) -> Dict[str, Any]:
+        return {"sessions": len(self.sessions), **self.counters}
@@ -0,0 +1,893 @@
+"""
+OSINT tool handlers and their registry specs.
+
+Each handler turns MCP call arguments into a tool run and a result dict; the
+*_TOOL specs below declare each tool's schema and default runtime policy.
+"""
+
+import asyncio
+import math
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from .emailprober import EMAIL_PROBER, EMAIL_TIMEOUT_SECONDS, normalize_emails, summarize_email
+from .harvester import HARVESTER_DIR, HARVESTER_SCRIPT, SOURCE_API_KEYS, SOURCE_TIMEOUT_SECONDS, SOURCES_PER_CALL, HarvesterFindings, parse_harvester_run, select_sources
+from .latency import LATENCY
+from .process import resolve_deadline, run_command_in_venv, timeout_result
+from .prober import PROBER, PROBE_TIMEOUT_SECONDS, expand_usernames, summarize
+from .progress import CURRENT_PROGRESS, parse_blackbird_line, parse_bracket_line, progress_line_handler
+from .registry import InvalidParams, ToolSpec
+from .results import integer_argument
+from .scheduler import SCHEDULER
+from .sfdaemon import SPIDERFOOT_DAEMON, SpiderFootError
+from .sfevents import SpiderFootEventParser
+from .sfprofiles import DEFAULT_PROFILE, SCAN_PROFILES, SPIDERFOOT_DIR, plan_scan
+from .siteindex import select_sites
+from .sites import MAIGRET_TOP_SITES, SITE_SOURCES, site_database_paths
+from .workers import WorkerTimeout, run_in_worker_pool
+
+# Per-request timeout of the username CLIs until enough latency has been
+# observed to learn one (Sherlock's own default)
+USERNAME_CLI_TIMEOUT_SECONDS = 60
+
+async def username_cli_timeout(params: Dict[str, Any]) -> int:
+    """The caller's per-request timeout, else one learned from the latency of probed sites."""
+    if params.get("timeout"):
+        return params["timeout"]
+    await LATENCY.load()
+    return math.ceil(LATENCY.overall_timeout(USERNAME_CLI_TIMEOUT_SECONDS))
+
+async def handle_sherlock(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Handle Sherlock username search."""
+    deadline = resolve_deadline("sherlock", params)
+    username = params["username"]
+    timeout = await username_cli_timeout(params)
+    sites = params.get("sites", [])
+    output_format = params.get("output_format", "csv")
+    
+    try:
+        pooled = await run_in_worker_pool("sherlock", dict(params, timeout=timeout), deadline, progress_line_handler("sherlock"))
+    except WorkerTimeout as e:
+        return timeout_result("Sherlock", deadline, e.partial_output, "")
+    if pooled is not None:
+        return pooled
+    
+    cmd = ["sherlock", username, f"--timeout", str(timeout)]
+    
+    if sites:
+        for site in sites:
+            cmd.extend(["--site", site])
+    
+    if output_format == "csv":
+        cmd.append("--csv")
+    elif output_format == "xlsx":
+        cmd.append("--xlsx")
+    
+    # Create temporary directory for output
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cmd.extend(["--folderoutput", temp_dir])
+        
+        stdout, stderr, returncode, timed_out = await run_command_in_venv(cmd, tool="sherlock", deadline=deadline, on_stdout_line=progress_line_handler("sherlock"))
+        
+        if timed_out:
+            return timeout_result("Sherlock", deadline, stdout, stderr)
+        
+        if returncode == 0:
+            # Read output files
+            output_files = list(Path(temp_dir).glob(f"{username}.*"))
+            results = {"stdout": stdout, "files": []}
+            
+            for file_path in output_files:
+                try:
+                    content = file_path.read_text(encoding='utf-8')
+                    results["files"].append({
+                        "filename": file_path.name,
+                        "content": content
+                    })
+                except Exception as e:
+                    print(f"Could not read file {file_path}: {e}", file=sys.stderr)
+            
+            return {"success": True, "content": results}
+        else:
+            return {"success": False, "error": f"Sherlock failed: {stderr}"}
+
+async def handle_holehe(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Handle Holehe email search."""
+    deadline = resolve_deadline("holehe", params)
+    email = params["email"]
+    only_used = params.get("only_used", True)
+    timeout = params.get("timeout", 10000)
+    
+    try:
+        pooled = await run_in_worker_pool("holehe", params, deadline, progress_line_handler("holehe"))
+    except WorkerTimeout as e:
+        return timeout_result("Holehe", deadline, e.partial_output, "")
+    if pooled is not None:
+        return pooled
+    
+    cmd = ["holehe", email, "--timeout", str(timeout)]
+    if only_used:
+        cmd.append("--only-used")
+    
+    stdout, stderr, returncode, timed_out = await run_command_in_venv(cmd, tool="holehe", deadline=deadline, on_stdout_line=progress_line_handler("holehe"))
+    
+    if timed_out:
+        return timeout_result("Holehe", deadline, stdout, stderr)
+    
+    if returncode == 0:
+        return {"success": True, "content": stdout}
+    else:
+        return {"success": False, "error": f"Holehe failed: {stderr}"}
+
+# Addresses one batch email call may check
+BATCH_MAX_EMAILS = 5000
+
+async def handle_holehe_batch(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Run Holehe's modules in-process for many addresses over the shared connection pool."""
+    deadline = resolve_deadline("holehe_batch", params)
+    only_used = params.get("only_used", True)
+    timeout = params.get("timeout", EMAIL_TIMEOUT_SECONDS)
+    emails, invalid = normalize_emails(params["emails"])
+    if not emails:
+        return {"success": False, "error": "No valid email addresses to check", "invalid": invalid}
+    if len(emails) > BATCH_MAX_EMAILS:
+        return {"success": False, "error": f"{len(emails)} addresses requested; a batch takes at most {BATCH_MAX_EMAILS}"}
+    
+    try:
+        modules = await asyncio.to_thread(EMAIL_PROBER.select_modules, params.get("modules"), not params.get("no_password_recovery", False))
+    except ImportError:
+        return {"success": False, "error": "Batch email checks need Holehe installed in the server's Python (pip install holehe)"}
+    if not modules:
+        return {"success": False, "error": "No Holehe modules match the requested modules"}
+    
+    reporter = CURRENT_PROGRESS.get()
+    if reporter is not None:
+        reporter.label = "holehe batch"
+        reporter.total = len(emails) * len(modules)
+    done: Dict[str, List[Any]] = {email: [] for email in emails}
+    started = time.monotonic()
+    
+    def on_result(email, result):
+        done[email].append(result)
+        if reporter is not None:
+            used = result.get("exists") and not result.get("rateLimit")
+            reporter.record(1, {"email": email, "site": result.get("domain") or result["name"]} if used else None)
+    
+    def build() -> Dict[str, Any]:
+        results = [summarize_email(email, done[email], only_used) for email in emails]
+        content = {
+            "results": results,
+            "stats": {
+                "emails": len(emails),
+                "modules": len(modules),
+                "checks": sum(len(found) for found in done.values()),
+                "used": sum(result["stats"]["used"] for result in results),
+                "rate_limited": sum(result["stats"]["rate_limited"] for result in results),
+                "elapsed_seconds": round(time.monotonic() - started, 2)
+            }
+        }
+        if invalid:
+            content["invalid"] = invalid
+        return content
+    
+    try:
+        async with SCHEDULER.slot("holehe_batch"):
+            await asyncio.wait_for(EMAIL_PROBER.probe_batch(emails, modules, timeout, on_result), timeout=deadline)
+    except ImportError:
+        return {"success": False, "error": "Batch email checks need httpx (pip install holehe)"}
+    except asyncio.TimeoutError:
+        return timeout_result("Holehe batch", deadline, build(), "")
+    return {"success": True, "content": build()}
+
+async def handle_spiderfoot(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Handle SpiderFoot comprehensive OSINT scan."""
+    deadline = resolve_deadline("spiderfoot", params)
+    target = params["target"]
+    event_types = params.get("event_types", [])
+    
+    # Modules needing an API key only run when its variable (SHODAN_API_KEY,
+    # VIRUSTOTAL_API_KEY, ...) is set; without it they would only log errors
+    try:
+        plan = await asyncio.to_thread(plan_scan, params.get("profile"), params.get("modules"), event_types)
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+    except LookupError:
+        return {"success": False, "error": f"SpiderFoot is not installed in {SPIDERFOOT_DIR}"}
+    if not plan["modules"]:
+        return {"success": False, "error": "No SpiderFoot modules left to run; the selected ones are unknown or need API keys", "scan": plan}
+    
+    cmd = ["python3", os.path.join(SPIDERFOOT_DIR, "sf.py"),
+           "-s", target,
+           "-m", ",".join(plan["modules"]),
+           "-o", "json",     # JSON output
+           "-q"]             # Quiet mode
+    if event_types:
+        # Report only the requested event types
+        cmd.extend(["-t", ",".join(event_types), "-f"])
+    
+    # Events are parsed, deduplicated and grouped as they stream in; the raw
+    # JSON document is never held in memory
+    reporter = CURRENT_PROGRESS.get()
+    if reporter is not None:
+        reporter.label = "spiderfoot"
+    
+    def on_event(event_type: str, record: Dict[str, Any]) -> None:
+        reporter.record(1, {"type": event_type, "data": record["data"][:500], "module": record["module"]})
+    
+    parser = SpiderFootEventParser(on_event if reporter is not None else None)
+    stdout, stderr, returncode, timed_out = await run_command_in_venv(cmd, tool="spiderfoot", deadline=deadline, stdout_capture=parser)
+    
+    if timed_out:
+        return timeout_result("SpiderFoot", deadline, parser.result(), stderr)
+    
+    if returncode == 0:
+        return {"success": True, "content": parser.result(), "scan": plan}
+    else:
+        return {"success": False, "error": f"SpiderFoot failed: {stderr or stdout}"}
+
+async def handle_spiderfoot_start(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Start a SpiderFoot scan in the long-lived instance and return its id at once."""
+    event_types = params.get("event_types", [])
+    try:
+        plan = await asyncio.to_thread(plan_scan, params.get("profile"), params.get("modules"), event_types)
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+    except LookupError:
+        return {"success": False, "error": f"SpiderFoot is not installed in {SPIDERFOOT_DIR}"}
+    if not plan["modules"]:
+        return {"success": False, "error": "No SpiderFoot modules left to run; the selected ones are unknown or need API keys", "scan": plan}
+    try:
+        scan = await SPIDERFOOT_DAEMON.start_scan(params["target"], plan["modules"], event_types, plan)
+    except SpiderFootError as e:
+        return {"success": False, "error": str(e)}
+    return {"success": True, "content": dict(scan.describe(), scan=plan)}
+
+# Longest a spiderfoot_scan_events call waits for new events, and how often it polls
+SPIDERFOOT_MAX_WAIT_SECONDS = 60
+SPIDERFOOT_POLL_SECONDS = 2.0
+
+async def handle_spiderfoot_events(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a scan's events after a cursor, optionally waiting for new ones."""
+    scan_id = params["scan_id"]
+    cursor = max(0, params.get("cursor", 0))
+    limit = max(1, params.get("limit", 500))
+    give_up = time.monotonic() + min(max(0, params.get("wait", 0)), SPIDERFOOT_MAX_WAIT_SECONDS)
+    reporter = CURRENT_PROGRESS.get()
+    if reporter is not None:
+        reporter.label = "spiderfoot"
+    try:
+        while True:
+            scan, added = await SPIDERFOOT_DAEMON.refresh(scan_id)
+            if reporter is not None:
+                for event in added:
+                    reporter.record(1, {"type": event["type"], "data": str(event["data"])[:500], "module": event["module"]})
+            if scan.event_count > cursor or scan.finished or time.monotonic() >= give_up:
+                break
+            await asyncio.sleep(SPIDERFOOT_POLL_SECONDS)
+    except SpiderFootError as e:
+        return {"success": False, "error": str(e)}
+    events = scan.events(cursor, limit)
+    return {"success": True, "content": dict(scan.describe(), events=events, next_cursor=cursor + len(events))}
+
+async def handle_spiderfoot_results(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Return every event of a scan so far, grouped by event type."""
+    try:
+        scan, _ = await SPIDERFOOT_DAEMON.refresh(params["scan_id"])
+    except SpiderFootError as e:
+        return {"success": False, "error": str(e)}
+    return {"success": True, "content": dict(scan.describe(), **scan.collector.result())}
+
+async def handle_spiderfoot_stop(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Abort a running scan; the events found so far stay readable."""
+    try:
+        await SPIDERFOOT_DAEMON.stop_scan(params["scan_id"])
+        scan, _ = await SPIDERFOOT_DAEMON.refresh(params["scan_id"])
+    except SpiderFootError as e:
+        return {"success": False, "error": str(e)}
+    return {"success": True, "content": scan.describe()}
+
+async def handle_ghunt(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Handle GHunt Google account search."""
+    deadline = resolve_deadline("ghunt", params)
+    identifier = params["identifier"]
+    timeout = params.get("timeout", 10000)
+    
+    # GHunt needs PYTHONPATH to include /opt/ghunt so it can import the ghunt module
+    # We'll set PYTHONPATH and run from the ghunt directory
+    cwd = "/opt/ghunt"
+    
+    # Set PYTHONPATH to include /opt/ghunt so the ghunt module can be imported
+    # Also add /opt/ghunt to sys.path via Python code
+    extra_env = {"PYTHONPATH": "/opt/ghunt"}
+    
+    # Method 1: Try main.py with PYTHONPATH set (this is the entry point)
+    if os.path.exists("/opt/ghunt/main.py"):
+        # main.py tries to import from ghunt, so we need PYTHONPATH
+        cmd = ["python3", "/opt/ghunt/main.py", "email", identifier]
+    # Method 2: Try ghunt.py if it exists
+    elif os.path.exists("/opt/ghunt/ghunt.py"):
+        cmd = ["python3", "/opt/ghunt/ghunt.py", "email", identifier]
+    # Method 3: Try running the ghunt module directly with PYTHONPATH
+    else:
+        # Try to run ghunt as a module, but we need to ensure PYTHONPATH is set
+        cmd = ["python3", "-c", 
+               "import sys; sys.path.insert(0, '/opt/ghunt'); from ghunt import ghunt; ghunt.main()",
+               "email", identifier]
+    
+    stdout, stderr, returncode, timed_out = await run_command_in_venv(
+        cmd, 
+        cwd=cwd if os.path.exists(cwd) else None,
+        extra_env=extra_env,
+        tool="ghunt",
+        deadline=deadline
+    )
+    
+    if timed_out:
+        return timeout_result("GHunt", deadline, stdout, stderr)
+    
+    if returncode == 0:
+        return {"success": True, "content": stdout}
+    else:
+        return {"success": False, "error": f"GHunt failed: {stderr}"}
+
+async def handle_maigret(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Handle Maigret username search."""
+    deadline = resolve_deadline("maigret", params)
+    username = params["username"]
+    timeout = await username_cli_timeout(params)
+    
+    try:
+        pooled = await run_in_worker_pool("maigret", dict(params, timeout=timeout), deadline, progress_line_handler("maigret"))
+    except WorkerTimeout as e:
+        return timeout_result("Maigret", deadline, e.partial_output, "")
+    if pooled is not None:
+        return pooled
+    
+    # Create temporary directory for output
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # Maigret -J requires output type: "simple" or "ndjson" (not "json")
+        # --folderoutput specifies where to save results
+        cmd = ["maigret", username, "--timeout", str(timeout), "-J", "ndjson", "--folderoutput", temp_dir]
+        
+        stdout, stderr, returncode, timed_out = await run_command_in_venv(cmd, tool="maigret", deadline=deadline, on_stdout_line=progress_line_handler("maigret"))
+        
+        if timed_out:
+            return timeout_result("Maigret", deadline, stdout, stderr)
+        
+        if returncode == 0:
+            # Try to find and read JSON output file
+            json_files = list(Path(temp_dir).glob("*.json"))
+            if json_files:
+                try:
+                    # Read the first JSON file found
+                    json_content = json_files[0].read_text(encoding='utf-8')
+                    return {"success": True, "content": json_content}
+                except Exception as e:
+                    # Fallback to stdout if JSON file read fails
+                    return {"success": True, "content": stdout}
+            else:
+                # No JSON file found, return stdout (may contain text output)
+                return {"success": True, "content": stdout}
+        else:
+            return {"success": False, "error": f"Maigret failed: {stderr}"}
+
+async def handle_theharvester(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Handle theHarvester domain/email enumeration, one process per source."""
+    deadline = resolve_deadline("theharvester", params)
+    domain = params["domain"]
+    sources = select_sources(params.get("sources", "all"))
+    limit = integer_argument(params, "limit", 500)
+    source_timeout = integer_argument(params, "source_timeout", SOURCE_TIMEOUT_SECONDS)
+    for name, value in (("limit", limit), ("source_timeout", source_timeout)):
+        if value <= 0:
+            raise InvalidParams(f"{name} must be a positive integer")
+    
+    # API keys can be passed via environment variables or tool parameters
+    # Priority: tool parameter > environment variable
+    api_keys = {}
+    if "hunter_api_key" in params:
+        api_keys["HUNTER_API_KEY"] = params["hunter_api_key"]
+    if "bing_api_key" in params:
+        api_keys["BING_API_KEY"] = params["bing_api_key"]
+    if "shodan_api_key" in params:
+        api_keys["SHODAN_API_KEY"] = params["shodan_api_key"]
+    if "securitytrails_api_key" in params:
+        api_keys["SECURITYTRAILS_API_KEY"] = params["securitytrails_api_key"]
+    
+    # Use source version - should be patched during Docker build
+    if not os.path.exists(HARVESTER_SCRIPT):
+        return {"success": False, "error": f"theHarvester script not found at {HARVESTER_SCRIPT}"}
+    
+    statuses: Dict[str, Dict[str, Any]] = {}
+    found = HarvesterFindings()
+    runnable = []
+    for source in sources:
+        variable = SOURCE_API_KEYS.get(source)
+        if variable and not (api_keys.get(variable) or os.environ.get(variable)):
+            statuses[source] = {"status": "skipped", "error": f"needs {variable}"}
+        else:
+            runnable.append(source)
+    
+    reporter = CURRENT_PROGRESS.get()
+    if reporter is not None:
+        reporter.label = "theharvester"
+        reporter.total = len(runnable)
+    
+    call_started = time.monotonic()
+    # Bounds this call's share of the theHarvester process budget
+    source_slots = asyncio.Semaphore(SOURCES_PER_CALL)
+    
+    async def run_source(source: str) -> None:
+        async with source_slots:
+            started = time.monotonic()
+            timeout = source_timeout
+            if deadline is not None:
+                # A source started late gets no more than the call has left
+                timeout = min(timeout, deadline - (started - call_started))
+            if timeout <= 0:
+                return
+            with tempfile.TemporaryDirectory() as temp_dir:
+                # -f writes report.json and report.xml next to the printed output
+                report_base = Path(temp_dir) / "report"
+                cmd = ["python3", HARVESTER_SCRIPT, "-d", domain, "-b", source, "-l", str(limit), "-f", str(report_base)]
+                stdout, stderr, returncode, timed_out = await run_command_in_venv(cmd, extra_env=api_keys, cwd=HARVESTER_DIR, tool="theharvester", deadline=timeout)
+                # A source that timed out may still have printed some results
+                results = parse_harvester_run(report_base, stdout)
+        status = {
+            "status": "timed_out" if timed_out else "ok" if returncode == 0 else "failed",
+            "elapsed_seconds": round(time.monotonic() - started, 2)
+        }
+        status.update(results.counts())
+        if returncode != 0 and not timed_out:
+            status["error"] = (stderr or stdout).strip()[-500:]
+        statuses[source] = status
+        found.merge(results)
+        if reporter is not None:
+            reporter.record(1, {"source": source, "status": status["status"], "emails": status["emails"], "hosts": status["hosts"]})
+    
+    tasks = {source: asyncio.ensure_future(run_source(source)) for source in runnable}
+    try:
+        if tasks:
+            _, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+    finally:
+        for task in tasks.values():
+            task.cancel()
+    for source, task in tasks.items():
+        if task.done() and not task.cancelled() and task.exception() is not None:
+            statuses[source] = {"status": "failed", "error": str(task.exception())}
+        elif source not in statuses:
+            # Still running (or queued) when the call's deadline passed
+            statuses[source] = {"status": "cancelled"}
+    
+    content = {"domain": domain, **found.result(), "sources": {source: statuses[source] for source in sources}}
+    if not any(status["status"] == "ok" for status in statuses.values()):
+        return {"success": False, "error": "theHarvester failed for every source", "partial_output": content}
+    if any(statuses[source]["status"] != "ok" for source in runnable):
+        # Another run may get further, so this result is not cached
+        return {"success": True, "partial": True, "content": content}
+    return {"success": True, "content": content}
+
+async def handle_blackbird(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Handle Blackbird username search."""
+    deadline = resolve_deadline("blackbird", params)
+    username = params["username"]
+    timeout = await username_cli_timeout(params)
+    
+    # Blackbird needs a data directory, create it if it doesn't exist
+    data_dir = "/app/data"
+    os.makedirs(data_dir, exist_ok=True)
+    
+    # Set environment variable for data path, preferring a real WhatsMyName
+    # list over the empty placeholder
+    extra_env = {
+        "BLACKBIRD_DATA_DIR": data_dir,
+        "USERNAME_LIST_PATH": site_database_paths()["blackbird"] or os.path.join(data_dir, "wmn-data.json")
+    }
+    
+    # Try to initialize data file if it doesn't exist
+    data_file = extra_env["USERNAME_LIST_PATH"]
+    if not os.path.exists(data_file):
+        # Create empty JSON file as placeholder
+        Path(data_file).parent.mkdir(parents=True, exist_ok=True)
+        Path(data_file).write_text("{}")
+    
+    cmd = ["python3", "/opt/blackbird/blackbird.py", "-u", username, "--timeout", str(timeout)]
+    
+    stdout, stderr, returncode, timed_out = await run_command_in_venv(cmd, extra_env=extra_env, cwd="/opt/blackbird", tool="blackbird", deadline=deadline, on_stdout_line=progress_line_handler("blackbird"))
+    
+    if timed_out:
+        return timeout_result("Blackbird", deadline, stdout, stderr)
+    
+    if returncode == 0:
+        return {"success": True, "content": stdout}
+    else:
+        return {"success": False, "error": f"Blackbird failed: {stderr}"}
+
+# Usernames one batch call may probe, variants included
+BATCH_MAX_USERNAMES = 500
+
+async def select_probe_sites(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Load the sites a probe call asked for, filtered by its sites and tags arguments."""
+    sources = params.get("sources") or SITE_SOURCES
+    maigret_top = None if params.get("all_maigret_sites") else MAIGRET_TOP_SITES
+    database = await asyncio.to_thread(select_sites, sources, maigret_top)
+    sites = database["sites"]
+    wanted = {site.lower() for site in params.get("sites") or []}
+    if wanted:
+        sites = [site for site in sites if site.name.lower() in wanted]
+    tags = {tag.lower() for tag in params.get("tags") or []}
+    if tags:
+        sites = [site for site in sites if tags.intersection(tag.lower() for tag in site.tags)]
+    return dict(database, sites=sites)
+
+async def handle_username_probe(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Probe the merged Sherlock, Maigret and WhatsMyName site lists in one pass."""
+    deadline = resolve_deadline("probe", params)
+    username = params["username"]
+    timeout = params.get("timeout", PROBE_TIMEOUT_SECONDS)
+    
+    try:
+        database = await select_probe_sites(params)
+    except Exception as e:
+        return {"success": False, "error": f"Could not load site databases: {str(e)}"}
+    sites = database["sites"]
+    if not sites:
+        return {"success": False, "error": "No sites to probe", "unavailable_sources": database["unavailable"]}
+    
+    reporter = CURRENT_PROGRESS.get()
+    if reporter is not None:
+        reporter.label = "probe"
+    done = []
+    
+    def on_result(site, result):
+        done.append((site, result))
+        if reporter is not None:
+            claimed = result["state"] == "claimed"
+            reporter.record(1, {"site": site.name, "url": result["url"], "sources": list(site.sources)} if claimed else None)
+    
+    def annotate(content: Dict[str, Any]) -> Dict[str, Any]:
+        content["stats"].update(per_source=database["per_source"], duplicates_merged=database["duplicates"])
+        if database["unavailable"]:
+            content["unavailable_sources"] = database["unavailable"]
+        return content
+    
+    try:
+        async with SCHEDULER.slot("probe"):
+            content = await asyncio.wait_for(PROBER.probe(username, sites, timeout, on_result), timeout=deadline)
+    except ImportError:
+        return {"success": False, "error": "The unified prober needs aiohttp (pip install aiohttp)"}
+    except asyncio.TimeoutError:
+        return timeout_result("Unified username probe", deadline, annotate(summarize(username, done)), "")
+    return {"success": True, "content": annotate(content)}
+
+async def handle_batch_username_probe(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Probe the merged site lists for many usernames over the shared connection pool."""
+    deadline = resolve_deadline("probe_batch", params)
+    timeout = params.get("timeout", PROBE_TIMEOUT_SECONDS)
+    usernames, variants = expand_usernames(params["usernames"], params.get("include_variants", False), params.get("max_variants", 3))
+    if not usernames:
+        return {"success": False, "error": "No usernames to probe"}
+    if len(usernames) > BATCH_MAX_USERNAMES:
+        return {"success": False, "error": f"{len(usernames)} usernames requested; a batch takes at most {BATCH_MAX_USERNAMES}, variants included"}
+    
+    try:
+        database = await select_probe_sites(params)
+    except Exception as e:
+        return {"success": False, "error": f"Could not load site databases: {str(e)}"}
+    sites = database["sites"]
+    if not sites:
+        return {"success": False, "error": "No sites to probe", "unavailable_sources": database["unavailable"]}
+    
+    reporter = CURRENT_PROGRESS.get()
+    if reporter is not None:
+        reporter.label = "batch"
+        reporter.total = len(usernames) * len(sites)
+    done: Dict[str, List[Any]] = {username: [] for username in usernames}
+    started = time.monotonic()
+    
+    def on_result(username, site, result):
+        done[username].append((site, result))
+        if reporter is not None:
+            claimed = result["state"] == "claimed"
+            reporter.record(1, {"username": username, "site": site.name, "url": result["url"], "sources": list(site.sources)} if claimed else None)
+    
+    def build() -> Dict[str, Any]:
+        results = []
+        for username in usernames:
+            summary = summarize(username, done[username])
+            # Per-site unknown lists add up quickly over a batch; the counts stay in stats
+            del summary["unknown"]
+            results.append(summary)
+        content = {
+            "results": results,
+            "stats": {
+                "usernames": len(usernames),
+                "sites": len(sites),
+                "probes": sum(len(found) for found in done.values()),
+                "claimed": sum(len(result["claimed"]) for result in results),
+                "elapsed_seconds": round(time.monotonic() - started, 2),
+                "per_source": database["per_source"],
+                "duplicates_merged": database["duplicates"]
+            }
+        }
+        if variants:
+            content["variants"] = variants
+        if database["unavailable"]:
+            content["unavailable_sources"] = database["unavailable"]
+        return content
+    
+    try:
+        async with SCHEDULER.slot("probe_batch"):
+            await asyncio.wait_for(PROBER.probe_batch(usernames, sites, timeout, on_result), timeout=deadline)
+    except ImportError:
+        return {"success": False, "error": "The unified prober needs aiohttp (pip install aiohttp)"}
+    except asyncio.TimeoutError:
+        return timeout_result("Batch username probe", deadline, build(), "")
+    return {"success": True, "content": build()}
+
+SHERLOCK_TOOL = ToolSpec(
+    name="sherlock_username_search",
+    description="Search for username across 399+ social media platforms and websites",
+    properties={
+        "username": {"type": "string", "description": "Username to search for"},
+        "timeout": {"type": "integer", "description": "Per-request timeout in seconds (default: learned from observed site latency, at most 60)"},
+        "sites": {"type": "array", "items": {"type": "string"}, "description": "Specific sites to search"},
+        "output_format": {"type": "string", "enum": ["txt", "csv", "xlsx"], "description": "Output format"}
+    },
+    required=["username"],
+    handler=handle_sherlock,
+    process_name="sherlock",
+    progress_parser=parse_bracket_line,
+    concurrency_limit=2,
+    priority=1,
+    deadline=900,
+    cache_ttl=6 * 3600
+)
+
+HOLEHE_TOOL = ToolSpec(
+    name="holehe_email_search",
+    description="Check if email is registered on 120+ platforms",
+    properties={
+        "email": {"type": "string", "description": "Email address to investigate"},
+        "only_used": {"type": "boolean", "description": "Show only registered accounts (default: true)"},
+        "timeout": {"type": "integer", "description": "Request timeout in seconds (default: 10000)"}
+    },
+    required=["email"],
+    handler=handle_holehe,
+    process_name="holehe",
+    progress_parser=parse_bracket_line,
+    concurrency_limit=4,
+    priority=0,
+    deadline=300,
+    cache_ttl=12 * 3600
+)
+
+HOLEHE_BATCH_TOOL = ToolSpec(
+    name="holehe_batch_email_search",
+    description="Check many email addresses at once against Holehe's 120+ platforms. Holehe's modules run inside the server over one shared connection pool, with per-platform rate limits, and used accounts stream as progress while the batch runs.",
+    properties={
+        "emails": {"type": "array", "items": {"type": "string"}, "description": f"Email addresses to check (at most {BATCH_MAX_EMAILS})"},
+        "modules": {"type": "array", "items": {"type": "string"}, "description": "Only run these Holehe modules, by name (e.g. twitter, github) or category (e.g. social_media, shopping)"},
+        "no_password_recovery": {"type": "boolean", "description": "Skip modules that start a password recovery the account owner may notice (default: false)"},
+        "only_used": {"type": "boolean", "description": "Report only platforms where the address is registered (default: true)"},
+        "timeout": {"type": "integer", "description": f"Request timeout in seconds (default: {EMAIL_TIMEOUT_SECONDS})"}
+    },
+    required=["emails"],
+    handler=handle_holehe_batch,
+    # Modules run in-process; the name gives batches a scheduler budget and deadline
+    process_name="holehe_batch",
+    concurrency_limit=1,
+    priority=0,
+    deadline=7200,
+    cache_ttl=12 * 3600
+)
+
+SPIDERFOOT_TOOL = ToolSpec(
+    name="spiderfoot_scan",
+    description="Comprehensive OSINT scan - auto-detects target type (IP, IPv6, domain, email, phone, username, person name, Bitcoin address, network block, BGP AS). Modules come from a scan profile (passive-fast takes seconds to minutes; all runs every module), an explicit module list, or the event types wanted. Modules needing API keys run only when their key is set in the environment (SHODAN_API_KEY, VIRUSTOTAL_API_KEY, etc.).",
+    properties={
+        "target": {
+            "type": "string",
+            "description": "Target to scan - SpiderFoot auto-detects type from: IP address, IPv6 address, domain, email, phone number, username, person name, Bitcoin address, network block, or BGP AS"
+        },
+        "profile": {
+            "type": "string",
+            "enum": list(SCAN_PROFILES),
+            "description": f"Modules to run: passive-fast (passive modules that are neither slow nor invasive), footprint, investigate (SpiderFoot's use cases) or all (default: {DEFAULT_PROFILE})"
+        },
+        "modules": {"type": "array", "items": {"type": "string"}, "description": "Run exactly these modules instead of a profile, e.g. sfp_dnsresolve or dnsresolve"},
+        "event_types": {"type": "array", "items": {"type": "string"}, "description": "Only report these event types, e.g. EMAILADDR, INTERNET_NAME; a profile is narrowed to the modules producing them"}
+    },
+    required=["target"],
+    handler=handle_spiderfoot,
+    process_name="spiderfoot",
+    concurrency_limit=1,
+    priority=3,
+    deadline=3600,
+    cache_ttl=24 * 3600
+)
+
+SPIDERFOOT_SCAN_ID = {"type": "string", "description": "The scan_id returned by spiderfoot_start_scan"}
+
+SPIDERFOOT_START_TOOL = ToolSpec(
+    name="spiderfoot_start_scan",
+    description="Start a SpiderFoot scan in the server's long-lived SpiderFoot instance and return its scan_id immediately. The scan keeps running independently of this call; read its events with spiderfoot_scan_events and its results with spiderfoot_scan_results. Several scans can run at once.",
+    properties=dict(SPIDERFOOT_TOOL.properties),
+    required=["target"],
+    handler=handle_spiderfoot_start,
+    coalesce=False
+)
+
+SPIDERFOOT_EVENTS_TOOL = ToolSpec(
+    name="spiderfoot_scan_events",
+    description="Read the events of a running or finished SpiderFoot scan after a cursor, optionally waiting for new ones. Pass next_cursor from the previous reply to continue; finished tells when the scan is done.",
+    properties={
+        "scan_id": SPIDERFOOT_SCAN_ID,
+        "cursor": {"type": "integer", "description": "Number of events already read (default: 0)"},
+        "limit": {"type": "integer", "description": "Maximum events to return (default: 500)"},
+        "wait": {"type": "integer", "description": f"Seconds to wait for new events when there are none yet (default: 0, max: {SPIDERFOOT_MAX_WAIT_SECONDS})"}
+    },
+    required=["scan_id"],
+    handler=handle_spiderfoot_events,
+    coalesce=False
+)
+
+SPIDERFOOT_RESULTS_TOOL = ToolSpec(
+    name="spiderfoot_scan_results",
+    description="Fetch all events of a SpiderFoot scan found so far, deduplicated and grouped by event type, with counts per type",
+    properties={"scan_id": SPIDERFOOT_SCAN_ID},
+    required=["scan_id"],
+    handler=handle_spiderfoot_results,
+    coalesce=False
+)
+
+SPIDERFOOT_STOP_TOOL = ToolSpec(
+    name="spiderfoot_stop_scan",
+    description="Abort a running SpiderFoot scan; the events found so far remain readable",
+    properties={"scan_id": SPIDERFOOT_SCAN_ID},
+    required=["scan_id"],
+    handler=handle_spiderfoot_stop,
+    coalesce=False
+)
+
+GHUNT_TOOL = ToolSpec(
+    name="ghunt_google_search",
+    description="Search for Google account information using email address or Google ID. API keys can be provided via environment variables (GOOGLE_API_KEY, GOOGLE_CX) for enhanced searches.",
+    properties={
+        "identifier": {"type": "string", "description": "Email address or Google ID to search"},
+        "timeout": {"type": "integer", "description": "Timeout in seconds (default: 10000)"}
+    },
+    required=["identifier"],
+    handler=handle_ghunt,
+    process_name="ghunt",
+    concurrency_limit=2,
+    priority=0,
+    deadline=300,
+    cache_ttl=12 * 3600
+)
+
+MAIGRET_TOOL = ToolSpec(
+    name="maigret_username_search",
+    description="Search for username across 3000+ sites with detailed analysis and false positive detection",
+    properties={
+        "username": {"type": "string", "description": "Username to search for"},
+        "timeout": {"type": "integer", "description": "Per-request timeout in seconds (default: learned from observed site latency, at most 60)"}
+    },
+    required=["username"],
+    handler=handle_maigret,
+    process_name="maigret",
+    progress_parser=parse_bracket_line,
+    concurrency_limit=2,
+    priority=2,
+    deadline=1200,
+    cache_ttl=6 * 3600
+)
+
+THEHARVESTER_TOOL = ToolSpec(
+    name="theharvester_domain_search",
+    description="Gather emails, subdomains, hosts, employee names, open ports and banners from public sources. Each source runs separately with its own time budget, so slow sources do not hold up the rest; results are merged and deduplicated, with a status per source. API keys can be provided via environment variables or optional parameters for enhanced sources (hunter, bingapi, shodan, securityTrails).",
+    properties={
+        "domain": {"type": "string", "description": "Domain/company name to search"},
+        "sources": {"type": "string", "description": "Comma-separated data sources (default: all). Options: baidu, bing, bingapi, certspotter, crtsh, dnsdumpster, duckduckgo, github-code, google, hackertarget, hunter, linkedin, linkedin_links, otx, pentesttools, projectdiscovery, qwant, rapiddns, securityTrails, sublist3r, threatcrowd, threatminer, trello, twitter, urlscan, virustotal, yahoo"},
+        "limit": {"type": "integer", "description": "Limit results per source (default: 500)"},
+        "source_timeout": {"type": "integer", "description": f"Seconds each source may run before it is stopped (default: {SOURCE_TIMEOUT_SECONDS})"},
+        "hunter_api_key": {"type": "string", "description": "Optional: Hunter.io API key for enhanced email discovery"},
+        "bing_api_key": {"type": "string", "description": "Optional: Bing API key for bingapi source"},
+        "shodan_api_key": {"type": "string", "description": "Optional: Shodan API key for shodan source"},
+        "securitytrails_api_key": {"type": "string", "description": "Optional: SecurityTrails API key for securityTrails source"}
+    },
+    required=["domain"],
+    handler=handle_theharvester,
+    process_name="theharvester",
+    # One process per source
+    concurrency_limit=4,
+    priority=2,
+    deadline=1200,
+    cache_ttl=24 * 3600
+)
+
+BLACKBIRD_TOOL = ToolSpec(
+    name="blackbird_username_search",
+    description="Fast OSINT tool to search for accounts by username across 581 sites",
+    properties={
+        "username": {"type": "string", "description": "Username to search for"},
+        "timeout": {"type": "integer", "description": "Per-request timeout in seconds (default: learned from observed site latency, at most 60)"}
+    },
+    required=["username"],
+    handler=handle_blackbird,
+    process_name="blackbird",
+    progress_parser=parse_blackbird_line,
+    concurrency_limit=2,
+    priority=1,
+    deadline=900,
+    cache_ttl=6 * 3600
+)
+
+USERNAME_PROBE_TOOL = ToolSpec(
+    name="unified_username_search",
+    description="Search for a username across the combined Sherlock, Maigret and Blackbird (WhatsMyName) site lists in one pass. Sites listed by several databases are checked once, and each hit reports which databases cover it.",
+    properties={
+        "username": {"type": "string", "description": "Username to search for"},
+        "sources": {"type": "array", "items": {"type": "string", "enum": SITE_SOURCES}, "description": "Site databases to combine (default: all)"},
+        "sites": {"type": "array", "items": {"type": "string"}, "description": "Specific sites to check, by name"},
+        "tags": {"type": "array", "items": {"type": "string"}, "description": "Only check sites with one of these tags or categories, e.g. coding, gaming, social"},
+        "all_maigret_sites": {"type": "boolean", "description": "Use every enabled Maigret site instead of its top 500 (default: false)"},
+        "timeout": {"type": "integer", "description": f"Per-site connect and read timeout in seconds (default: {PROBE_TIMEOUT_SECONDS})"}
+    },
+    required=["username"],
+    handler=handle_username_probe,
+    # Probes run in-process; the name gives them a scheduler budget and deadline
+    process_name="probe",
+    concurrency_limit=2,
+    priority=1,
+    deadline=600,
+    cache_ttl=6 * 3600
+)
+
+BATCH_USERNAME_PROBE_TOOL = ToolSpec(
+    name="batch_username_search",
+    description="Search for many usernames at once across the combined Sherlock, Maigret and Blackbird (WhatsMyName) site lists, optionally adding common variants of each (case, separators, trailing digits). All probes share one connection pool, which is much faster than one call per username; hits stream as progress.",
+    properties={
+        "usernames": {"type": "array", "items": {"type": "string"}, "description": f"Usernames to search for (at most {BATCH_MAX_USERNAMES}, variants included)"},
+        "include_variants": {"type": "boolean", "description": "Also search common variants of each username, e.g. john_doe and jdoe for John.Doe (default: false)"},
+        "max_variants": {"type": "integer", "description": "Variants added per username when include_variants is set (default: 3)"},
+        "sources": {"type": "array", "items": {"type": "string", "enum": SITE_SOURCES}, "description": "Site databases to combine (default: all)"},
+        "sites": {"type": "array", "items": {"type": "string"}, "description": "Specific sites to check, by name"},
+        "tags": {"type": "array", "items": {"type": "string"}, "description": "Only check sites with one of these tags or categories, e.g. coding, gaming, social"},
+        "all_maigret_sites": {"type": "boolean", "description": "Use every enabled Maigret site instead of its top 500 (default: false)"},
+        "timeout": {"type": "integer", "description": f"Per-site connect and read timeout in seconds (default: {PROBE_TIMEOUT_SECONDS})"}
+    },
+    required=["usernames"],
+    handler=handle_batch_username_probe,
+    # A batch already uses the whole connection pool; more at once only queue
+    process_name="probe_batch",
+    concurrency_limit=1,
+    priority=1,
+    deadline=3600,
+    cache_ttl=6 * 3600
+)
+
+# All OSINT tools, in the order the aggregate server lists them
+ALL_TOOLS = [
+    SHERLOCK_TOOL,
+    HOLEHE_TOOL,
+    HOLEHE_BATCH_TOOL,
+    SPIDERFOOT_TOOL,
+    SPIDERFOOT_START_TOOL,
+    SPIDERFOOT_EVENTS_TOOL,
+    SPIDERFOOT_RESULTS_TOOL,
+    SPIDERFOOT_STOP_TOOL,
+    GHUNT_TOOL,
+    MAIGRET_TOOL,
+    THEHARVESTER_TOOL,
+    BLACKBIRD_TOOL,
+    USERNAME_PROBE_TOOL,
+    BATCH_USERNAME_PROBE_TOOL,
+]
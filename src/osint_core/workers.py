@@ -0,0 +1,327 @@
+"""
+Warm worker pool.
+
+Keeps tool libraries imported in long-lived worker processes so short
+searches skip interpreter start-up and site-data parsing.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from .engines import WORKER_ENGINES, EngineUnsupported, url_host
+from .hostguard import HOST_GUARD
+from .scheduler import SCHEDULER
+from .siteindex import select_sites
+from .sites import USERNAME
+
+# Long-lived worker processes that keep the tool libraries imported with their
+# site data parsed, so short searches skip interpreter start-up.
+# Set OSINT_WORKER_POOL_SIZE=0 to always use the command-line tools.
+WORKER_POOL_SIZE = max(0, int(os.environ.get("OSINT_WORKER_POOL_SIZE", "2")))
+
+# Seconds to wait for a new worker to import the tool libraries
+WORKER_START_TIMEOUT = 120.0
+
+# Engines whose requests the parent can list from the site index before a call
+SITE_INDEX_ENGINES = {"sherlock", "maigret"}
+
+class WorkerTimeout(asyncio.TimeoutError):
+    """A pooled call passed its deadline; partial_output holds the hits found so far."""
+    
+    def __init__(self, hits: List[str]):
+        super().__init__()
+        self.partial_output = "\n".join(hits)
+
+async def admit_hosts(hosts: Iterable[str]) -> List[str]:
+    """Take one HOST_GUARD token per planned request; returns the hosts whose breakers refused.
+    
+    Hosts are waited for concurrently, so only hosts with several requests
+    in the call wait for their budget.
+    """
+    hosts = list(hosts)
+    allowed = await asyncio.gather(*(HOST_GUARD.acquire(host) for host in hosts))
+    return sorted({host for host, ok in zip(hosts, allowed) if not ok})
+
+def worker_main(conn, engine_names: List[str]) -> None:
+    """Entry point of a pool worker process.
+    
+    Loads each of engine_names whose library is installed, reports which ones
+    are available, then serves (engine, params, stream) requests until the
+    pipe closes. ("line", text) messages report each hit before the final
+    (status, payload) reply, so the parent keeps them if the call times out;
+    with stream set, every site checked is reported.
+    """
+    # Own process group, so killing the worker also stops any helpers it
+    # started. stdout carries JSON-RPC in the parent; keep tool chatter off it.
+    os.setsid()
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+    
+    engines: Dict[str, Any] = {}
+    for name in engine_names:
+        try:
+            engines[name] = WORKER_ENGINES[name][0]()
+        except Exception as e:
+            print(f"Worker {os.getpid()}: {name} engine unavailable ({e})", file=sys.stderr)
+    conn.send(sorted(engines))
+    
+    while True:
+        try:
+            name, params, stream = conn.recv()
+        except (EOFError, OSError):
+            break
+        
+        def emit(line: str) -> None:
+            if stream or line.startswith("[+]"):
+                conn.send(("line", line))
+        
+        try:
+            conn.send(("ok", WORKER_ENGINES[name][1](engines[name], params, emit)))
+        except EngineUnsupported as e:
+            conn.send(("unsupported", str(e)))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+class PoolWorker:
+    """Parent-side handle for one worker process."""
+    
+    def __init__(self, context, engine_names: List[str]):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=worker_main, args=(child_conn, engine_names), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.engines: Set[str] = set()
+    
+    async def receive(self) -> Any:
+        """Wait for the next message from the worker without blocking the loop."""
+        loop = asyncio.get_running_loop()
+        while not self.conn.poll():
+            readable = loop.create_future()
+            fd = self.conn.fileno()
+            loop.add_reader(fd, lambda: readable.done() or readable.set_result(None))
+            try:
+                await readable
+            finally:
+                loop.remove_reader(fd)
+        return self.conn.recv()
+    
+    def kill(self) -> None:
+        """Kill the worker and everything it started."""
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            self.process.kill()
+        self.process.join(timeout=1)
+        self.conn.close()
+
+class WarmWorkerPool:
+    """Pool of PoolWorker processes serving in-process tool engines.
+    
+    Workers are started lazily (or by start()) and reused across calls. A
+    worker that misses its deadline or whose call is cancelled is killed and
+    replaced. run() returns None whenever the pool cannot serve a call, so
+    handlers fall back to the command-line tool.
+    """
+    
+    def __init__(self, size: int):
+        self.size = size
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: List[PoolWorker] = []
+        self._started = 0
+        self._available: Optional[asyncio.Condition] = None
+        self.engine_names: List[str] = []
+        self.engines: Optional[Set[str]] = None
+        # Hosts reported by earlier calls of engines missing from the site index
+        self.learned_hosts: Dict[str, Set[str]] = {}
+        self.counters = {"served": 0, "fallbacks": 0, "restarts": 0}
+    
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0 and bool(self.engine_names) and self.engines != set()
+    
+    def configure(self, engine_names: List[str]) -> None:
+        """Set the engines workers load; only takes effect for new workers."""
+        self.engine_names = [name for name in engine_names if name in WORKER_ENGINES]
+    
+    def supports(self, engine: str) -> bool:
+        return self.enabled and (self.engines is None or engine in self.engines)
+    
+    async def _spawn(self) -> Optional[PoolWorker]:
+        worker = PoolWorker(self._context, self.engine_names)
+        try:
+            worker.engines = set(await asyncio.wait_for(worker.receive(), timeout=WORKER_START_TIMEOUT))
+        except (asyncio.TimeoutError, EOFError, OSError) as e:
+            print(f"Worker pool: worker failed to start ({e!r}), using the CLI tools", file=sys.stderr)
+            worker.kill()
+            self.engines = self.engines or set()
+            return None
+        except asyncio.CancelledError:
+            worker.kill()
+            raise
+        self.engines = worker.engines
+        if not worker.engines:
+            print("Worker pool: no tool libraries importable, using the CLI tools", file=sys.stderr)
+            worker.kill()
+            return None
+        return worker
+    
+    async def _acquire(self) -> Optional[PoolWorker]:
+        if self._available is None:
+            self._available = asyncio.Condition()
+        async with self._available:
+            while not self._idle and self._started >= self.size:
+                await self._available.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._started += 1
+        worker = None
+        try:
+            worker = await self._spawn()
+        finally:
+            if worker is None:
+                await asyncio.shield(self._release(None))
+        return worker
+    
+    async def _release(self, worker: Optional[PoolWorker]) -> None:
+        """Return worker to the pool, or free its slot if it is gone (None)."""
+        async with self._available:
+            if worker is None:
+                self._started -= 1
+            else:
+                self._idle.append(worker)
+            self._available.notify()
+    
+    async def start(self) -> None:
+        """Start all workers ahead of the first call."""
+        if not self.enabled:
+            return
+        workers = await asyncio.gather(*[self._acquire() for _ in range(self.size)], return_exceptions=True)
+        for worker in workers:
+            if isinstance(worker, PoolWorker):
+                await self._release(worker)
+    
+    async def planned_requests(self, engine: str, params: Dict[str, Any]) -> List[str]:
+        """Host of each request a call of engine is expected to send.
+        
+        Sherlock and Maigret sites come from the site index with the username
+        filled in; other engines are expected to contact the hosts their
+        earlier calls reported.
+        """
+        if engine not in SITE_INDEX_ENGINES:
+            return sorted(self.learned_hosts.get(engine, ()))
+        database = await asyncio.to_thread(select_sites, [engine])
+        wanted = {site.lower() for site in params.get("sites") or []}
+        hosts = []
+        for site in database["sites"]:
+            if wanted and site.name.lower() not in wanted:
+                continue
+            host = url_host(site.probe_url.replace(USERNAME, params["username"]))
+            if host:
+                hosts.append(host.lower())
+        return hosts
+    
+    async def _exchange(self, worker: PoolWorker, engine: str, params: Dict[str, Any], on_line: Callable[[str], None], stream: bool) -> Any:
+        worker.conn.send((engine, params, stream))
+        while True:
+            status, payload = await worker.receive()
+            if status != "line":
+                return status, payload
+            try:
+                on_line(payload)
+            except Exception as e:
+                print(f"Worker pool: line callback failed: {e}", file=sys.stderr)
+    
+    async def run(self, engine: str, params: Dict[str, Any], deadline: Optional[float], on_line: Optional[Callable[[str], None]] = None) -> Optional[Dict[str, Any]]:
+        """Run engine on a warm worker.
+        
+        Returns the result dict, or None if the call should go to the CLI.
+        Raises WorkerTimeout, with the hits found so far, if the deadline
+        passes. on_line receives each site checked, as a CLI-style output
+        line, while the call runs.
+        """
+        if not self.supports(engine):
+            return None
+        # Workers cannot share the server's buckets and breakers: the call's
+        # requests take their tokens here, and the worker skips the hosts
+        # whose breakers are open
+        started = time.monotonic()
+        try:
+            refused = await asyncio.wait_for(admit_hosts(await self.planned_requests(engine, params)), timeout=deadline)
+        except asyncio.TimeoutError:
+            raise WorkerTimeout([])
+        params = dict(params, skip_hosts=sorted(set(refused) | set(HOST_GUARD.open_hosts())))
+        if deadline is not None:
+            deadline = max(0.0, deadline - (time.monotonic() - started))
+        worker = await self._acquire()
+        if worker is None:
+            self.counters["fallbacks"] += 1
+            return None
+        if engine not in worker.engines:
+            await self._release(worker)
+            self.counters["fallbacks"] += 1
+            return None
+        
+        hits: List[str] = []
+        
+        def collect(line: str) -> None:
+            if line.startswith("[+]"):
+                hits.append(line)
+            if on_line is not None:
+                on_line(line)
+        
+        try:
+            status, payload = await asyncio.wait_for(self._exchange(worker, engine, params, collect, on_line is not None), timeout=deadline)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            worker.kill()
+            self.counters["restarts"] += 1
+            await asyncio.shield(self._release(None))
+            if isinstance(e, asyncio.TimeoutError):
+                raise WorkerTimeout(hits)
+            raise
+        except (EOFError, OSError) as e:
+            print(f"Worker pool: worker died running {engine} ({e!r})", file=sys.stderr)
+            worker.kill()
+            self.counters["restarts"] += 1
+            self.counters["fallbacks"] += 1
+            await self._release(None)
+            return None
+        
+        await self._release(worker)
+        if status != "ok":
+            print(f"Worker pool: {engine} {status}: {payload}; falling back to the CLI", file=sys.stderr)
+            self.counters["fallbacks"] += 1
+            return None
+        self.counters["served"] += 1
+        host_statuses = payload.pop("host_statuses", ())
+        HOST_GUARD.record_many(host_statuses)
+        if engine not in SITE_INDEX_ENGINES:
+            self.learned_hosts.setdefault(engine, set()).update(host.lower() for host, _ in host_statuses)
+        payload["engine"] = "worker"
+        return payload
+    
+    def stats(self) -> Dict[str, Any]:
+        return dict(
+            self.counters,
+            size=self.size,
+            workers=self._started,
+            idle=len(self._idle),
+            engines=sorted(self.engines) if self.engines is not None else None
+        )
+
+WORKER_POOL = WarmWorkerPool(WORKER_POOL_SIZE)
+
+async def run_in_worker_pool(tool: str, params: Dict[str, Any], deadline: Optional[float], on_line: Optional[Callable[[str], None]] = None) -> Optional[Dict[str, Any]]:
+    """Run tool on the warm worker pool under the tool's admission budget.
+    
+    Returns None when the pool cannot serve the call and the caller should
+    use the CLI instead; raises WorkerTimeout when the deadline passes.
+    """
+    if not WORKER_POOL.supports(tool):
+        return None
+    async with SCHEDULER.slot(tool):
+        return await WORKER_POOL.run(tool, params, deadline, on_line)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Unit tests for result caching and call coalescing (osint_core.cache)."""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from osint_core import server
+from osint_core.cache import ResultCache, SingleFlight, cache_key, canonicalize_arguments
+from osint_core.registry import ToolRegistry, ToolSpec
+
+def test_canonicalize_arguments():
+    assert canonicalize_arguments({
+        "email": " Alice@Example.COM ",
+        "username": " Alice ",
+        "sites": ["twitter", "github", "twitter"],
+        "cache": "refresh",
+        "max_runtime": 30,
+        "timeout": None
+    }) == {"email": "alice@example.com", "username": "Alice", "sites": ["github", "twitter"]}
+
+def test_equivalent_calls_share_a_key():
+    assert cache_key("holehe", {"email": "A@x.com", "cache": "bypass"}) == cache_key("holehe", {"email": "a@x.com "})
+    assert cache_key("holehe", {"email": "a@x.com"}) != cache_key("ghunt", {"email": "a@x.com"})
+    assert cache_key("sherlock", {"username": "Alice"}) != cache_key("sherlock", {"username": "alice"})
+
+def test_memory_hits_carry_cache_metadata():
+    async def scenario():
+        cache = ResultCache(None, 1 << 20, 1 << 20, {"tool": 60})
+        await cache.put("tool", "k", {"success": True, "content": "x"})
+        return cache, await cache.get("k"), await cache.get("missing")
+    
+    cache, hit, miss = asyncio.run(scenario())
+    assert hit["content"] == "x" and hit["cache"]["tier"] == "memory"
+    assert miss is None
+    assert cache.counters["memory_hits"] == 1 and cache.counters["misses"] == 1
+
+def test_results_without_ttl_or_too_large_are_not_stored():
+    async def scenario():
+        cache = ResultCache(None, 1 << 20, 100, {"tool": 60})
+        await cache.put("other", "a", {"success": True})
+        await cache.put("tool", "b", {"success": True, "content": "x" * 200})
+        return cache
+    
+    cache = asyncio.run(scenario())
+    assert cache.counters["stores"] == 0
+
+def test_memory_tier_evicts_least_recently_used():
+    async def scenario():
+        cache = ResultCache(None, 100, 1 << 20, {"tool": 60})
+        await cache.put("tool", "a", {"content": "a" * 30})
+        await cache.put("tool", "b", {"content": "b" * 30})
+        await cache.get("a")
+        await cache.put("tool", "c", {"content": "c" * 30})
+        return [key for key in "abc" if await cache.get(key) is not None]
+    
+    assert asyncio.run(scenario()) == ["a", "c"]
+
+def test_expired_entries_are_misses():
+    async def scenario():
+        cache = ResultCache(None, 1 << 20, 1 << 20, {"tool": 60})
+        await cache.put("tool", "k", {"success": True})
+        created, _, text = cache._memory["k"]
+        cache._memory["k"] = (created, time.time() - 1, text)
+        return await cache.get("k"), cache.stats()["memory_entries"]
+    
+    assert asyncio.run(scenario()) == (None, 0)
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    
+    async def first():
+        await ResultCache(path, 1 << 20, 1 << 20, {"tool": 60}).put("tool", "k", {"success": True, "content": [1, 2]})
+    
+    async def second():
+        cache = ResultCache(path, 1 << 20, 1 << 20, {"tool": 60})
+        return await cache.get("k"), await cache.get("k")
+    
+    asyncio.run(first())
+    disk, memory = asyncio.run(second())
+    assert disk["content"] == [1, 2] and disk["cache"]["tier"] == "disk"
+    assert memory["cache"]["tier"] == "memory"
+
+def test_unusable_database_falls_back_to_memory(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    
+    async def scenario():
+        cache = ResultCache(str(blocker / "cache.sqlite3"), 1 << 20, 1 << 20, {"tool": 60})
+        await cache.put("tool", "k", {"success": True})
+        return await cache.get("k"), cache.stats()["disk_enabled"]
+    
+    hit, disk_enabled = asyncio.run(scenario())
+    assert hit["cache"]["tier"] == "memory"
+    assert not disk_enabled
+
+def test_identical_calls_share_one_execution():
+    async def scenario():
+        flight = SingleFlight()
+        runs = []
+        
+        async def execute():
+            runs.append(1)
+            await asyncio.sleep(0.01)
+            return {"success": True, "content": "x"}
+        
+        results = await asyncio.gather(*[flight.run("key", execute) for _ in range(5)])
+        other = await flight.run("other", execute)
+        return flight, runs, results, other
+    
+    flight, runs, results, other = asyncio.run(scenario())
+    assert len(runs) == 2
+    assert [result.get("coalesced", False) for result in results] == [False, True, True, True, True]
+    assert "coalesced" not in other
+    assert flight.stats() == {"executions": 2, "coalesced": 4, "in_flight": 0}
+
+def test_execution_survives_until_its_last_caller_is_cancelled():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+        state = {"cancelled": False}
+        
+        async def execute():
+            try:
+                await release.wait()
+            except asyncio.CancelledError:
+                state["cancelled"] = True
+                raise
+            return {"success": True}
+        
+        first = asyncio.create_task(flight.run("key", execute))
+        second = asyncio.create_task(flight.run("key", execute))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        await asyncio.sleep(0.01)
+        survived = not state["cancelled"]
+        second.cancel()
+        await asyncio.gather(first, second, return_exceptions=True)
+        await asyncio.sleep(0.01)
+        return survived, state["cancelled"], flight.stats()["in_flight"]
+    
+    assert asyncio.run(scenario()) == (True, True, 0)
+
+def test_failures_reach_every_caller_and_are_not_kept():
+    async def scenario():
+        flight = SingleFlight()
+        
+        async def execute():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+        
+        results = await asyncio.gather(flight.run("key", execute), flight.run("key", execute), return_exceptions=True)
+        return results, flight.stats()["in_flight"]
+    
+    results, in_flight = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert in_flight == 0
+
+def test_calls_with_different_deadlines_run_separately(monkeypatch):
+    monkeypatch.setattr(server, "RESULT_CACHE", ResultCache(None, 1 << 20, 1 << 20, {}))
+    monkeypatch.setattr(server, "SINGLE_FLIGHT", SingleFlight())
+    runs = []
+    
+    async def handler(params):
+        runs.append(params.get("max_runtime"))
+        await asyncio.sleep(0.01)
+        return {"success": True, "content": "x"}
+    
+    registry = ToolRegistry([ToolSpec("fake_tool", "", {}, [], handler)])
+    
+    async def scenario():
+        slots = asyncio.Semaphore(4)
+        calls = [{"max_runtime": 10}, {"max_runtime": 600}, {"max_runtime": 10}, {}]
+        return await asyncio.gather(*[server.cached_tool_call(registry, "fake_tool", params, slots) for params in calls])
+    
+    results = asyncio.run(scenario())
+    assert sorted(runs, key=str) == [10, 600, None]
+    assert [result.get("coalesced", False) for result in results] == [False, False, True, False]
+    # The result cache still treats them as the same call
+    assert cache_key("fake_tool", {"max_runtime": 10}) == cache_key("fake_tool", {})
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Unit tests for the in-process Holehe batch prober (osint_core.emailprober)."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from osint_core import emailprober
+from osint_core.emailprober import EmailProber, PlatformLimiter, normalize_emails, summarize_email
+from osint_core.hostguard import HostGuard
+
+httpx = pytest.importorskip("httpx")
+web = pytest.importorskip("aiohttp.web")
+
+def test_normalize_emails():
+    assert normalize_emails([" A@example.com", "a@EXAMPLE.com", "b@example.com", "nope"]) == (["A@example.com", "b@example.com"], ["nope"])
+
+def test_summarize_email():
+    summary = summarize_email("a@example.com", [
+        {"name": "github", "domain": "github.com", "exists": True, "rateLimit": False, "emailrecovery": "a***@example.com"},
+        {"name": "twitter", "domain": "twitter.com", "exists": False, "rateLimit": False},
+        {"name": "adobe", "exists": False, "rateLimit": True}
+    ], only_used=False)
+    assert summary["used"] == [{"platform": "github.com", "emailrecovery": "a***@example.com"}]
+    assert summary["not_used"] == ["twitter.com"]
+    assert summary["rate_limited"] == ["adobe"]
+    assert summary["stats"] == {"used": 1, "not_used": 1, "rate_limited": 1, "checked": 3}
+
+def test_platform_limiter_backs_off_and_cools_down(monkeypatch):
+    monkeypatch.setattr(emailprober, "PLATFORM_MAX_INTERVAL_SECONDS", 0.01)
+    
+    async def scenario():
+        limiter = PlatformLimiter(1, 0.0)
+        for _ in range(emailprober.PLATFORM_GIVE_UP_AFTER):
+            assert await limiter.acquire()
+            limiter.release(True)
+        return limiter
+    
+    limiter = asyncio.run(scenario())
+    assert limiter.interval == 0.01
+    assert limiter.cooling
+    assert asyncio.run(limiter.acquire()) is False
+
+def test_clients_exist_only_while_their_address_is_checked():
+    state = {"open": set(), "peak": 0, "clients": set()}
+    
+    async def module(email, client, out):
+        state["open"] = {seen for seen in state["clients"] if not seen.is_closed}
+        state["clients"].add(client)
+        state["open"].add(client)
+        state["peak"] = max(state["peak"], len(state["open"]))
+        await asyncio.sleep(0)
+        out.append({"name": "site", "exists": email.startswith("a"), "rateLimit": False})
+    
+    async def scenario():
+        prober = EmailProber(max_connections=3, platform_concurrency=100, platform_interval=0)
+        emails = [f"{letter}{i}@example.com" for i in range(200) for letter in "ab"]
+        try:
+            return await prober.probe_batch(emails, [("one", "x", module), ("two", "x", module)])
+        finally:
+            await prober.close()
+    
+    results = asyncio.run(scenario())
+    assert len(results) == 400
+    assert all(len(items) == 2 for items in results.values())
+    assert len(state["clients"]) == 400
+    assert all(client.is_closed for client in state["clients"])
+    assert state["peak"] <= 4
+
+def test_closing_a_client_keeps_the_shared_pool(monkeypatch):
+    monkeypatch.setattr(emailprober, "HOST_GUARD", HostGuard(rate=0, budgets={}))
+    
+    async def scenario():
+        async def hello(request):
+            return web.Response(text="ok")
+        
+        app = web.Application()
+        app.router.add_get("/", hello)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/"
+        prober = EmailProber()
+        try:
+            async with prober._client(5) as first:
+                assert (await first.get(url)).text == "ok"
+            second = prober._client(5)
+            response = await second.get(url)
+            await second.aclose()
+            return response.text
+        finally:
+            await prober.close()
+            await runner.cleanup()
+    
+    assert asyncio.run(scenario()) == "ok"
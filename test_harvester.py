@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""Unit tests for theHarvester report parsing (osint_core.harvester) and the per-source search (osint_core.tools.handle_theharvester)."""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from osint_core import server, tools
+from osint_core.cache import ResultCache
+from osint_core.harvester import HARVESTER_SOURCES, HarvesterFindings, parse_harvester_run, parse_json_report, parse_sections, parse_xml_report, select_sources
+from osint_core.registry import InvalidParams, ToolRegistry, ToolSpec
+
+class FakeHarvester:
+    """Stands in for run_command_in_venv: writes a JSON report per source."""
+    
+    def __init__(self, behaviours=None, delay=0.0):
+        self.behaviours = behaviours or {}
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.deadlines = {}
+    
+    async def __call__(self, command, extra_env=None, cwd=None, tool=None, deadline=None):
+        source = command[command.index("-b") + 1]
+        report_base = Path(command[command.index("-f") + 1])
+        self.deadlines[source] = deadline
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            behaviour = self.behaviours.get(source, "ok")
+            if behaviour == "hang":
+                await asyncio.sleep(60)
+            await asyncio.sleep(self.delay)
+            if behaviour == "raise":
+                raise RuntimeError("report unreadable")
+            if behaviour == "fail":
+                return "", "boom", 1, False
+            report_base.with_suffix(".json").write_text(json.dumps({"emails": [f"info@{source}.example.com"], "hosts": [f"www.{source}.example.com"]}))
+            return "", "", 0, False
+        finally:
+            self.active -= 1
+
+@pytest.fixture
+def harvester(monkeypatch, tmp_path):
+    script = tmp_path / "theHarvester.py"
+    script.write_text("")
+    monkeypatch.setattr(tools, "HARVESTER_SCRIPT", str(script))
+    monkeypatch.setattr(tools, "HARVESTER_DIR", str(tmp_path))
+    
+    def install(fake):
+        monkeypatch.setattr(tools, "run_command_in_venv", fake)
+        return fake
+    
+    return install
+
+def test_every_source_ok_is_a_complete_result(harvester):
+    harvester(FakeHarvester())
+    result = asyncio.run(tools.handle_theharvester({"domain": "example.com", "sources": "crtsh,otx"}))
+    assert result["success"] and "partial" not in result
+    assert result["content"]["emails"] == ["info@crtsh.example.com", "info@otx.example.com"]
+
+def test_a_failed_source_makes_the_result_partial(harvester):
+    harvester(FakeHarvester({"bing": "fail"}))
+    result = asyncio.run(tools.handle_theharvester({"domain": "example.com", "sources": "crtsh,bing"}))
+    assert result["success"] and result["partial"]
+    assert result["content"]["sources"]["bing"]["status"] == "failed"
+
+def test_a_source_that_raises_is_failed_not_cancelled(harvester):
+    harvester(FakeHarvester({"otx": "raise"}))
+    result = asyncio.run(tools.handle_theharvester({"domain": "example.com", "sources": "crtsh,otx"}))
+    assert result["content"]["sources"]["otx"] == {"status": "failed", "error": "report unreadable"}
+
+def test_sources_share_the_call_deadline_and_a_per_call_limit(harvester, monkeypatch):
+    monkeypatch.setattr(tools, "SOURCES_PER_CALL", 2)
+    fake = harvester(FakeHarvester({"google": "hang"}, delay=0.3))
+    result = asyncio.run(tools.handle_theharvester({"domain": "example.com", "sources": "crtsh,otx,google,rapiddns", "max_runtime": 1}))
+    assert fake.peak == 2
+    assert all(deadline <= 1 for deadline in fake.deadlines.values())
+    # rapiddns started after crtsh or otx finished, with less time left
+    assert fake.deadlines["rapiddns"] < 0.8
+    assert result["partial"]
+    assert result["content"]["sources"]["google"]["status"] == "cancelled"
+
+@pytest.mark.parametrize("name, value", [("source_timeout", "soon"), ("source_timeout", 0), ("limit", -1), ("limit", True), ("limit", 2.5)])
+def test_invalid_limits_are_rejected(harvester, name, value):
+    fake = harvester(FakeHarvester())
+    with pytest.raises(InvalidParams):
+        asyncio.run(tools.handle_theharvester({"domain": "example.com", "sources": "crtsh", name: value}))
+    assert fake.deadlines == {}
+
+def test_numeric_strings_are_accepted(harvester):
+    fake = harvester(FakeHarvester())
+    result = asyncio.run(tools.handle_theharvester({"domain": "example.com", "sources": "crtsh", "limit": "50", "source_timeout": "30"}))
+    assert result["success"]
+    assert fake.deadlines["crtsh"] <= 30
+
+def test_partial_results_are_not_cached(monkeypatch):
+    outcomes = [{"success": True, "partial": True, "content": {"n": 1}}, {"success": True, "content": {"n": 2}}]
+    
+    async def handler(params):
+        return outcomes.pop(0)
+    
+    cache = ResultCache(None, 1 << 20, 1 << 20, {"fake_tool": 3600})
+    monkeypatch.setattr(server, "RESULT_CACHE", cache)
+    registry = ToolRegistry([ToolSpec("fake_tool", "", {}, [], handler)])
+    
+    async def scenario():
+        slots = asyncio.Semaphore(1)
+        first = await server.cached_tool_call(registry, "fake_tool", {}, slots)
+        second = await server.cached_tool_call(registry, "fake_tool", {}, slots)
+        third = await server.cached_tool_call(registry, "fake_tool", {}, slots)
+        return first, second, third
+    
+    first, second, third = asyncio.run(scenario())
+    assert first["partial"] and second["content"] == {"n": 2}
+    assert third["content"] == {"n": 2} and "cache" in third
+    assert cache.counters["stores"] == 1
+
+HARVESTER_OUTPUT = """
+*******************************************************************
+*  theHarvester 4.4.0                                             *
+*******************************************************************
+
+[*] Target: example.com
+
+[*] No IPs found.
+
+[*] Emails found: 2
+----------------------
+Info@Example.com
+not-an-email
+
+[*] Hosts found: 3
+---------------------
+www.example.com:93.184.216.34
+mail.example.com
+93.184.216.34
+
+[*] Interesting Urls found: 1
+--------------------
+https://example.com/login
+"""
+
+def test_select_sources():
+    assert select_sources("crtsh, otx,crtsh,") == ["crtsh", "otx"]
+    assert select_sources(None) == select_sources("otx,all") == HARVESTER_SOURCES
+
+def test_sections_of_the_printed_output():
+    assert parse_sections(HARVESTER_OUTPUT) == {
+        "emails": ["Info@Example.com", "not-an-email"],
+        "hosts": ["www.example.com:93.184.216.34", "mail.example.com", "93.184.216.34"],
+        "interesting urls": ["https://example.com/login"]
+    }
+
+def test_findings_are_normalized_and_deduplicated():
+    findings = HarvesterFindings()
+    for key, value in (("emails", "Info@Example.com"), ("emails", "info@example.com"), ("emails", "nobody"),
+                       ("hosts", "WWW.Example.com.:93.184.216.34, 2606:2800:220:1::1"), ("hosts", "www.example.com"),
+                       ("hosts", "10.0.0.1"), ("hosts", "2001:db8::1"), ("ips", "bogus"), ("asns", "as15133"), ("asns", "AS-x"), ("urls", " ")):
+        findings.add(key, value)
+    result = findings.result()
+    assert result["emails"] == ["info@example.com"]
+    assert result["hosts"] == ["www.example.com"]
+    assert result["resolutions"] == {"www.example.com": ["93.184.216.34", "2606:2800:220:1::1"]}
+    assert result["ips"] == ["10.0.0.1", "93.184.216.34", "2001:db8::1", "2606:2800:220:1::1"]
+    assert result["asns"] == ["AS15133"]
+    assert result["counts"] == {"emails": 1, "hosts": 1, "ips": 4, "asns": 1, "urls": 0, "interesting_urls": 0}
+
+def test_digest_changes_only_with_the_findings():
+    first, second = HarvesterFindings(), HarvesterFindings()
+    first.add("hosts", "a.example.com")
+    first.add("emails", "x@example.com")
+    second.add("emails", "X@example.com")
+    second.add("hosts", "a.example.com")
+    assert first.result()["digest"] == second.result()["digest"]
+    second.add("hosts", "a.example.com:10.0.0.1")
+    assert first.result()["digest"] != second.result()["digest"]
+    first.merge(second)
+    assert first.result() == second.result()
+
+def test_json_and_xml_reports_agree():
+    from_json = parse_json_report(json.dumps({
+        "emails": ["info@example.com"],
+        "hosts": ["www.example.com:93.184.216.34"],
+        "asns": ["AS15133"],
+        "interesting_urls": ["https://example.com/login"],
+        "shodan": [{"ignored": True}]
+    }))
+    from_xml = parse_xml_report(
+        "<theHarvester><email>info@example.com</email>"
+        "<host><ip>93.184.216.34</ip><hostname>www.example.com</hostname></host>"
+        "<asn>AS15133</asn><interesting_url>https://example.com/login</interesting_url></theHarvester>"
+    )
+    assert from_json.result() == from_xml.result()
+    with pytest.raises(ValueError):
+        parse_json_report("[]")
+
+def test_run_falls_back_from_json_to_xml_to_output(tmp_path):
+    base = tmp_path / "report"
+    assert parse_harvester_run(base, HARVESTER_OUTPUT).result()["resolutions"] == {"www.example.com": ["93.184.216.34"]}
+    base.with_suffix(".xml").write_text("<theHarvester><email>xml@example.com</email></theHarvester>")
+    assert parse_harvester_run(base, HARVESTER_OUTPUT).result()["emails"] == ["xml@example.com"]
+    base.with_suffix(".json").write_text("{truncated")
+    assert parse_harvester_run(base, HARVESTER_OUTPUT).result()["emails"] == ["xml@example.com"]
+    base.with_suffix(".json").write_text(json.dumps({"emails": ["json@example.com"]}))
+    assert parse_harvester_run(base, HARVESTER_OUTPUT).result()["emails"] == ["json@example.com"]
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""Unit tests for per-host budgets and breakers (osint_core.hostguard) and how the warm pool applies them."""
+
+import asyncio
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from osint_core import workers
+from osint_core.hostguard import CircuitBreaker, HostGuard, TokenBucket, parse_host_budgets
+from osint_core.sites import Site
+from osint_core.workers import WarmWorkerPool, WorkerTimeout, admit_hosts
+
+def test_parse_host_budgets():
+    assert parse_host_budgets("GitHub.com=5, api.twitter.com=0.5,bad") == {"github.com": 5.0, "api.twitter.com": 0.5}
+    assert parse_host_budgets(None) == {}
+
+def test_budgets_cover_subdomains():
+    guard = HostGuard(rate=10, budgets={"github.com": 2})
+    assert guard.budget("api.github.com") == 2
+    assert guard.budget("github.com") == 2
+    assert guard.budget("gitlab.com") == 10
+
+def test_token_bucket_queues_callers_at_its_rate():
+    bucket = TokenBucket(10, 1)
+    assert bucket.take() == 0
+    assert bucket.take() == pytest.approx(0.1, abs=0.01)
+    assert bucket.take() == pytest.approx(0.2, abs=0.01)
+    assert TokenBucket(0, 1).take() == 0
+
+def test_breaker_opens_and_lets_one_trial_through_after_cooldown():
+    breaker = CircuitBreaker(threshold=2, cooldown=0.05)
+    breaker.record(False)
+    assert breaker.allow()
+    breaker.record(False)
+    assert breaker.state == "open" and not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == "half_open" and not breaker.allow()
+    breaker.record(True)
+    assert breaker.state == "closed"
+
+def test_guard_rejects_hosts_with_open_breakers():
+    guard = HostGuard(rate=0, budgets={}, failures=1, cooldown=60)
+    guard.record("Slow.example", None)
+    assert guard.open_hosts() == ["slow.example"]
+    assert asyncio.run(guard.acquire("slow.example")) is False
+    assert asyncio.run(guard.acquire("fast.example")) is True
+    assert guard.counters["rejected"] == 1
+
+def test_admission_takes_a_token_per_request(monkeypatch):
+    guard = HostGuard(rate=20, budgets={}, failures=1)
+    guard.record("down.example", 503)
+    monkeypatch.setattr(workers, "HOST_GUARD", guard)
+    
+    async def scenario():
+        started = time.monotonic()
+        refused = await admit_hosts(["busy.example"] * 25 + ["other.example", "down.example"])
+        return refused, time.monotonic() - started
+    
+    refused, elapsed = asyncio.run(scenario())
+    assert refused == ["down.example"]
+    # Five requests beyond the burst of 20 wait 1/20 s each, one after another
+    assert 0.2 < elapsed < 1
+    assert guard.counters["requests"] == 26
+
+def test_planned_requests_follow_the_site_index(monkeypatch):
+    sites = [
+        Site("GitHub", "https://github.com/{username}", "https://api.github.com/users/{username}"),
+        Site("Tumblr", "https://{username}.tumblr.com", "https://{username}.tumblr.com")
+    ]
+    monkeypatch.setattr(workers, "select_sites", lambda sources: {"sites": sites})
+    pool = WarmWorkerPool(1)
+    assert asyncio.run(pool.planned_requests("sherlock", {"username": "alice"})) == ["api.github.com", "alice.tumblr.com"]
+    assert asyncio.run(pool.planned_requests("sherlock", {"username": "alice", "sites": ["tumblr"]})) == ["alice.tumblr.com"]
+    assert asyncio.run(pool.planned_requests("holehe", {"email": "a@example.com"})) == []
+
+class FakeWorker:
+    engines = {"holehe"}
+
+def test_pool_budgets_calls_before_dispatch(monkeypatch):
+    guard = HostGuard(rate=0, budgets={}, failures=1)
+    monkeypatch.setattr(workers, "HOST_GUARD", guard)
+    pool = WarmWorkerPool(1)
+    pool.configure(["holehe"])
+    pool.engines = {"holehe"}
+    sent = []
+    
+    async def acquire():
+        return FakeWorker()
+    
+    async def release(worker):
+        pass
+    
+    async def exchange(worker, engine, params, on_line, stream):
+        sent.append(params)
+        return "ok", {"success": True, "content": "", "host_statuses": [("a.example", 200), ("b.example", 429)]}
+    
+    monkeypatch.setattr(pool, "_acquire", acquire)
+    monkeypatch.setattr(pool, "_release", release)
+    monkeypatch.setattr(pool, "_exchange", exchange)
+    
+    async def scenario():
+        first = await pool.run("holehe", {"email": "a@example.com"}, 5)
+        await pool.run("holehe", {"email": "b@example.com"}, 5)
+        return first
+    
+    first = asyncio.run(scenario())
+    assert first == {"success": True, "content": "", "engine": "worker"}
+    assert sent[0]["skip_hosts"] == []
+    # The second call is admitted against the hosts the first one reported
+    assert sent[1]["skip_hosts"] == ["b.example"]
+    assert guard.counters["requests"] == 1
+    assert guard.counters["rejected"] == 1
+
+class StatusHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(429 if self.path == "/limited" else 200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+    
+    def log_message(self, *args):
+        pass
+
+# Holehe names a failed module after its function, so the fakes are module-level
+HOLEHE_PORT = {}
+
+async def github(email, client, out):
+    response = await client.get(f"http://127.0.0.1:{HOLEHE_PORT['port']}/limited")
+    out.append({"name": "github", "domain": "github.com", "rateLimit": response.status_code == 429, "exists": False})
+
+async def docker(email, client, out):
+    await client.get(f"http://localhost:{HOLEHE_PORT['port']}/")
+    out.append({"name": "docker", "domain": "docker.com", "rateLimit": False, "exists": True})
+
+def test_holehe_engine_reports_hosts_and_skips_open_ones():
+    pytest.importorskip("holehe")
+    from osint_core.engines import load_holehe_engine, run_holehe_engine
+    engine = load_holehe_engine()
+    engine["websites"] = [github, docker]
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StatusHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    HOLEHE_PORT["port"] = server.server_address[1]
+    try:
+        result = run_holehe_engine(engine, {"email": "a@example.com", "only_used": False, "skip_hosts": ["localhost"]}, lambda line: None)
+    finally:
+        server.shutdown()
+    assert result["host_statuses"] == [("127.0.0.1", 429)]
+    # The skipped module fails like an unreachable one and counts as rate limited
+    assert "[x] docker.com" in result["content"]
+
+class StalledWorker:
+    engines = {"sherlock"}
+    
+    def kill(self):
+        pass
+
+def test_pool_timeout_keeps_the_hits_found(monkeypatch):
+    monkeypatch.setattr(workers, "HOST_GUARD", HostGuard(rate=0, budgets={}))
+    monkeypatch.setattr(workers, "select_sites", lambda sources: {"sites": []})
+    pool = WarmWorkerPool(1)
+    pool.configure(["sherlock"])
+    pool.engines = {"sherlock"}
+    progress = []
+    
+    async def acquire():
+        return StalledWorker()
+    
+    async def release(worker):
+        pass
+    
+    async def exchange(worker, engine, params, on_line, stream):
+        assert stream
+        on_line("[+] GitHub: https://github.com/alice")
+        on_line("[-] GitLab")
+        on_line("[+] Reddit: https://www.reddit.com/user/alice")
+        await asyncio.sleep(60)
+    
+    monkeypatch.setattr(pool, "_acquire", acquire)
+    monkeypatch.setattr(pool, "_release", release)
+    monkeypatch.setattr(pool, "_exchange", exchange)
+    with pytest.raises(WorkerTimeout) as raised:
+        asyncio.run(pool.run("sherlock", {"username": "alice"}, 0.1, progress.append))
+    assert raised.value.partial_output == "[+] GitHub: https://github.com/alice\n[+] Reddit: https://www.reddit.com/user/alice"
+    assert len(progress) == 3
+    assert pool.counters["restarts"] == 1
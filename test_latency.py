@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Unit tests for learned per-site timeouts (osint_core.latency)."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from osint_core import latency, prober
+from osint_core.hostguard import HostGuard
+from osint_core.latency import LatencyTracker, percentile
+from osint_core.prober import UsernameProber
+from osint_core.sites import Site
+
+def test_percentile():
+    assert percentile([5, 1, 3, 2, 4], 50) == 3
+    assert percentile([5, 1, 3, 2, 4], 95) == 5
+    assert percentile([7], 10) == 7
+
+def test_timeout_follows_observed_latency():
+    tracker = LatencyTracker(None)
+    assert tracker.timeout_for("site", 15) == 15
+    for _ in range(latency.LATENCY_MIN_SAMPLES):
+        tracker.record("site", 1.5)
+    assert tracker.timeout_for("site", 15) == 1.5 * latency.LATENCY_MARGIN
+    # Never above the caller's timeout
+    assert tracker.timeout_for("site", 2) == 2
+    assert tracker.hedge_delay("site", 90) == 1.5
+
+def test_failing_sites_get_the_minimum_timeout_with_periodic_rechecks():
+    tracker = LatencyTracker(None)
+    for _ in range(10):
+        tracker.record("dead", None)
+    timeouts = [tracker.timeout_for("dead", 15) for _ in range(latency.FAILING_RECHECK_EVERY)]
+    assert timeouts.count(latency.LATENCY_MIN_TIMEOUT_SECONDS) == latency.FAILING_RECHECK_EVERY - 1
+    assert timeouts[-1] == 15
+    assert tracker.hedge_delay("dead", 90) is None
+
+def test_history_survives_a_restart(tmp_path):
+    path = str(tmp_path / "latency.sqlite3")
+    
+    async def first():
+        tracker = LatencyTracker(path)
+        await tracker.load()
+        for _ in range(5):
+            tracker.record("site", 3.0)
+        await tracker.flush()
+    
+    async def second():
+        tracker = LatencyTracker(path)
+        await tracker.load()
+        return tracker.timeout_for("site", 15)
+    
+    asyncio.run(first())
+    assert asyncio.run(second()) == 3.0 * latency.LATENCY_MARGIN
+
+def test_unsaved_records_are_flushed_on_a_timer(tmp_path, monkeypatch):
+    monkeypatch.setattr(latency, "LATENCY_FLUSH_SECONDS", 0.05)
+    path = str(tmp_path / "latency.sqlite3")
+    
+    async def scenario():
+        tracker = LatencyTracker(path)
+        await tracker.load()
+        tracker.record("site", 0.5)
+        await asyncio.sleep(0.3)
+        return tracker._executor.submit(tracker._read_all).result()
+    
+    assert [row[0] for row in asyncio.run(scenario())] == ["site"]
+
+def test_cancelled_probe_keeps_what_it_learned(tmp_path, monkeypatch):
+    tracker = LatencyTracker(str(tmp_path / "latency.sqlite3"))
+    monkeypatch.setattr(prober, "LATENCY", tracker)
+    monkeypatch.setattr(prober, "HOST_GUARD", HostGuard(rate=0, budgets={}))
+    probe = UsernameProber(max_connections=2)
+    
+    async def probe_site(site, username, timeout):
+        if site.name == "slow":
+            await asyncio.sleep(60)
+        tracker.record(site.key, 0.1)
+        return {"state": "available"}
+    
+    monkeypatch.setattr(probe, "probe_site", probe_site)
+    sites = [Site(name, f"https://{name}.example/{{username}}", f"https://{name}.example/{{username}}") for name in ("fast", "slow")]
+    
+    async def scenario():
+        try:
+            await asyncio.wait_for(probe.probe("alice", sites), timeout=0.2)
+        except asyncio.TimeoutError:
+            pass
+        return tracker._executor.submit(tracker._read_all).result()
+    
+    assert [row[0] for row in asyncio.run(scenario())] == ["fast.example/{username}"]
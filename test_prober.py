@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Unit tests for the unified username prober (osint_core.prober)."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from osint_core import prober, tools
+from osint_core.hostguard import HostGuard
+from osint_core.latency import LatencyTracker
+from osint_core.prober import UsernameProber, expand_usernames, summarize, username_variants
+from osint_core.sites import Site
+
+web = pytest.importorskip("aiohttp.web")
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    monkeypatch.setattr(prober, "HOST_GUARD", HostGuard(rate=0, budgets={}))
+    monkeypatch.setattr(prober, "LATENCY", LatencyTracker(None))
+
+def test_username_variants():
+    assert username_variants("John.Doe90") == ["john.doe90", "johndoe90", "john_doe90"]
+    assert username_variants("JohnDoe", limit=10)[:3] == ["johndoe", "john_doe", "john.doe"]
+    assert "alice" not in username_variants("alice")
+
+def test_expand_usernames():
+    usernames, added = expand_usernames([" alice ", "alice", "bob_1"], variants=True, limit=2)
+    assert usernames[:2] == ["alice", "bob_1"]
+    assert added["alice"] == []
+    assert added["bob_1"] == ["bob1", "bob.1"]
+    assert usernames[2:] == ["bob1", "bob.1"]
+
+def test_summarize():
+    github = Site("GitHub", "https://github.com/{username}", "https://github.com/{username}", sources=["sherlock"])
+    gitlab = Site("GitLab", "https://gitlab.com/{username}", "https://gitlab.com/{username}")
+    summary = summarize("alice", [
+        (github, {"state": "claimed", "url": "https://github.com/alice", "http_status": 200}),
+        (gitlab, {"state": "unknown", "error": "TimeoutError"})
+    ])
+    assert summary["claimed"] == [{"site": "GitHub", "url": "https://github.com/alice", "sources": ["sherlock"], "http_status": 200}]
+    assert summary["unknown"] == ["GitLab"]
+    assert summary["stats"]["sites"] == 2
+
+def test_probe_runs_a_bounded_number_of_requests_at_once():
+    async def scenario():
+        state = {"active": 0, "peak": 0}
+        
+        async def profile(request):
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            await asyncio.sleep(0.02)
+            state["active"] -= 1
+            found = request.match_info["name"] == "alice"
+            return web.Response(status=200 if found else 404)
+        
+        app = web.Application()
+        app.router.add_get("/{site}/{name}", profile)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        sites = [
+            Site(f"site{i}", f"http://127.0.0.1:{port}/s{i}/{{username}}", f"http://127.0.0.1:{port}/s{i}/{{username}}")
+            for i in range(20)
+        ]
+        probe = UsernameProber(max_connections=3, per_host=3)
+        seen = []
+        try:
+            summary = await probe.probe("alice", sites, timeout=5, on_result=lambda s, r: seen.append(s.name))
+            missing = await probe.probe("bob", sites[:2], timeout=5)
+        finally:
+            await probe.close()
+            await runner.cleanup()
+        return state["peak"], summary, missing, seen
+    
+    peak, summary, missing, seen = asyncio.run(scenario())
+    assert peak <= 3
+    assert summary["stats"]["claimed"] == 20
+    assert [hit["site"] for hit in summary["claimed"]][:2] == ["site0", "site1"]
+    assert sorted(seen) == sorted(f"site{i}" for i in range(20))
+    assert missing["stats"]["available"] == 2
+
+def test_probe_starts_no_more_site_checks_than_workers(monkeypatch):
+    state = {"active": 0, "peak": 0}
+    
+    async def probe_site(site, username, timeout):
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        await asyncio.sleep(0)
+        state["active"] -= 1
+        return {"state": "available"}
+    
+    probe = UsernameProber(max_connections=4)
+    monkeypatch.setattr(probe, "probe_site", probe_site)
+    sites = [Site(f"site{i}", f"https://s{i}.example/{{username}}", f"https://s{i}.example/{{username}}") for i in range(1000)]
+    summary = asyncio.run(probe.probe("alice", sites))
+    assert state["peak"] == 4
+    assert summary["stats"]["available"] == 1000
+
+def test_tls_verification_is_on_by_default():
+    assert prober.PROBE_VERIFY_TLS is True
+
+class StalledProber:
+    """Finds one site, then never finishes."""
+    
+    async def probe(self, username, sites, timeout, on_result):
+        on_result(sites[0], {"state": "claimed", "url": sites[0].url.format(username=username), "http_status": 200})
+        await asyncio.sleep(60)
+    
+    async def probe_batch(self, usernames, sites, timeout, on_result):
+        on_result(usernames[0], sites[0], {"state": "claimed", "url": sites[0].url.format(username=usernames[0]), "http_status": 200})
+        await asyncio.sleep(60)
+
+def test_timed_out_probes_return_structured_partial_output(monkeypatch):
+    github = Site("GitHub", "https://github.com/{username}", "https://github.com/{username}", sources=["sherlock"])
+    
+    async def select_probe_sites(params):
+        return {"sites": [github], "per_source": {"sherlock": 1}, "duplicates": 0, "unavailable": []}
+    
+    monkeypatch.setattr(tools, "select_probe_sites", select_probe_sites)
+    monkeypatch.setattr(tools, "PROBER", StalledProber())
+    single = asyncio.run(tools.handle_username_probe({"username": "alice", "max_runtime": 0.1}))
+    batch = asyncio.run(tools.handle_batch_username_probe({"usernames": ["alice"], "max_runtime": 0.1}))
+    assert single["timed_out"] and batch["timed_out"]
+    # Same shape as the content of a finished call, not a JSON string
+    assert single["partial_output"]["claimed"] == [{"site": "GitHub", "url": "https://github.com/alice", "sources": ["sherlock"], "http_status": 200}]
+    assert single["partial_output"]["stats"]["per_source"] == {"sherlock": 1}
+    assert batch["partial_output"]["results"][0]["claimed"][0]["site"] == "GitHub"
+    assert batch["partial_output"]["stats"]["probes"] == 1
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Unit tests for tool output capture and process execution (osint_core.process)."""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from osint_core import process, results
+from osint_core.process import OutputCapture, command_label, resolve_deadline, run_command_in_venv
+from osint_core.registry import InvalidParams
+from osint_core.results import ResultStore
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = ResultStore(str(tmp_path / "results"), max_bytes=64 * 1024 * 1024, ttl=3600)
+    monkeypatch.setattr(process, "RESULT_STORE", store)
+    monkeypatch.setattr(results, "RESULT_STORE", store)
+    return store
+
+def test_small_output_stays_in_memory(store):
+    capture = OutputCapture(memory_limit=100, hard_limit=1000)
+    capture.feed(b"hello ")
+    capture.feed(b"world")
+    capture.finish()
+    assert not capture.spilled
+    assert capture.getvalue() == "hello world"
+    assert capture.result_handle is None
+
+def test_split_multibyte_characters_are_decoded(store):
+    capture = OutputCapture()
+    data = "héllo".encode("utf-8")
+    for i in range(len(data)):
+        capture.feed(data[i:i + 1])
+    capture.finish()
+    assert capture.getvalue() == "héllo"
+
+def test_output_past_the_hard_limit_is_truncated(store):
+    capture = OutputCapture(memory_limit=1000, hard_limit=10)
+    capture.feed(b"0123456789abcdef")
+    capture.feed(b"more")
+    capture.finish()
+    text = capture.getvalue()
+    assert text.startswith("0123456789\n")
+    assert "10 of 20 bytes dropped" in text
+
+def test_spilled_output_is_handed_to_the_result_store(store, monkeypatch):
+    monkeypatch.setattr(process, "CAPTURE_EXCERPT_CHARS", 100)
+    lines = [f"line {i:05d}\n" for i in range(1000)]
+    capture = OutputCapture(memory_limit=50, hard_limit=10 ** 6, label="tool stdout")
+    for line in lines:
+        capture.feed(line.encode())
+    capture.finish()
+    assert capture.spilled
+    text = capture.getvalue()
+    # Only whole lines of the head and tail come back, with the handle
+    assert text.startswith(lines[0])
+    assert text.endswith(lines[-1])
+    assert len(text) < 500
+    assert capture.result_handle in text
+    capture.close()
+    page = asyncio.run(store.read_records(capture.result_handle, 0, 5000))
+    assert page["total_records"] == 1000
+    assert page["records"] == [line.rstrip("\n") for line in lines]
+    assert store._entries[capture.result_handle]["tool"] == "tool stdout"
+
+def test_short_spill_is_returned_whole(store):
+    capture = OutputCapture(memory_limit=5, hard_limit=1000)
+    capture.feed(b"0123456789")
+    capture.finish()
+    assert capture.getvalue() == "0123456789"
+    assert capture.getvalue() == "0123456789"
+    assert len(store._entries) == 1
+
+def test_unread_spill_file_is_removed_on_close(store):
+    capture = OutputCapture(memory_limit=5, hard_limit=1000)
+    capture.feed(b"0123456789")
+    path = capture._spill_path
+    assert os.path.exists(path)
+    capture.close()
+    assert not os.path.exists(path)
+
+def test_command_label():
+    assert command_label(["python3", "/opt/theharvester/theHarvester.py", "-d", "x"]) == "theHarvester.py"
+    assert command_label(["sherlock", "user"]) == "sherlock"
+    assert command_label([]) == "output"
+
+def test_run_command_returns_output_and_status(store):
+    stdout, stderr, returncode, timed_out = asyncio.run(run_command_in_venv(
+        [sys.executable, "-c", "import sys; print('out'); print('err', file=sys.stderr); sys.exit(3)"]
+    ))
+    assert (stdout, stderr, returncode, timed_out) == ("out\n", "err\n", 3, False)
+
+def test_run_command_kills_the_process_at_its_deadline(store):
+    stdout, _, _, timed_out = asyncio.run(run_command_in_venv(
+        [sys.executable, "-c", "import time; print('started', flush=True); time.sleep(30)"], deadline=0.5
+    ))
+    assert timed_out
+    assert stdout == "started\n"
+
+def test_resolve_deadline(monkeypatch):
+    monkeypatch.setitem(process.TOOL_DEADLINES, "sherlock", 900)
+    assert resolve_deadline("sherlock", {}) == 900.0
+    assert resolve_deadline("sherlock", {"max_runtime": None}) == 900.0
+    assert resolve_deadline("sherlock", {"max_runtime": 30}) == 30.0
+    assert resolve_deadline("sherlock", {"max_runtime": "2.5"}) == 2.5
+    assert resolve_deadline("unknown", {}) is None
+
+@pytest.mark.parametrize("value", ["abc", 0, -5, False, True, float("nan"), float("inf"), [30]])
+def test_invalid_max_runtime_is_rejected(value):
+    with pytest.raises(InvalidParams):
+        resolve_deadline("sherlock", {"max_runtime": value})
+
+class ChunkedStream:
+    """A pipe that returns its chunks one read at a time."""
+    
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+    
+    async def read(self, size):
+        return self.chunks.pop(0) if self.chunks else b""
+
+def test_overlong_lines_are_skipped_whole(monkeypatch):
+    monkeypatch.setattr(process, "MAX_CALLBACK_LINE_BYTES", 10)
+    
+    async def scenario():
+        reader = ChunkedStream([b"[+] one\n[+] x", b"x" * 20, b"y" * 20, b"z\n[+] two\n" + b"w" * 30 + b"\n[+] three"])
+        lines = []
+        capture = OutputCapture()
+        await process.read_stream(reader, capture, lines.append)
+        capture.finish()
+        return lines, capture.getvalue()
+    
+    lines, output = asyncio.run(scenario())
+    assert lines == ["[+] one", "[+] two", "[+] three"]
+    # The capture still holds everything
+    assert "x" * 20 in output and output.endswith("[+] three")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Unit tests for progress notifications (osint_core.progress)."""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from osint_core.cache import SingleFlight
+from osint_core.progress import CURRENT_PROGRESS, ProgressFanout, ProgressReporter, parse_blackbird_line, parse_bracket_line
+
+def collecting_reporter(token="t", interval=0.0):
+    sent = []
+    reporter = ProgressReporter(token, lambda text: sent.append(json.loads(text)["params"]), interval=interval)
+    return reporter, sent
+
+def test_parse_bracket_line():
+    assert parse_bracket_line("[+] GitHub: https://github.com/alice") == (1, {"site": "GitHub", "url": "https://github.com/alice"})
+    assert parse_bracket_line("\x1b[32m[-]\x1b[0m Twitter") == (1, None)
+    assert parse_bracket_line("[+] twitter.com / Phone number: 06") == (1, {"site": "twitter.com"})
+    assert parse_bracket_line("Checking username alice") is None
+
+def test_parse_blackbird_line():
+    assert parse_blackbird_line("✔️ [GitHub] https://github.com/alice") == (1, {"site": "GitHub", "url": "https://github.com/alice"})
+    assert parse_blackbird_line("✖ [Twitter]") == (1, None)
+    assert parse_blackbird_line("Searching...") is None
+
+def test_reporter_sends_increasing_progress():
+    async def scenario():
+        reporter, sent = collecting_reporter()
+        reporter.label = "sherlock"
+        reporter.total = 3
+        reporter.record(1, {"site": "a"})
+        reporter.record(1)
+        reporter.close()
+        reporter.record(1)
+        return sent
+    
+    sent = asyncio.run(scenario())
+    assert [params["progress"] for params in sent] == [1, 2]
+    assert sent[0]["findings"] == [{"site": "a"}]
+    assert sent[0]["total"] == 3
+    assert sent[-1]["message"] == "sherlock: 2 checked, 1 found"
+
+def test_reporter_throttles_to_one_notification_per_interval():
+    async def scenario():
+        reporter, sent = collecting_reporter(interval=60)
+        for _ in range(100):
+            reporter.record(1)
+        first = len(sent)
+        reporter.close()
+        return first, sent
+    
+    first, sent = asyncio.run(scenario())
+    assert first == 1
+    assert [params["progress"] for params in sent] == [1, 100]
+
+def test_fanout_forwards_to_late_joiners_from_current_counts():
+    async def scenario():
+        fanout = ProgressFanout()
+        early, early_sent = collecting_reporter("early")
+        late, late_sent = collecting_reporter("late")
+        fanout.attach(early)
+        fanout.label = "maigret"
+        fanout.record(5, {"site": "a"})
+        fanout.attach(late)
+        fanout.record(1)
+        early.close()
+        fanout.record(1)
+        late.close()
+        return early_sent, late_sent
+    
+    early_sent, late_sent = asyncio.run(scenario())
+    assert [params["progress"] for params in early_sent] == [5, 6]
+    assert [params["progress"] for params in late_sent] == [6, 7]
+    assert late_sent[-1]["message"] == "maigret: 7 checked, 1 found"
+
+def test_coalesced_followers_receive_progress_after_the_leader_leaves():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+        
+        async def execute():
+            CURRENT_PROGRESS.get().record(1)
+            await release.wait()
+            CURRENT_PROGRESS.get().record(1)
+            return {"success": True}
+        
+        async def call(reporter):
+            CURRENT_PROGRESS.set(reporter)
+            try:
+                return await flight.run("key", execute)
+            finally:
+                reporter.close()
+        
+        leader, leader_sent = collecting_reporter("leader")
+        follower, follower_sent = collecting_reporter("follower")
+        leader_task = asyncio.create_task(call(leader))
+        await asyncio.sleep(0)
+        follower_task = asyncio.create_task(call(follower))
+        await asyncio.sleep(0.01)
+        leader_task.cancel()
+        await asyncio.sleep(0.01)
+        release.set()
+        result = await follower_task
+        return result, leader_sent, follower_sent
+    
+    result, leader_sent, follower_sent = asyncio.run(scenario())
+    assert result == {"success": True, "coalesced": True}
+    assert [params["progressToken"] for params in follower_sent] == ["follower"] * len(follower_sent)
+    assert follower_sent[-1]["progress"] == 2
+    assert all(params["progress"] <= 1 for params in leader_sent)
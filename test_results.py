@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Unit tests for oversized result storage and paging (osint_core.results)."""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from osint_core import results, server
+from osint_core.registry import InvalidParams
+from osint_core.results import ResultStore, handle_fetch_result, offload_result
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = ResultStore(str(tmp_path), max_bytes=10 * 1024 * 1024, ttl=3600)
+    monkeypatch.setattr(results, "RESULT_STORE", store)
+    return store
+
+def stored(store, text):
+    description, _ = asyncio.run(store.store("test", [text]))
+    return description["handle"]
+
+def fetch(params):
+    return asyncio.run(handle_fetch_result(params))
+
+def test_byte_pages_are_clamped(store):
+    handle = stored(store, "x" * (3 * results.RESULT_MAX_PAGE_BYTES))
+    assert len(fetch({"handle": handle, "length": -1})["content"]["data"]) == 1
+    assert len(fetch({"handle": handle, "length": 0})["content"]["data"]) == 1
+    page = fetch({"handle": handle, "length": 10 ** 12})["content"]
+    assert len(page["data"]) == results.RESULT_MAX_PAGE_BYTES
+    assert page["next_offset"] == results.RESULT_MAX_PAGE_BYTES
+
+def test_record_pages_are_clamped(store):
+    handle = stored(store, "".join(f"{i}\n" for i in range(3 * results.RESULT_MAX_PAGE_RECORDS)))
+    page = fetch({"handle": handle, "record_start": 0, "record_count": 10 ** 9})["content"]
+    assert len(page["records"]) == results.RESULT_MAX_PAGE_RECORDS
+    assert page["next_record"] == results.RESULT_MAX_PAGE_RECORDS
+    assert fetch({"handle": handle, "record_count": -5})["content"]["records"] == ["0"]
+
+def test_record_pages_are_bounded_in_bytes(store):
+    handle = stored(store, "a" * 600 + "\n" + "b" * 600 + "\n" + "c" * 600)
+    page = asyncio.run(store.read_records(handle, 0, 10, max_bytes=1000))
+    assert page["records"] == ["a" * 600]
+    assert page["next_record"] == 1
+    # A single record larger than the limit is still returned whole
+    assert asyncio.run(store.read_records(handle, 1, 10, max_bytes=10))["records"] == ["b" * 600]
+    assert asyncio.run(store.read_records(handle, 0, 10))["records"][2] == "c" * 600
+
+@pytest.mark.parametrize("value", ["ten", 1.5, None, True, [1], {"n": 1}])
+def test_non_integer_page_arguments_are_rejected(store, value):
+    handle = stored(store, "text")
+    with pytest.raises(InvalidParams):
+        fetch({"handle": handle, "length": value})
+    with pytest.raises(InvalidParams):
+        fetch({"handle": handle, "record_count": value})
+
+def test_integer_strings_and_floats_are_accepted(store):
+    handle = stored(store, "0123456789")
+    assert fetch({"handle": handle, "offset": "2", "length": 3.0})["content"]["data"] == "234"
+
+def test_unknown_handle(store):
+    assert fetch({"handle": "missing"}) == {"success": False, "error": "Unknown or expired result handle: missing"}
+    with pytest.raises(InvalidParams):
+        fetch({"handle": 7})
+
+def test_byte_pages_never_split_characters(store):
+    handle = stored(store, "é" * 10)
+    page = asyncio.run(store.read_bytes(handle, 0, 3))
+    assert page["data"] == "é"
+    assert page["next_offset"] == 2
+    # An offset inside a character skips to the next one
+    assert asyncio.run(store.read_bytes(handle, 1, 4))["data"] == "é"
+
+def test_a_result_larger_than_the_store_outlives_its_call(tmp_path):
+    store = ResultStore(str(tmp_path), max_bytes=100, ttl=3600)
+    first = asyncio.run(store.store("test", ["a" * 60]))[0]["handle"]
+    large = asyncio.run(store.store("test", ["b" * 500]))[0]["handle"]
+    assert asyncio.run(store.read_bytes(large, 0, 10))["data"] == "b" * 10
+    with pytest.raises(KeyError):
+        asyncio.run(store.read_bytes(first, 0, 10))
+    # The next result evicts it like any older entry
+    asyncio.run(store.store("test", ["c" * 10]))
+    assert store.stats() == {"stored_results": 1, "stored_bytes": 10}
+
+def test_pages_are_read_off_the_event_loop(store, monkeypatch):
+    handle = stored(store, "a\nb\nc\n")
+    threaded = []
+    to_thread = asyncio.to_thread
+    
+    async def recording_to_thread(function, *args):
+        threaded.append(function.__name__)
+        return await to_thread(function, *args)
+    
+    monkeypatch.setattr(results.asyncio, "to_thread", recording_to_thread)
+    assert fetch({"handle": handle, "record_start": 1})["content"]["records"] == ["b", "c"]
+    assert fetch({"handle": handle, "offset": 2})["content"]["data"] == "b\nc\n"
+    assert threaded == ["_scan_line_offsets", "_read_range", "_read_range"]
+
+def test_store_counts_records(store):
+    description, preview = asyncio.run(store.store("test", ["a\nb", "\nc"]))
+    assert description["total_records"] == 3
+    assert description["total_bytes"] == 5
+    assert preview == "a\nb\nc"
+    description, _ = asyncio.run(store.store("test", ["a\n"]))
+    assert description["total_records"] == 1
+
+def test_offload_result_streams_content(store):
+    content = {"items": list(range(1000))}
+    summary = asyncio.run(offload_result("tool", {"success": True, "content": content}))
+    handle = summary["result_handle"]
+    assert handle["field"] == "content"
+    assert summary["success"] is True
+    assert summary["preview"] == json.dumps(content, indent=2)[:results.RESULT_PREVIEW_CHARS]
+    page = asyncio.run(store.read_bytes(handle["handle"], 0, handle["total_bytes"]))
+    assert json.loads(page["data"]) == content
+
+def test_build_tool_response_offloads_oversized_results(store, monkeypatch):
+    monkeypatch.setattr(server, "INLINE_RESULT_BYTES", 100)
+    small = asyncio.run(server.build_tool_response(1, {"success": True, "content": "ok"}, "tool"))
+    assert json.loads(small["result"]["content"][0]["text"]) == {"success": True, "content": "ok"}
+    large = asyncio.run(server.build_tool_response(2, {"success": True, "content": "x" * 1000}, "tool"))
+    text = json.loads(large["result"]["content"][0]["text"])
+    assert text["result_handle"]["total_bytes"] == 1000
+    assert server.serialize_within({"a": "x" * 10}, 5) is None
+
+def test_invalid_params_become_json_rpc_errors(store):
+    registry = server.ToolRegistry(server.UTILITY_TOOLS)
+    response = asyncio.run(server.tool_call_response(
+        registry, 3, "osint_fetch_result", {"handle": "h", "length": "many"}, asyncio.Semaphore(1)
+    ))
+    assert response["error"]["code"] == -32602
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Unit tests for process admission control (osint_core.scheduler)."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from osint_core.scheduler import ToolScheduler, parse_tool_settings
+
+def test_parse_tool_settings():
+    assert parse_tool_settings("sherlock=4, maigret=1,bad=x", {"sherlock": 2, "holehe": 4}) == {"sherlock": 4, "holehe": 4, "maigret": 1}
+    assert parse_tool_settings(None, {"sherlock": 2}) == {"sherlock": 2}
+
+async def launch(scheduler, tool, order, hold):
+    async with scheduler.slot(tool):
+        order.append(tool)
+        await hold.wait()
+
+def test_per_tool_and_global_limits():
+    async def scenario():
+        scheduler = ToolScheduler({"sherlock": 2, "holehe": 4}, {}, max_processes=3)
+        order, hold = [], asyncio.Event()
+        tasks = [asyncio.create_task(launch(scheduler, tool, order, hold)) for tool in ["sherlock"] * 3 + ["holehe"] * 2]
+        await asyncio.sleep(0.01)
+        running = dict(scheduler._running)
+        stats = scheduler.stats()
+        hold.set()
+        await asyncio.gather(*tasks)
+        return running, stats, scheduler.stats()
+    
+    running, during, after = asyncio.run(scenario())
+    assert running == {"sherlock": 2, "holehe": 1}
+    assert during["running"] == 3 and during["queued"] == 2
+    assert during["tools"]["sherlock"]["queued"] == 1
+    assert after["running"] == 0 and after["tools"]["sherlock"]["launched"] == 3
+
+def test_queued_launches_start_by_priority_then_arrival():
+    async def scenario():
+        scheduler = ToolScheduler({}, {"spiderfoot": 5, "holehe": 0}, max_processes=1)
+        order, hold = [], asyncio.Event()
+        first = asyncio.create_task(launch(scheduler, "maigret", order, hold))
+        await asyncio.sleep(0.01)
+        queued = [asyncio.create_task(launch(scheduler, tool, order, hold)) for tool in ("spiderfoot", "sherlock", "holehe", "ghunt")]
+        await asyncio.sleep(0.01)
+        hold.set()
+        await asyncio.gather(first, *queued)
+        return order
+    
+    assert asyncio.run(scenario()) == ["maigret", "holehe", "sherlock", "ghunt", "spiderfoot"]
+
+def test_a_full_tool_does_not_block_other_tools():
+    async def scenario():
+        scheduler = ToolScheduler({"spiderfoot": 1}, {"spiderfoot": 0}, max_processes=4)
+        order, hold = [], asyncio.Event()
+        tasks = [asyncio.create_task(launch(scheduler, tool, order, hold)) for tool in ("spiderfoot", "spiderfoot", "holehe")]
+        await asyncio.sleep(0.01)
+        started = list(order)
+        hold.set()
+        await asyncio.gather(*tasks)
+        return started
+    
+    assert asyncio.run(scenario()) == ["spiderfoot", "holehe"]
+
+def test_cancelled_waiters_give_their_slot_back():
+    async def scenario():
+        scheduler = ToolScheduler({}, {}, max_processes=1)
+        order, hold = [], asyncio.Event()
+        running = asyncio.create_task(launch(scheduler, "sherlock", order, hold))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(launch(scheduler, "maigret", order, hold))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        hold.set()
+        await asyncio.gather(running, waiter, return_exceptions=True)
+        async with scheduler.slot("holehe"):
+            return scheduler._total_running, order
+    
+    assert asyncio.run(scenario()) == (1, ["sherlock"])
+
+def test_configure_applies_new_limits_to_queued_launches():
+    async def scenario():
+        scheduler = ToolScheduler({"sherlock": 1}, {}, max_processes=4)
+        order, hold = [], asyncio.Event()
+        tasks = [asyncio.create_task(launch(scheduler, "sherlock", order, hold)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        before = len(order)
+        scheduler.configure({"sherlock": 3}, {})
+        await asyncio.sleep(0.01)
+        after = len(order)
+        hold.set()
+        await asyncio.gather(*tasks)
+        return before, after
+    
+    assert asyncio.run(scenario()) == (1, 3)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Unit tests for the long-lived SpiderFoot instance's scan tracking (osint_core.sfdaemon)."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from osint_core.sfdaemon import DaemonScan, SpiderFootDaemon, last_seen_cutoff
+
+class FakeSpiderFoot:
+    """Answers the API calls a refresh makes from an in-memory event table."""
+    
+    def __init__(self):
+        self.events = {}
+        self.status = "RUNNING"
+        self.calls = []
+    
+    def emit(self, event_type, data, last_seen="2026-01-01 10:00:00", module="sfp_dnsresolve"):
+        self.events.setdefault(event_type, []).append([last_seen, data, "example.com", module, 100, 100, 0, "hash", "ROOT", event_type])
+    
+    async def request(self, path, params=None, post=False):
+        self.calls.append((path, dict(params or {})))
+        if path == "startscan":
+            return ["SUCCESS", "S1"]
+        if path == "scanstatus":
+            return ["osint-mcp", "example.com", 0, 0, 0, self.status, {}]
+        if path == "scansummary":
+            return [[event_type, "", "", len(rows), len(rows)] for event_type, rows in sorted(self.events.items())]
+        if path == "scaneventresults":
+            return list(self.events.get(params["eventType"], []))
+        raise AssertionError(path)
+
+def new_daemon(spiderfoot, scans_path=None):
+    daemon = SpiderFootDaemon(scans_path=scans_path)
+    
+    async def started():
+        pass
+    
+    daemon.ensure_started = started
+    daemon.request = spiderfoot.request
+    return daemon
+
+def fetched_types(spiderfoot):
+    return [params["eventType"] for path, params in spiderfoot.calls if path == "scaneventresults"]
+
+def test_last_seen_cutoff():
+    assert last_seen_cutoff("2026-01-01 10:02:00") == "2026-01-01 10:00:00"
+    assert last_seen_cutoff("garbage") == ""
+
+def test_refresh_downloads_only_the_types_that_grew():
+    spiderfoot = FakeSpiderFoot()
+    daemon = new_daemon(spiderfoot)
+    
+    async def scenario():
+        spiderfoot.emit("INTERNET_NAME", "a.example.com")
+        spiderfoot.emit("IP_ADDRESS", "192.0.2.1")
+        _, first = await daemon.refresh("S1")
+        _, idle = await daemon.refresh("S1")
+        spiderfoot.emit("INTERNET_NAME", "b.example.com &amp; co")
+        spiderfoot.status = "FINISHED"
+        scan, second = await daemon.refresh("S1")
+        return scan, first, idle, second
+    
+    scan, first, idle, second = asyncio.run(scenario())
+    assert [event["data"] for event in first] == ["a.example.com", "192.0.2.1"]
+    assert idle == []
+    assert second == [{"type": "INTERNET_NAME", "data": "b.example.com & co", "module": "sfp_dnsresolve", "source": "example.com", "last_seen": "2026-01-01 10:00:00"}]
+    assert fetched_types(spiderfoot) == ["INTERNET_NAME", "IP_ADDRESS", "INTERNET_NAME"]
+    assert scan.finished and scan.event_count == 3
+    # Pages are built from the collector's records, not a second copy
+    assert scan.events(2, 10) == second
+    assert scan.order[2][1] is scan.collector.groups["INTERNET_NAME"][1]
+
+def test_rows_older_than_the_grace_window_are_skipped():
+    scan = DaemonScan("S1", "example.com")
+    scan.add("INTERNET_NAME", [["2026-01-01 10:10:00", "new.example.com", "", "m"]])
+    added = scan.add("INTERNET_NAME", [
+        ["2026-01-01 09:00:00", "old.example.com", "", "m"],
+        ["2026-01-01 10:09:00", "late.example.com", "", "m"],
+        ["2026-01-01 10:10:00", "new.example.com", "", "m"]
+    ])
+    assert [event["data"] for event in added] == ["late.example.com"]
+
+def test_events_are_bounded_like_a_one_shot_scan():
+    spiderfoot = FakeSpiderFoot()
+    daemon = new_daemon(spiderfoot)
+    scan = DaemonScan("S1", "example.com")
+    scan.collector.max_events = 5
+    daemon.scans["S1"] = scan
+    for number in range(10):
+        spiderfoot.emit("INTERNET_NAME", f"h{number}.example.com")
+    
+    async def scenario():
+        await daemon.refresh("S1")
+        spiderfoot.emit("IP_ADDRESS", "192.0.2.1")
+        spiderfoot.calls.clear()
+        await daemon.refresh("S1")
+    
+    asyncio.run(scenario())
+    assert scan.full
+    assert scan.event_count == 5
+    assert scan.collector.counters["dropped"] == 5
+    assert DaemonScan("S2", "example.com").add("RAW_RIR_DATA", [["", "x" * 10000, "", "m"]])[0]["data_length"] == 10000
+    # A full scan no longer downloads events
+    assert fetched_types(spiderfoot) == []
+
+def test_event_type_filter_survives_a_restart(tmp_path):
+    scans_path = str(tmp_path / "scans.json")
+    spiderfoot = FakeSpiderFoot()
+    spiderfoot.emit("INTERNET_NAME", "a.example.com")
+    spiderfoot.emit("IP_ADDRESS", "192.0.2.1")
+    
+    async def before():
+        await new_daemon(spiderfoot, scans_path).start_scan("example.com", ["sfp_dnsresolve"], ["IP_ADDRESS"], {"profile": "quick"})
+    
+    async def after():
+        return await new_daemon(spiderfoot, scans_path).refresh("S1")
+    
+    asyncio.run(before())
+    scan, added = asyncio.run(after())
+    assert [event["type"] for event in added] == ["IP_ADDRESS"]
+    assert scan.plan == {"profile": "quick"}
+    assert fetched_types(spiderfoot) == ["IP_ADDRESS"]
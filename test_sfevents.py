@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Unit tests for incremental SpiderFoot event parsing (osint_core.sfevents)."""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from osint_core import sfevents
+from osint_core.sfevents import EventCollector, SpiderFootEventParser
+
+def event_line(event_type, data, module="sfp_dnsresolve", source="example.com"):
+    return json.dumps({"type": event_type, "data": data, "module": module, "source": source})
+
+def sf_output(lines):
+    """Output shaped like `sf.py -o json`: one array, an event per line."""
+    return ("[" + ",\n".join(lines) + "]\n").encode()
+
+def test_duplicates_are_counted_not_kept():
+    collector = EventCollector()
+    assert collector.add("IP_ADDRESS", "1.2.3.4", "sfp_dns") is not None
+    assert collector.add("IP_ADDRESS", "1.2.3.4", "sfp_dns") is None
+    assert collector.add("IP_ADDRESS", "1.2.3.4", "sfp_other") is not None
+    assert collector.add("INTERNET_NAME", "1.2.3.4", "sfp_dns") is not None
+    result = collector.result()
+    assert result["counts"] == {"INTERNET_NAME": 1, "IP_ADDRESS": 2}
+    assert result["stats"]["duplicates"] == 1 and result["stats"]["kept"] == 3
+
+def test_events_past_the_limit_are_dropped():
+    collector = EventCollector(max_events=2)
+    for number in range(4):
+        collector.add("IP_ADDRESS", f"10.0.0.{number}", "sfp_dns")
+    collector.add("IP_ADDRESS", "10.0.0.0", "sfp_dns")
+    assert collector.counters == {"events": 5, "kept": 2, "duplicates": 1, "dropped": 2, "data_truncated": 0}
+
+def test_long_data_is_cut_and_non_text_data_is_serialized():
+    collector = EventCollector(max_data_chars=10)
+    record = collector.add("RAW_RIR_DATA", "x" * 25, "sfp_whois", "s" * 1000)
+    assert record == {"data": "x" * 10, "module": "sfp_whois", "data_length": 25, "source": "s" * sfevents.MAX_SOURCE_CHARS}
+    assert collector.add("GEOINFO", {"a": 1}, None)["data"] == '{"a": 1}'
+    assert collector.counters["data_truncated"] == 1
+
+def test_events_split_across_chunks_are_parsed():
+    received = []
+    parser = SpiderFootEventParser(on_event=lambda event_type, record: received.append((event_type, record["data"])))
+    output = sf_output([event_line("IP_ADDRESS", "1.2.3.4"), event_line("INTERNET_NAME", "www.example.com"), event_line("IP_ADDRESS", "1.2.3.4")])
+    for start in range(0, len(output), 7):
+        parser.feed(output[start:start + 7])
+    parser.finish()
+    assert received == [("IP_ADDRESS", "1.2.3.4"), ("INTERNET_NAME", "www.example.com")]
+    assert parser.result()["stats"]["duplicates"] == 1
+    assert parser.getvalue() == ""
+
+def test_multibyte_characters_split_across_chunks_survive():
+    parser = SpiderFootEventParser()
+    output = sf_output([event_line("HUMAN_NAME", "Zoë Ångström")])
+    for byte in range(len(output)):
+        parser.feed(output[byte:byte + 1])
+    parser.finish()
+    assert parser.result()["events"]["HUMAN_NAME"][0]["data"] == "Zoë Ångström"
+
+def test_last_line_without_newline_is_parsed_on_finish():
+    parser = SpiderFootEventParser()
+    parser.feed(event_line("EMAILADDR", "info@example.com").encode())
+    assert parser.result()["counts"] == {}
+    parser.finish()
+    assert parser.result()["counts"] == {"EMAILADDR": 1}
+
+def test_non_event_output_is_kept_as_text():
+    parser = SpiderFootEventParser()
+    parser.feed(b"[WARNING] module sfp_shodan has no API key\n{not json}\n")
+    parser.feed(sf_output([event_line("IP_ADDRESS", "1.2.3.4")]))
+    parser.finish()
+    assert parser.getvalue() == "[WARNING] module sfp_shodan has no API key\n{not json}\n"
+    assert parser.result()["counts"] == {"IP_ADDRESS": 1}
+
+def test_oversized_lines_are_skipped(monkeypatch):
+    monkeypatch.setattr(sfevents, "MAX_EVENT_BYTES", 100)
+    parser = SpiderFootEventParser()
+    parser.feed(event_line("IP_ADDRESS", "1.2.3.4").encode() + b"\n")
+    parser.feed(b'{"type": "RAW_RIR_DATA", "data": "')
+    for _ in range(10):
+        parser.feed(b"x" * 50)
+    parser.feed(b'"}\n' + event_line("IP_ADDRESS", "5.6.7.8").encode() + b"\n")
+    parser.finish()
+    result = parser.result()
+    assert result["counts"] == {"IP_ADDRESS": 2}
+    assert result["stats"]["oversized_skipped"] == 1
+    assert parser.getvalue() == ""
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Unit tests for SpiderFoot scan profiles (osint_core.sfprofiles)."""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from osint_core import sfprofiles
+from osint_core.sfprofiles import SpiderFootModule, parse_module, plan_scan, with_producers
+
+MODULE_TEMPLATE = '''
+from spiderfoot import SpiderFootEvent
+from sflib import SpiderFootPlugin
+
+class {name}(SpiderFootPlugin):
+    meta = {{
+        "name": "{name}",
+        "useCases": {use_cases!r},
+        "flags": {flags!r},
+    }}
+    
+    def watchedEvents(self):
+        return {watches!r}
+    
+    def producedEvents(self):
+        return {produces!r}
+'''
+
+MODULES = {
+    "sfp_dnsresolve": (["Footprint", "Investigate", "Passive"], [], ["INTERNET_NAME"], ["IP_ADDRESS"]),
+    "sfp_crt": (["Footprint", "Passive"], [], ["DOMAIN_NAME"], ["INTERNET_NAME"]),
+    "sfp_shodan": (["Footprint", "Passive"], ["apikey"], ["IP_ADDRESS"], ["TCP_PORT_OPEN"]),
+    "sfp_portscan": (["Footprint"], ["slow", "invasive"], ["IP_ADDRESS"], ["TCP_PORT_OPEN"]),
+    "sfp_email": (["Investigate"], [], ["*"], ["EMAILADDR"]),
+}
+
+@pytest.fixture
+def spiderfoot(tmp_path, monkeypatch):
+    modules_dir = tmp_path / "modules"
+    modules_dir.mkdir()
+    for name, (use_cases, flags, watches, produces) in MODULES.items():
+        (modules_dir / f"{name}.py").write_text(MODULE_TEMPLATE.format(name=name, use_cases=use_cases, flags=flags, watches=watches, produces=produces))
+    (modules_dir / "sfp__stor_db.py").write_text(MODULE_TEMPLATE.format(name="sfp__stor_db", use_cases=[], flags=[], watches=["*"], produces=[]))
+    (modules_dir / "sfp_broken.py").write_text("class sfp_broken(:\n")
+    monkeypatch.setattr(sfprofiles, "_catalog", None)
+    monkeypatch.delenv("SHODAN_API_KEY", raising=False)
+    return str(tmp_path)
+
+def test_metadata_is_read_without_importing(tmp_path):
+    path = tmp_path / "sfp_example.py"
+    path.write_text(MODULE_TEMPLATE.format(name="sfp_example", use_cases=["Passive"], flags=["apikey"], watches=["DOMAIN_NAME"], produces=["EMAILADDR", "PHONE_NUMBER"]))
+    module = parse_module(path)
+    assert (module.name, module.use_cases, module.flags) == ("sfp_example", ["Passive"], ["apikey"])
+    assert (module.watches, module.produces) == (["DOMAIN_NAME"], ["EMAILADDR", "PHONE_NUMBER"])
+    assert module.key_variable == "EXAMPLE_API_KEY"
+
+def test_computed_event_lists_count_as_undeclared(tmp_path):
+    path = tmp_path / "sfp_dynamic.py"
+    path.write_text("class sfp_dynamic:\n    meta = {'flags': []}\n    def producedEvents(self):\n        return list(self.opts)\n")
+    module = parse_module(path)
+    assert module.produces == [] and module.key_variable is None
+    (tmp_path / "sfp_other.py").write_text("class Unrelated:\n    pass\n")
+    assert parse_module(tmp_path / "sfp_other.py") is None
+
+def test_catalog_skips_storage_and_unreadable_modules(spiderfoot):
+    catalog = sfprofiles.load_modules(spiderfoot)
+    assert sorted(catalog) == sorted(MODULES)
+    assert sfprofiles.load_modules(spiderfoot) is catalog
+    assert sfprofiles.load_modules(os.path.join(spiderfoot, "missing")) == {}
+
+def test_producers_are_followed_through_watched_events():
+    candidates = {name: SpiderFootModule(name, use_cases, flags, produces, watches) for name, (use_cases, flags, watches, produces) in MODULES.items()}
+    assert with_producers(candidates, {"TCP_PORT_OPEN"}) == {"sfp_shodan", "sfp_portscan", "sfp_dnsresolve", "sfp_crt"}
+    # A module watching "*" pulls in no dependencies
+    assert with_producers(candidates, {"EMAILADDR"}) == {"sfp_email"}
+    assert with_producers(candidates, {"UNKNOWN"}) == set()
+
+def test_profiles_filter_by_use_case_and_flags(spiderfoot, monkeypatch):
+    assert plan_scan("passive-fast", spiderfoot_dir=spiderfoot) == {
+        "profile": "passive-fast",
+        "modules": ["sfp_crt", "sfp_dnsresolve"],
+        "pruned_missing_keys": {"sfp_shodan": "SHODAN_API_KEY"},
+        "unknown_modules": []
+    }
+    assert plan_scan(spiderfoot_dir=spiderfoot)["modules"] == ["sfp_crt", "sfp_dnsresolve", "sfp_portscan"]
+    monkeypatch.setenv("SHODAN_API_KEY", "key")
+    assert "sfp_shodan" in plan_scan("all", spiderfoot_dir=spiderfoot)["modules"]
+
+def test_event_types_narrow_the_profile(spiderfoot):
+    plan = plan_scan("investigate", event_types=["IP_ADDRESS"], spiderfoot_dir=spiderfoot)
+    assert plan["modules"] == ["sfp_dnsresolve"]
+    plan = plan_scan("footprint", event_types=["TCP_PORT_OPEN"], spiderfoot_dir=spiderfoot)
+    assert plan["modules"] == ["sfp_crt", "sfp_dnsresolve", "sfp_portscan"]
+
+def test_explicit_modules_replace_the_profile(spiderfoot):
+    plan = plan_scan("passive-fast", modules=["portscan", " SFP_Email", "nope"], event_types=["EMAILADDR"], spiderfoot_dir=spiderfoot)
+    assert plan == {"profile": "custom", "modules": ["sfp_email", "sfp_portscan"], "pruned_missing_keys": {}, "unknown_modules": ["sfp_nope"]}
+
+def test_unknown_profile_and_missing_install_raise(spiderfoot, tmp_path):
+    with pytest.raises(ValueError):
+        plan_scan("everything", spiderfoot_dir=spiderfoot)
+    with pytest.raises(LookupError):
+        plan_scan(spiderfoot_dir=str(tmp_path / "nowhere"))
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Unit tests for the compiled site-definition index (osint_core.siteindex)."""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from osint_core import siteindex
+from osint_core.siteindex import IndexUnavailable, SiteIndex, build_index, open_site_index
+from osint_core.sites import load_sites
+
+SHERLOCK = {
+    "GitHub": {"url": "https://www.github.com/{}", "errorType": "status_code", "regexCheck": "^[a-z0-9-]+$"},
+    "Forum": {"url": "https://forum.example/u/{}", "errorType": "message", "errorMsg": ["No such user", "Gone"], "headers": {"X-Test": "1"}},
+    "Broken": {"url": "https://broken.example/{}", "errorType": "status_code", "regexCheck": "(?<name>x)"},
+    "Adult": {"url": "https://adult.example/{}", "errorType": "status_code", "isNSFW": True}
+}
+
+MAIGRET = {
+    "engines": {},
+    "sites": {
+        "GitHub": {"url": "https://github.com/{username}", "checkType": "status_code", "alexaRank": 20},
+        "Popular": {"url": "https://popular.example/{username}", "checkType": "message", "absenceStrs": ["not found"], "alexaRank": 1, "tags": ["social"]},
+        "Rare": {"url": "https://rare.example/{username}", "checkType": "response_url", "alexaRank": 900},
+        "Disabled": {"url": "https://off.example/{username}", "checkType": "status_code", "disabled": True}
+    }
+}
+
+WMN = {"sites": [
+    {"name": "Posts", "uri_check": "https://api.posts.example/{account}", "uri_pretty": "https://posts.example/{account}", "e_code": 200, "e_string": "\"id\"", "m_string": "missing", "cat": "social"},
+    {"name": "Invalid", "uri_check": "https://invalid.example/{account}", "valid": False}
+]}
+
+@pytest.fixture
+def databases(tmp_path, monkeypatch):
+    paths = {}
+    for name, data in (("OSINT_SHERLOCK_DATA", SHERLOCK), ("OSINT_MAIGRET_DATA", MAIGRET), ("OSINT_WMN_DATA", WMN)):
+        path = tmp_path / f"{name.lower()}.json"
+        path.write_text(json.dumps(data))
+        monkeypatch.setenv(name, str(path))
+        paths[name] = path
+    monkeypatch.setattr(siteindex, "_index", None)
+    monkeypatch.setattr(siteindex, "_unbuildable", None)
+    return paths
+
+def test_selection_matches_parsing_the_databases(databases, tmp_path):
+    path = str(tmp_path / "sites.idx")
+    meta = build_index(path)
+    assert {source: info["sites"] for source, info in meta["sources"].items()} == {"sherlock": 3, "maigret": 3, "blackbird": 1}
+    index = SiteIndex(path)
+    for sources, top in ((["sherlock", "maigret", "blackbird"], 500), (["maigret"], 2), (["sherlock", "blackbird"], None)):
+        indexed = index.select(sources, top)
+        parsed = load_sites(sources, top)
+        broken = [site for site in parsed["sites"] if site.name == "Broken"]
+        for site in broken:
+            # Regexes Python cannot compile are dropped at build time
+            site.regex = None
+        assert indexed["sites"] == parsed["sites"]
+        assert {key: indexed[key] for key in ("per_source", "duplicates", "unavailable")} == {key: parsed[key] for key in ("per_source", "duplicates", "unavailable")}
+    index.close()
+
+def test_top_maigret_sites_follow_rank(databases, tmp_path):
+    path = str(tmp_path / "sites.idx")
+    build_index(path)
+    index = SiteIndex(path)
+    assert [site.name for site in index.select(["maigret"], 2)["sites"]] == ["Popular", "GitHub"]
+    assert index.select(["maigret"], None)["per_source"] == {"maigret": 3}
+    index.close()
+
+def test_strings_are_stored_once(databases, tmp_path):
+    path = str(tmp_path / "sites.idx")
+    build_index(path)
+    index = SiteIndex(path)
+    sites = index.select(["maigret", "blackbird"], None)["sites"]
+    assert sites[0].tags[0] is sites[-1].tags[0] == "social"
+    index.close()
+
+def test_damaged_files_are_rejected(tmp_path, databases):
+    path = tmp_path / "sites.idx"
+    build_index(str(path))
+    data = path.read_bytes()
+    for damaged in (b"", b"NOTINDEX" + data[8:], data[:-1]):
+        path.write_bytes(damaged)
+        with pytest.raises(IndexUnavailable):
+            SiteIndex(str(path))
+    with pytest.raises(IndexUnavailable):
+        SiteIndex(str(tmp_path / "missing.idx"))
+
+def test_index_is_rebuilt_when_a_database_changes(databases, tmp_path, monkeypatch):
+    path = str(tmp_path / "sites.idx")
+    monkeypatch.setattr(siteindex, "SITE_INDEX_PATH", path)
+    first = open_site_index(path)
+    assert first is not None and first.is_current()
+    assert open_site_index(path) is first
+    sherlock = databases["OSINT_SHERLOCK_DATA"]
+    sherlock.write_text(json.dumps({"Only": {"url": "https://only.example/{}", "errorType": "status_code"}}))
+    os.utime(sherlock, ns=(1, 1))
+    assert not first.is_current()
+    second = open_site_index(path)
+    assert second is not first
+    assert [site.name for site in second.select(["sherlock"])["sites"]] == ["Only"]
+
+def test_unbuildable_index_falls_back_to_parsing(databases, tmp_path, monkeypatch):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    path = str(blocker / "sites.idx")
+    monkeypatch.setattr(siteindex, "SITE_INDEX_PATH", path)
+    assert open_site_index(path) is None
+    assert siteindex._unbuildable == path
+    selection = siteindex.select_sites(["blackbird"])
+    assert [site.name for site in selection["sites"]] == ["Posts"]
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Unit tests for stdio JSON-RPC framing (osint_core.stdio)."""
+
+import asyncio
+import io
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from osint_core.stdio import MessageTooLarge, MessageWriter, open_stdin_reader, read_message_line
+
+async def read_all(data: bytes, limit: int = 64):
+    reader = asyncio.StreamReader(limit=limit)
+    reader.feed_data(data)
+    reader.feed_eof()
+    lines = []
+    while True:
+        try:
+            line = await read_message_line(reader)
+        except MessageTooLarge:
+            lines.append("too large")
+            continue
+        if line is None:
+            return lines
+        lines.append(line)
+
+def test_lines_are_read_one_message_at_a_time():
+    assert asyncio.run(read_all(b'{"id":1}\n{"id":2}\n{"id":3}')) == [b'{"id":1}\n', b'{"id":2}\n', b'{"id":3}']
+
+def test_oversized_lines_are_skipped_and_reading_resumes():
+    data = b'{"id":1}\n' + b"x" * 1000 + b'\n{"id":2}\n' + b"y" * 1000
+    assert asyncio.run(read_all(data)) == [b'{"id":1}\n', "too large", b'{"id":2}\n', "too large"]
+
+def test_stdin_from_a_file_is_read_by_a_thread(tmp_path):
+    path = tmp_path / "input"
+    path.write_bytes(b'{"id":1}\n{"id":2}\n')
+    
+    async def scenario():
+        with open(path, "rb") as stream:
+            reader = await open_stdin_reader(stream)
+            return [await read_message_line(reader) for _ in range(3)]
+    
+    assert asyncio.run(scenario()) == [b'{"id":1}\n', b'{"id":2}\n', None]
+
+def test_stdin_from_a_pipe_is_read_by_the_loop():
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, b'{"id":1}\n')
+    os.close(write_fd)
+    
+    async def scenario():
+        with open(read_fd, "rb", buffering=0) as stream:
+            reader = await open_stdin_reader(stream)
+            return [await read_message_line(reader) for _ in range(2)]
+    
+    assert asyncio.run(scenario()) == [b'{"id":1}\n', None]
+
+def test_writer_batches_queued_messages_into_one_flush():
+    stream = io.BytesIO()
+    
+    async def scenario():
+        writer = MessageWriter(stream)
+        writer.start()
+        for number in range(10):
+            writer.send({"jsonrpc": "2.0", "id": number})
+        writer.send_text('{"jsonrpc":"2.0","id":"raw"}')
+        await writer.close()
+        return writer.counters
+    
+    counters = asyncio.run(scenario())
+    lines = stream.getvalue().decode().splitlines()
+    assert [json.loads(line)["id"] for line in lines] == list(range(10)) + ["raw"]
+    assert counters == {"messages": 11, "flushes": 1}
+
+class BrokenStream:
+    def write(self, data):
+        raise BrokenPipeError
+    
+    def flush(self):
+        pass
+
+def test_writer_stops_quietly_when_the_client_goes_away():
+    async def scenario():
+        writer = MessageWriter(BrokenStream())
+        writer.start()
+        writer.send({"id": 1})
+        await asyncio.sleep(0.01)
+        writer.send({"id": 2})
+        await asyncio.wait_for(writer.close(), timeout=1)
+        return writer.counters
+    
+    assert asyncio.run(scenario()) == {"messages": 0, "flushes": 0}
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Unit tests for the streamable HTTP transport (osint_core.streamable_http)."""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from osint_core import server
+from osint_core.registry import ToolRegistry
+from osint_core.streamable_http import HttpError, HttpRequest, StreamableHttpServer, expects_response, is_loopback, read_request
+
+class FakeWriter:
+    """Collects what a handler writes to a connection."""
+    
+    def __init__(self, fail: bool = False):
+        self.data = b""
+        self.fail = fail
+    
+    def write(self, data: bytes) -> None:
+        self.data += data
+    
+    async def drain(self) -> None:
+        if self.fail:
+            raise ConnectionResetError("client went away")
+    
+    def close(self) -> None:
+        pass
+
+def parse(raw: bytes) -> HttpRequest:
+    async def scenario():
+        reader = asyncio.StreamReader(limit=1024)
+        reader.feed_data(raw)
+        reader.feed_eof()
+        return await read_request(reader, FakeWriter())
+    
+    return asyncio.run(scenario())
+
+def new_server(token=None, host="127.0.0.1", idle_seconds=3600.0):
+    registry = ToolRegistry(server.UTILITY_TOOLS)
+    slots = asyncio.Semaphore(1)
+    return StreamableHttpServer(lambda notify: server.McpSession(registry, "test", slots, notify), host=host, port=0, idle_seconds=idle_seconds, token=token)
+
+def post(body, session_id=None, token=None, accept="application/json"):
+    headers = {"accept": accept}
+    if session_id:
+        headers["mcp-session-id"] = session_id
+    if token:
+        headers["authorization"] = f"Bearer {token}"
+    return HttpRequest("POST", "/mcp", "HTTP/1.1", headers, json.dumps(body).encode())
+
+def initialize_request(request_id=1):
+    return {"jsonrpc": "2.0", "id": request_id, "method": "initialize", "params": {}}
+
+def test_read_request_parses_line_headers_and_body():
+    request = parse(b"POST /mcp?x=1 HTTP/1.1\r\nHost: a\r\nContent-Length: 2\r\nAccept: text/event-stream\r\n\r\n{}")
+    assert (request.method, request.path, request.body) == ("POST", "/mcp", b"{}")
+    assert request.headers["host"] == "a"
+    assert request.accepts("text/event-stream")
+    assert request.keep_alive
+
+def test_read_request_rejects_bad_requests():
+    with pytest.raises(HttpError) as error:
+        parse(b"GARBAGE\r\n\r\n")
+    assert error.value.status == 400
+    with pytest.raises(HttpError) as error:
+        parse(b"POST /mcp HTTP/1.1\r\nX: " + b"a" * 2048 + b"\r\n\r\n")
+    assert error.value.status == 431
+    with pytest.raises(HttpError) as error:
+        parse(b"POST /mcp HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n")
+    assert error.value.status == 411
+    assert parse(b"") is None
+
+def test_http_1_0_closes_by_default():
+    assert not parse(b"GET /mcp HTTP/1.0\r\n\r\n").keep_alive
+
+def test_expects_response():
+    assert expects_response({"jsonrpc": "2.0", "id": 1, "method": "tools/list"})
+    assert not expects_response({"jsonrpc": "2.0", "method": "notifications/initialized"})
+    assert not expects_response([{"jsonrpc": "2.0", "method": "notifications/initialized"}])
+    assert expects_response([])
+
+def test_is_loopback():
+    assert is_loopback("127.0.0.1") and is_loopback("localhost") and is_loopback("::1") and is_loopback("127.0.0.2")
+    assert not is_loopback("0.0.0.0")
+    assert not is_loopback("example.com")
+
+def run_post(http, request, writer=None):
+    writer = writer or FakeWriter()
+    asyncio.run(http.handle_request(request, writer))
+    return writer.data.decode()
+
+def session_of(response: str) -> str:
+    return next(line.split(": ", 1)[1] for line in response.split("\r\n") if line.lower().startswith("mcp-session-id"))
+
+def test_session_lifecycle():
+    http = new_server()
+    response = run_post(http, post(initialize_request()))
+    assert response.startswith("HTTP/1.1 200")
+    session_id = session_of(response)
+    response = run_post(http, post({"jsonrpc": "2.0", "id": 2, "method": "tools/list"}, session_id))
+    assert "osint_fetch_result" in response
+    with pytest.raises(HttpError) as error:
+        run_post(http, post({"jsonrpc": "2.0", "id": 3, "method": "tools/list"}))
+    assert error.value.status == 400
+    with pytest.raises(HttpError) as error:
+        run_post(http, post({"jsonrpc": "2.0", "id": 3, "method": "tools/list"}, "unknown"))
+    assert error.value.status == 404
+
+def test_initialize_cannot_replace_a_session_or_be_batched():
+    http = new_server()
+    session_id = session_of(run_post(http, post(initialize_request())))
+    with pytest.raises(HttpError) as error:
+        run_post(http, post(initialize_request(2), session_id))
+    assert error.value.status == 400
+    with pytest.raises(HttpError) as error:
+        run_post(http, post([initialize_request(3), {"jsonrpc": "2.0", "id": 4, "method": "tools/list"}], session_id))
+    assert error.value.status == 400
+    assert list(http.sessions) == [session_id]
+
+def test_bearer_token_is_required_when_configured():
+    http = new_server(token="secret")
+    for token in (None, "wrong"):
+        with pytest.raises(HttpError) as error:
+            run_post(http, post(initialize_request(), token=token))
+        assert error.value.status == 401
+        assert "WWW-Authenticate" in error.value.headers
+    assert run_post(http, post(initialize_request(), token="secret")).startswith("HTTP/1.1 200")
+    assert http.counters["unauthorized"] == 2
+
+def test_foreign_origins_are_rejected():
+    http = new_server()
+    request = post(initialize_request())
+    request.headers["origin"] = "https://evil.example"
+    with pytest.raises(HttpError) as error:
+        run_post(http, request)
+    assert error.value.status == 403
+
+def test_non_loopback_bind_without_token_is_refused():
+    with pytest.raises(RuntimeError):
+        asyncio.run(new_server(host="0.0.0.0").serve_forever())
+
+def test_idle_sessions_expire_without_new_clients():
+    async def scenario():
+        http = new_server(idle_seconds=0.01)
+        http.start_session()
+        serving = asyncio.create_task(http.serve_forever())
+        await asyncio.sleep(1.2)
+        serving.cancel()
+        await asyncio.gather(serving, return_exceptions=True)
+        return http
+    
+    http = asyncio.run(scenario())
+    assert http.sessions == {}
+    assert http.counters["sessions_expired"] == 1
+
+def test_dropped_stream_detaches_the_call():
+    async def scenario():
+        http = new_server()
+        session_id = http.start_session()
+        session, _ = http.sessions[session_id]
+        release = asyncio.Event()
+        
+        async def slow_payload(payload):
+            server.NOTIFY_TARGET.get()("progress")
+            await release.wait()
+            server.NOTIFY_TARGET.get()("more progress")
+            return "{}"
+        
+        session.handle_payload = slow_payload
+        writer = FakeWriter(fail=True)
+        await http.stream_response(session, {}, {}, writer)
+        # Notifications of the detached call go nowhere
+        release.set()
+        await asyncio.sleep(0.01)
+        pending = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        return pending
+    
+    assert asyncio.run(scenario()) == []